@@ -0,0 +1,385 @@
+import asyncio
+import json
+import mimetypes
+import os
+import threading
+from aiohttp import web
+from app.services import jobs
+from app.services.jobs import JobQueue
+from app.services.subtitle_writers import SUBTITLE_FORMATS
+from app.services.voice import VoiceService
+
+# HTTP API defaults (overridable in the [api] table of config.toml)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+DEFAULT_MAX_BODY_KB = 1024
+DEFAULT_MAX_PENDING_JOBS = 100
+DEFAULT_STREAM_CONCURRENCY = 4
+
+# Seconds clients are asked to wait before retrying a rejected request
+RETRY_AFTER_SECONDS = 5
+
+# Range accepted for rate, pitch and volume, as in the web interface
+PARAMETER_RANGE = (-50, 50)
+
+CONFIG_KEY = web.AppKey("config", dict)
+MAX_PENDING_KEY = web.AppKey("max_pending_jobs", int)
+QUEUE_KEY = web.AppKey("queue", JobQueue)
+VOICE_SERVICE_KEY = web.AppKey("voice_service", VoiceService)
+STREAM_SLOTS_KEY = web.AppKey("stream_slots", asyncio.Semaphore)
+
+routes = web.RouteTableDef()
+# Routes serving the files of finished jobs, also run alongside the web interface
+media_routes = web.RouteTableDef()
+
+
+def create_app(config, queue=None):
+    """
+    Create the HTTP API application.
+
+    Jobs run on a JobQueue, so at most ``[jobs] workers`` of them synthesize
+    at once and further ones wait in its queue. Once ``max_pending_jobs``
+    jobs are waiting or running, new ones are rejected with 503 so clients
+    back off instead of piling up work. Streaming requests bypass the queue
+    and are limited to ``stream_concurrency`` at a time.
+
+    Args:
+        config: Configuration dictionary
+        queue: JobQueue to run jobs on; one is created from the configuration if omitted
+
+    Returns:
+        web.Application: Application whose startup starts the job workers
+    """
+    settings = config.get("api", {})
+    app = web.Application(client_max_size=settings.get("max_body_kb", DEFAULT_MAX_BODY_KB) * 1024)
+    app[CONFIG_KEY] = config
+    app[MAX_PENDING_KEY] = settings.get("max_pending_jobs", DEFAULT_MAX_PENDING_JOBS)
+    app[QUEUE_KEY] = queue or JobQueue.from_config(config)
+    app[VOICE_SERVICE_KEY] = VoiceService(config)
+    app[STREAM_SLOTS_KEY] = asyncio.Semaphore(settings.get("stream_concurrency", DEFAULT_STREAM_CONCURRENCY))
+    app.add_routes(routes)
+    app.add_routes(media_routes)
+    app.on_startup.append(_start)
+    app.on_cleanup.append(_stop)
+    return app
+
+
+def run(config, host=None, port=None):
+    """
+    Serve the HTTP API until interrupted.
+
+    Args:
+        config: Configuration dictionary
+        host: Interface to listen on; defaults to ``[api] host``
+        port: Port to listen on; defaults to ``[api] port``
+    """
+    settings = config.get("api", {})
+    web.run_app(
+        create_app(config),
+        host=host or settings.get("host", DEFAULT_HOST),
+        port=port or settings.get("port", DEFAULT_PORT)
+    )
+
+
+def create_media_app(queue):
+    """
+    Create an application that only serves the files of finished jobs.
+
+    Args:
+        queue: JobQueue the jobs are looked up in; its workers are not
+            started or stopped by the application
+
+    Returns:
+        web.Application: Application with the audio and subtitle routes
+    """
+    app = web.Application()
+    app[QUEUE_KEY] = queue
+    app.add_routes(media_routes)
+    return app
+
+
+def start_media_server(queue, host=DEFAULT_HOST, port=0):
+    """
+    Serve the files of finished jobs from a background thread.
+
+    The web interface uses it to stream the audio player from disk with
+    range requests; the server runs on its own event loop until the
+    process exits.
+
+    Args:
+        queue: JobQueue the jobs are looked up in
+        host: Interface to listen on
+        port: Port to listen on, 0 for a free one
+
+    Returns:
+        int: Port the server listens on
+
+    Raises:
+        OSError: If the address cannot be bound
+    """
+    loop = asyncio.new_event_loop()
+    runner = web.AppRunner(create_media_app(queue))
+    try:
+        loop.run_until_complete(runner.setup())
+        loop.run_until_complete(web.TCPSite(runner, host, port).start())
+    except OSError:
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+        raise
+    threading.Thread(target=loop.run_forever, name="tts-media-server", daemon=True).start()
+    return runner.addresses[0][1]
+
+
+async def _start(app):
+    """Start the job workers with the application."""
+    app[QUEUE_KEY].start()
+
+
+async def _stop(app):
+    """Stop the job workers and close the streaming connections."""
+    await asyncio.to_thread(app[QUEUE_KEY].close)
+    await app[VOICE_SERVICE_KEY].aclose()
+
+
+@routes.get("/health")
+async def health(request):
+    """Report the number of pending jobs and the backend metrics."""
+    voice_service = request.app[VOICE_SERVICE_KEY]
+    return web.json_response({
+        "status": "ok",
+        "pending_jobs": await asyncio.to_thread(request.app[QUEUE_KEY].pending),
+        "backends": voice_service.backend_stats(),
+        "resilience": voice_service.resilience_metrics()
+    })
+
+
+@routes.post("/jobs")
+async def submit_job(request):
+    """Queue a synthesis job and answer 202 with its status."""
+    params = parse_params(await _read_json(request), request.app[CONFIG_KEY])
+    queue = request.app[QUEUE_KEY]
+    if await asyncio.to_thread(queue.pending) >= request.app[MAX_PENDING_KEY]:
+        raise _busy("Too many pending jobs")
+
+    job_id = await asyncio.to_thread(queue.submit, params)
+    job = await asyncio.to_thread(queue.get, job_id)
+    return web.json_response(job_status(job), status=202, headers={"Location": f"/jobs/{job_id}"})
+
+
+@routes.get("/jobs/{job_id}")
+async def get_job(request):
+    """Report the status and progress of a job."""
+    return web.json_response(job_status(await _find_job(request)))
+
+
+@routes.delete("/jobs/{job_id}")
+async def cancel_job(request):
+    """Cancel a queued or running job."""
+    job = await _find_job(request)
+    queue = request.app[QUEUE_KEY]
+    if not await asyncio.to_thread(queue.cancel, job["id"]):
+        raise _error(web.HTTPConflict, f"Job is already {job['status']}")
+    return web.json_response(job_status(await asyncio.to_thread(queue.get, job["id"])))
+
+
+@media_routes.get("/jobs/{job_id}/audio")
+async def download_audio(request):
+    """Stream the audio of a finished job from disk; range requests are supported."""
+    job = await _finished_job(request)
+    return web.FileResponse(job["result"]["audio_file_path"])
+
+
+@media_routes.get("/jobs/{job_id}/srt")
+async def download_srt(request):
+    """Stream the SRT subtitles of a finished job from disk."""
+    job = await _finished_job(request)
+    return web.FileResponse(job["result"]["srt_file_path"],
+                            headers={"Content-Type": f"{SUBTITLE_FORMATS['srt'].content_type}; charset=utf-8"})
+
+
+@media_routes.get("/jobs/{job_id}/subtitles/{format}")
+async def download_subtitles(request):
+    """Stream the subtitles of a finished job in one of the formats it was written in."""
+    job = await _finished_job(request)
+    subtitle_format = request.match_info["format"]
+    # Jobs from before subtitle formats only have the SRT
+    subtitle_files = job["result"].get("subtitle_files", {"srt": job["result"]["srt_file_path"]})
+    if subtitle_format not in subtitle_files:
+        raise _error(web.HTTPNotFound, f"Job has no {subtitle_format} subtitles")
+    content_type = SUBTITLE_FORMATS[subtitle_format].content_type
+    return web.FileResponse(subtitle_files[subtitle_format],
+                            headers={"Content-Type": f"{content_type}; charset=utf-8"})
+
+
+@routes.post("/speech")
+async def stream_speech(request):
+    """
+    Synthesize a text and stream its audio while it is being rendered.
+
+    The response starts with the first audio chunk, so errors before it are
+    answered with a JSON error instead of a truncated body.
+    """
+    params = parse_params(await _read_json(request), request.app[CONFIG_KEY])
+    slots = request.app[STREAM_SLOTS_KEY]
+    if slots.locked():
+        raise _busy("Too many streaming requests")
+
+    voice_service = request.app[VOICE_SERVICE_KEY]
+    response = None
+    async with slots:
+        source = voice_service.stream_async(
+            params["text"], params["voice_name"], params["rate"], params["pitch"], params["volume"])
+        try:
+            async for item in source:
+                if item["type"] != "audio":
+                    continue
+                if response is None:
+                    response = web.StreamResponse(headers={
+                        "Content-Type": mimetypes.guess_type(f"speech.{voice_service.audio_format()}")[0]
+                        or "application/octet-stream"
+                    })
+                    await response.prepare(request)
+                await response.write(item["data"])
+        except Exception as e:
+            if response is not None:
+                # Headers are sent; dropping the connection tells the client the audio is incomplete
+                raise
+            print(f"Streaming synthesis failed: {e}")
+            raise _error(web.HTTPBadGateway, f"Synthesis failed: {e}")
+        finally:
+            await source.aclose()
+
+    if response is None:
+        raise _error(web.HTTPBadGateway, "Synthesis produced no audio")
+    await response.write_eof()
+    return response
+
+
+def parse_params(data, config):
+    """
+    Validate a request body and convert it into job parameters.
+
+    ``voice`` may name an entry of ``[voices]`` in the configuration or be
+    a voice name of the backend.
+
+    Args:
+        data: Decoded JSON request body
+        config: Configuration dictionary
+
+    Returns:
+        dict: Job parameters for JobQueue.submit
+
+    Raises:
+        web.HTTPBadRequest: If a field is missing or invalid
+    """
+    if not isinstance(data, dict):
+        raise _error(web.HTTPBadRequest, "Request body must be a JSON object")
+    text = data.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise _error(web.HTTPBadRequest, "'text' must be a non-empty string")
+    voice = data.get("voice")
+    if not isinstance(voice, str) or not voice:
+        raise _error(web.HTTPBadRequest, "'voice' is required")
+
+    params = {
+        "text": text,
+        "voice_name": config.get("voices", {}).get(voice, {}).get("name", voice),
+        "max_line_length": data.get("max_line_length", 40),
+        "preserve_punctuation": bool(data.get("preserve_punctuation", True))
+    }
+    for name in ("rate", "pitch", "volume"):
+        value = data.get(name, 0)
+        if not isinstance(value, int) or not PARAMETER_RANGE[0] <= value <= PARAMETER_RANGE[1]:
+            raise _error(web.HTTPBadRequest, f"'{name}' must be an integer from "
+                                             f"{PARAMETER_RANGE[0]} to {PARAMETER_RANGE[1]}")
+        params[name] = value
+    if not isinstance(params["max_line_length"], int) or params["max_line_length"] < 1:
+        raise _error(web.HTTPBadRequest, "'max_line_length' must be a positive integer")
+    return params
+
+
+def job_status(job):
+    """
+    Convert a job into its API representation.
+
+    Args:
+        job: Job dictionary from JobQueue.get
+
+    Returns:
+        dict: Job status without the request parameters, with download
+            links once the job succeeded
+    """
+    status = {key: job[key] for key in (
+        "id", "status", "progress", "message", "error", "created", "started", "finished")}
+    if job["status"] == jobs.SUCCEEDED:
+        status["audio"] = f"/jobs/{job['id']}/audio"
+        status["srt"] = f"/jobs/{job['id']}/srt"
+        status["subtitles"] = {
+            subtitle_format: f"/jobs/{job['id']}/subtitles/{subtitle_format}"
+            for subtitle_format in job["result"].get("subtitle_files", {"srt": None})
+        }
+    return status
+
+
+async def _read_json(request):
+    """
+    Decode a JSON request body.
+
+    Raises:
+        web.HTTPBadRequest: If the body is not valid JSON
+        web.HTTPRequestEntityTooLarge: If the body exceeds ``max_body_kb``
+    """
+    try:
+        return await request.json()
+    except ValueError:
+        raise _error(web.HTTPBadRequest, "Request body must be valid JSON")
+
+
+async def _find_job(request):
+    """
+    Look up the job named in the URL.
+
+    Raises:
+        web.HTTPNotFound: If the job does not exist
+    """
+    job = await asyncio.to_thread(request.app[QUEUE_KEY].get, request.match_info["job_id"])
+    if job is None:
+        raise _error(web.HTTPNotFound, "Job not found")
+    return job
+
+
+async def _finished_job(request):
+    """
+    Look up the job named in the URL and check that its outputs exist.
+
+    Raises:
+        web.HTTPNotFound: If the job does not exist or its outputs were removed
+        web.HTTPConflict: If the job has not succeeded
+    """
+    job = await _find_job(request)
+    if job["status"] != jobs.SUCCEEDED:
+        raise _error(web.HTTPConflict, f"Job is {job['status']}")
+    if not all(os.path.exists(path) for path in (
+            job["result"]["audio_file_path"], job["result"]["srt_file_path"])):
+        raise _error(web.HTTPNotFound, "Job outputs were removed")
+    return job
+
+
+def _busy(message):
+    """Create a 503 error asking the client to retry later."""
+    return _error(web.HTTPServiceUnavailable, message, {"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+
+def _error(error_class, message, headers=None):
+    """
+    Create an HTTP error with a JSON body.
+
+    Args:
+        error_class: aiohttp HTTPException subclass
+        message: Error message
+        headers: Additional response headers
+
+    Returns:
+        web.HTTPException: Error to raise
+    """
+    return error_class(text=json.dumps({"error": message}), content_type="application/json", headers=headers)
@@ -2,22 +2,50 @@
 import argparse
 import toml
 import os
+import sys
 import uuid
 from app.services.voice import VoiceService
 from app.services.subtitle import SubtitleService
+from app.services.audio import OUTPUT_FORMATS
+from app.services.subtitle_writers import SUBTITLE_FORMATS
+from app.cli import batch, serve
+
+
+def load_config():
+    """Load config.toml, falling back to config.example.toml."""
+    if os.path.exists("config.toml"):
+        return toml.load("config.toml")
+    return toml.load("config.example.toml")
+
 
 def main():
+    # "batch" renders many files in one process; see app/cli/batch.py
+    if sys.argv[1:2] == ["batch"]:
+        sys.exit(batch.main(sys.argv[2:], load_config()))
+    # "serve" runs the HTTP API; see app/api/server.py
+    if sys.argv[1:2] == ["serve"]:
+        sys.exit(serve.main(sys.argv[2:], load_config()))
+
     parser = argparse.ArgumentParser(description="Generate TTS audio and SRT subtitles from text.")
     parser.add_argument("--text", required=True, help="Path to the input text file.")
     parser.add_argument("--lang", required=True, help="Language and voice to use (e.g., zh-CN).")
     parser.add_argument("--out", help="Output directory for audio and subtitles. Defaults to task/<UUID>.")
+    parser.add_argument("--previous", help="Output directory of a previous run of the same script. "
+                                           "Only sentences that changed since then are re-synthesized.")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS),
+                        help="Encode the audio with ffmpeg. Overrides format in the [audio] table of the config.")
+    parser.add_argument("--subtitle-format", action="append", dest="subtitle_formats",
+                        choices=[f for f in SUBTITLE_FORMATS if f != "srt"],
+                        help="Also write subtitles in this format next to output.srt (repeatable). "
+                             "Overrides formats in the [subtitles] table of the config.")
     args = parser.parse_args()
 
     # Load configuration
-    if os.path.exists("config.toml"):
-        config = toml.load("config.toml")
-    else:
-        config = toml.load("config.example.toml")
+    config = load_config()
+    if args.format:
+        config.setdefault("audio", {})["format"] = args.format
+    if args.subtitle_formats:
+        config.setdefault("subtitles", {})["formats"] = args.subtitle_formats
 
     # Initialize services
     voice_service = VoiceService(config)
@@ -41,20 +69,26 @@ def main():
     os.makedirs(output_dir, exist_ok=True)
 
     # Generate audio and subtitles
-    audio_file, word_boundaries = voice_service.synthesize(text, voice_name, 0, 0, 0, output_dir)
-    srt_content = subtitle_service.generate_srt(word_boundaries)
-
-    # Save files
-    output_audio_path = os.path.join(output_dir, "output.wav")
-    output_srt_path = os.path.join(output_dir, "output.srt")
-
-    os.rename(audio_file, output_audio_path)
+    if args.previous:
+        audio_file, word_boundaries = voice_service.synthesize_incremental(
+            text, voice_name, 0, 0, 0, output_dir, previous_dir=args.previous)
+    else:
+        audio_file, word_boundaries = voice_service.synthesize(text, voice_name, 0, 0, 0, output_dir)
 
-    with open(output_srt_path, "w") as f:
-        f.write(srt_content)
+    # Save files. The backend's audio keeps its container so that the sentence
+    # manifest used by --previous keeps pointing at it; an [audio] output
+    # format is encoded into a separate file next to it.
+    output_audio_path = audio_file
+    subtitle_files, _ = subtitle_service.write_subtitle_files(word_boundaries, output_dir)
 
     print(f"Audio saved to {output_audio_path}")
-    print(f"SRT saved to {output_srt_path}")
+    for subtitle_format, path in subtitle_files.items():
+        print(f"{subtitle_format.upper()} saved to {path}")
+
+    if voice_service.cache:
+        stats = voice_service.cache.stats()
+        print(f"Synthesis cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+              f"{stats['entries']} entries, {stats['size_bytes'] / 1024 / 1024:.1f} MB")
 
 if __name__ == "__main__":
     main()
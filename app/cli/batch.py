@@ -0,0 +1,237 @@
+import argparse
+import asyncio
+import csv
+import glob
+import json
+import os
+import time
+from app.services.voice import VoiceService
+from app.services.subtitle import SubtitleService
+
+SUMMARY_FILE = "summary.json"
+
+
+def main(argv, config):
+    """
+    Run the batch subcommand.
+
+    Args:
+        argv: Command-line arguments following ``batch``
+        config: Loaded configuration dictionary
+
+    Returns:
+        int: Process exit code (non-zero if any job failed)
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli batch",
+        description="Generate TTS audio and SRT subtitles for many text files in one process."
+    )
+    parser.add_argument("input", help="Directory of .txt files, a glob pattern, "
+                                      "or a .jsonl/.csv manifest of jobs.")
+    parser.add_argument("--lang", action="append", dest="voices", metavar="VOICE",
+                        help="Voice to render directory/glob inputs with (repeatable). "
+                             "Accepts a key from [voices] in the config or a voice name.")
+    parser.add_argument("--out", default="task/batch", help="Root output directory. Defaults to task/batch.")
+    parser.add_argument("--concurrency", type=int, default=4, help="Number of jobs run at the same time.")
+    parser.add_argument("--force", action="store_true", help="Re-render jobs whose outputs already exist.")
+    args = parser.parse_args(argv)
+
+    try:
+        jobs = load_jobs(args.input, args.voices, config, args.out)
+    except (OSError, ValueError, KeyError) as e:
+        parser.error(f"cannot load jobs from {args.input}: {e}")
+    if not jobs:
+        print(f"No jobs found for {args.input}")
+        return 1
+
+    summary = asyncio.run(run_batch(jobs, config, args.concurrency, args.force))
+
+    os.makedirs(args.out, exist_ok=True)
+    summary_path = os.path.join(args.out, SUMMARY_FILE)
+    with open(summary_path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"{summary['succeeded']} succeeded, {summary['skipped']} skipped, "
+          f"{summary['failed']} failed in {summary['elapsed_seconds']:.1f}s")
+    print(f"Summary saved to {summary_path}")
+    return 1 if summary["failed"] else 0
+
+
+def load_jobs(source, voices, config, out_root):
+    """
+    Build the job list from a directory, glob pattern or manifest file.
+
+    Directory and glob inputs produce one job per text file and voice.
+    Manifest rows define ``text`` and ``voice`` and may set ``rate``,
+    ``pitch``, ``volume`` and ``out``.
+
+    Args:
+        source: Directory, glob pattern or manifest path
+        voices: Voices for directory/glob inputs
+        config: Configuration dictionary
+        out_root: Root output directory
+
+    Returns:
+        list: Job dictionaries
+    """
+    if os.path.isfile(source) and source.endswith((".jsonl", ".csv")):
+        return [
+            make_job(row, config, out_root, os.path.dirname(source))
+            for row in read_manifest(source)
+        ]
+
+    if os.path.isdir(source):
+        paths = sorted(glob.glob(os.path.join(source, "*.txt")))
+    else:
+        paths = sorted(glob.glob(source, recursive=True))
+
+    if not voices:
+        raise ValueError("--lang is required for directory and glob inputs")
+
+    return [
+        make_job({"text": path, "voice": voice}, config, out_root)
+        for path in paths
+        for voice in voices
+    ]
+
+
+def read_manifest(path):
+    """
+    Read job rows from a JSONL or CSV manifest.
+
+    Args:
+        path: Manifest path
+
+    Returns:
+        list: Row dictionaries
+    """
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def make_job(row, config, out_root, base_dir=""):
+    """
+    Normalize a job row and resolve its voice and output directory.
+
+    Args:
+        row: Dictionary with text, voice and optional rate/pitch/volume/out
+        config: Configuration dictionary
+        out_root: Root output directory
+        base_dir: Directory relative text paths are resolved against
+
+    Returns:
+        dict: Job with text_path, voice_key, voice_name, rate, pitch, volume, output_dir
+    """
+    text_path = os.path.join(base_dir, row["text"])
+    voice_key = row["voice"]
+    voice_name = config.get("voices", {}).get(voice_key, {}).get("name", voice_key)
+    stem = os.path.splitext(os.path.basename(text_path))[0]
+
+    return {
+        "id": row.get("out") or f"{stem}/{voice_key}",
+        "text_path": text_path,
+        "voice_key": voice_key,
+        "voice_name": voice_name,
+        "rate": int(row.get("rate") or 0),
+        "pitch": int(row.get("pitch") or 0),
+        "volume": int(row.get("volume") or 0),
+        "output_dir": os.path.join(out_root, row.get("out") or os.path.join(stem, voice_key))
+    }
+
+
+async def run_batch(jobs, config, concurrency, force=False):
+    """
+    Run every job on one event loop with bounded concurrency.
+
+    Args:
+        jobs: Job dictionaries from load_jobs
+        config: Configuration dictionary
+        concurrency: Maximum number of jobs in flight
+        force: Re-render jobs whose outputs already exist
+
+    Returns:
+        dict: Summary report with per-job results
+    """
+    voice_service = VoiceService(config)
+    subtitle_service = SubtitleService(config)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    start_time = time.time()
+    voice_service.warm_up(sorted({job["voice_name"] for job in jobs}))
+
+    async def run_one(job):
+        async with semaphore:
+            return await run_job(job, voice_service, subtitle_service, force)
+
+    try:
+        results = await asyncio.gather(*(run_one(job) for job in jobs))
+    finally:
+        await voice_service.aclose()
+
+    return {
+        "total": len(results),
+        "succeeded": sum(1 for r in results if r["status"] == "succeeded"),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "failed": sum(1 for r in results if r["status"] == "failed"),
+        "elapsed_seconds": time.time() - start_time,
+        "backends": voice_service.backend_stats(),
+        "resilience": voice_service.resilience_metrics(),
+        "jobs": results
+    }
+
+
+async def run_job(job, voice_service, subtitle_service, force=False):
+    """
+    Render a single job, skipping it if its outputs already exist.
+
+    Args:
+        job: Job dictionary from make_job
+        voice_service: Shared VoiceService instance
+        subtitle_service: Shared SubtitleService instance
+        force: Re-render even if the outputs already exist
+
+    Returns:
+        dict: Job result with status, output paths, timing and error message
+    """
+    output_dir = job["output_dir"]
+    srt_path = os.path.join(output_dir, "output.srt")
+    result = {
+        "id": job["id"],
+        "text": job["text_path"],
+        "voice": job["voice_name"],
+        "output_dir": output_dir,
+        "status": "skipped",
+        "seconds": 0.0,
+        "error": None
+    }
+
+    # The SRT file is written last, so its presence marks a completed job
+    if not force and os.path.exists(srt_path):
+        return result
+
+    start_time = time.time()
+    try:
+        with open(job["text_path"], "r", encoding="utf-8") as f:
+            text = f.read()
+        os.makedirs(output_dir, exist_ok=True)
+
+        audio_file, word_boundaries = await voice_service.synthesize_async(
+            text, job["voice_name"], job["rate"], job["pitch"], job["volume"], output_dir
+        )
+
+        # Every subtitle file is moved into place together, the SRT last
+        subtitle_files, _ = subtitle_service.write_subtitle_files(word_boundaries, output_dir)
+
+        result["status"] = "succeeded"
+        result["audio"] = audio_file
+        result["srt"] = srt_path
+        result["subtitles"] = subtitle_files
+        print(f"[done] {job['id']}")
+    except Exception as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        print(f"[failed] {job['id']}: {e}")
+
+    result["seconds"] = time.time() - start_time
+    return result
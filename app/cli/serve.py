@@ -0,0 +1,28 @@
+import argparse
+from app.api import server
+
+
+def main(argv, config):
+    """
+    Run the serve subcommand.
+
+    Args:
+        argv: Command-line arguments following ``serve``
+        config: Loaded configuration dictionary
+
+    Returns:
+        int: Process exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli serve",
+        description="Serve the HTTP API for headless rendering."
+    )
+    parser.add_argument("--host", help=f"Interface to listen on. Defaults to [api] host or {server.DEFAULT_HOST}.")
+    parser.add_argument("--port", type=int, help=f"Port to listen on. Defaults to [api] port or {server.DEFAULT_PORT}.")
+    parser.add_argument("--backend", help="TTS backend to use instead of TTS_BACKEND, e.g. fake for load tests.")
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        config = {**config, "TTS_BACKEND": args.backend}
+    server.run(config, args.host, args.port)
+    return 0
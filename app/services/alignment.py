@@ -0,0 +1,231 @@
+import re
+from itertools import accumulate
+from app.services.timing import WordBoundary
+
+# Ideographs and kana are spoken (and reported by TTS) per word of one or more
+# characters without spaces, so each character is its own token.
+CJK_CHARS = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+
+# An original word (a CJK character or another word run) with the
+# punctuation that follows it, classified in a single findall
+WORD_PATTERN = re.compile(
+    rf'([{CJK_CHARS}]|[^\W{CJK_CHARS}]+)((?:\s*[^\w\s])*)'
+)
+
+# Punctuation marks, used for any that precede the first word
+PUNCTUATION_PATTERN = re.compile(r'[^\w\s]')
+
+# Word characters used to compare TTS words with original tokens
+WORD_CHARS_PATTERN = re.compile(r'\w+')
+
+# How far ahead (in original words and in TTS words) a mismatch may resync
+RESYNC_WINDOW = 8
+
+
+def tokenize_original_text(original_text):
+    """
+    Group the original text into words with their attached punctuation.
+
+    Punctuation is attached to the word before it; punctuation before the
+    first word is attached to it.
+
+    Args:
+        original_text: Original input text
+
+    Returns:
+        tuple: (texts, cores) where texts holds each word with its punctuation
+            and cores holds the lowercased word used for matching
+    """
+    pairs = WORD_PATTERN.findall(original_text)
+    if not pairs:
+        return [], []
+
+    words = [word for word, _ in pairs]
+    texts = [
+        word + ''.join(punctuation.split()) if punctuation else word
+        for word, punctuation in pairs
+    ]
+    first = WORD_PATTERN.search(original_text).start()
+    leading = ''.join(PUNCTUATION_PATTERN.findall(original_text, 0, first))
+    texts[0] = leading + texts[0]
+    return texts, list(map(str.lower, words))
+
+
+class OriginalTextAligner:
+    """
+    Restores punctuation from the original text onto TTS word boundaries,
+    consuming the original words one TTS word at a time.
+
+    A TTS word may cover several original tokens (CJK words, contractions).
+    When TTS and original disagree, e.g. numbers read out or symbols
+    skipped, the aligner searches a bounded window on both sides for the
+    next match instead of drifting: original words in between are skipped
+    or given to the TTS words that spoke them.
+    """
+
+    def __init__(self, original_text, window=RESYNC_WINDOW):
+        """
+        Tokenize the original text.
+
+        Args:
+            original_text: Original input text with punctuation
+            window: Maximum original and TTS words skipped to resync
+        """
+        self.texts, cores = tokenize_original_text(original_text)
+        self.cores = cores
+
+        # All cores concatenated, with the character position where each word
+        # starts and the index of the word starting at each such position
+        self.joined = ''.join(cores)
+        self.starts = [0, *accumulate(map(len, cores))]
+        self.word_at = dict(zip(self.starts, range(len(self.starts))))
+
+        self.index = 0
+        self.window = window
+        self.pending = []
+
+    def align(self, wb):
+        """
+        Align the next TTS word boundary.
+
+        Unmatched words are held back (up to the window size) until the
+        aligner finds where the original text resumes.
+
+        Args:
+            wb: Word boundary from TTS
+
+        Returns:
+            list: Word boundaries with restored punctuation that are now final
+        """
+        if self.index >= len(self.texts):
+            return self.flush() + [wb]
+
+        text = wb.text
+        if text.isalnum():
+            core = text.lower()
+        else:
+            core = ''.join(WORD_CHARS_PATTERN.findall(text)).lower()
+
+        # Fast path: the TTS word spells the next original word(s)
+        if not self.pending:
+            index = self.index
+            if core == self.cores[index]:
+                end = index + 1
+            else:
+                position = self.starts[index]
+                end = -1
+                if core and self.joined.startswith(core, position):
+                    end = self.word_at.get(position + len(core), -1)
+            if end > index:
+                aligned_word = wb.with_text(''.join(self.texts[index:end]))
+                self.index = end
+                return [aligned_word]
+
+        for skip in range(self.window + 1):
+            count = self._match_length(self.index + skip, core)
+            if count:
+                return self._accept(wb, skip, count)
+
+        # No match nearby: hold the word back, the original may resume later
+        self.pending.append(wb)
+        if len(self.pending) > self.window:
+            return self._give_up()
+        return []
+
+    def flush(self):
+        """
+        Release words still held back at the end of the stream.
+
+        Returns:
+            list: Remaining word boundaries
+        """
+        if not self.pending:
+            return []
+        return self._give_up()
+
+    def _accept(self, wb, skip, count):
+        """
+        Emit a matched word, resolving held-back words and skipped original words.
+
+        Args:
+            wb: Matched word boundary
+            skip: Original words skipped before the match
+            count: Original words covered by the match
+
+        Returns:
+            list: Final word boundaries
+        """
+        aligned = []
+        skipped = self.texts[self.index:self.index + skip]
+        prefix = ""
+
+        if self.pending and skipped:
+            # The held-back TTS words spoke the skipped original words
+            aligned.append(self._merge(self.pending, ' '.join(skipped)))
+        else:
+            # Extra TTS words keep their own text; unspoken original words
+            # stay attached to the next spoken one
+            aligned.extend(self.pending)
+            if skipped:
+                prefix = ' '.join(skipped) + ' '
+        self.pending = []
+
+        start = self.index + skip
+        aligned_word = wb.with_text(prefix + ''.join(self.texts[start:start + count]))
+        aligned.append(aligned_word)
+        self.index = start + count
+        return aligned
+
+    def _give_up(self):
+        """
+        Fall back to positional alignment for the held-back words.
+
+        Returns:
+            list: Held-back words, each paired with the next original word
+        """
+        aligned = []
+        for wb in self.pending:
+            if self.index < len(self.texts):
+                aligned_word = wb.with_text(self.texts[self.index])
+                self.index += 1
+                aligned.append(aligned_word)
+            else:
+                aligned.append(wb)
+        self.pending = []
+        return aligned
+
+    def _match_length(self, start, core):
+        """
+        Count the original words starting at ``start`` that spell the TTS word.
+
+        Args:
+            start: Index of the first original word
+            core: Lowercased word characters of the TTS word
+
+        Returns:
+            int: Number of original words covered, or 0 if they do not match
+        """
+        if not core or start >= len(self.cores):
+            return 0
+
+        position = self.starts[start]
+        if not self.joined.startswith(core, position):
+            return 0
+        # The match must end exactly where an original word ends
+        end = self.word_at.get(position + len(core), -1)
+        return end - start if end > start else 0
+
+    @staticmethod
+    def _merge(word_boundaries, text):
+        """
+        Merge consecutive word boundaries into one spanning all of them.
+
+        Args:
+            word_boundaries: Boundaries to merge, in order
+            text: Text of the merged boundary
+
+        Returns:
+            WordBoundary: Merged word boundary
+        """
+        first = word_boundaries[0]
+        return WordBoundary(text, first.offset, word_boundaries[-1].end - first.offset)
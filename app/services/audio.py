@@ -0,0 +1,489 @@
+import os
+import shutil
+import asyncio
+from app.services.silence import DEFAULT_MAX_SILENCE_MS, DEFAULT_SILENCE_THRESHOLD_DB, SilenceTrimmer
+from app.services.timing import TICKS_PER_MILLISECOND
+
+# Base name of the encoded audio. The backend's own audio stays next to it
+# as output.<format>, which the sentence manifest of incremental runs uses.
+ENCODED_NAME = "audio"
+
+# ffmpeg codec and muxer per output format, with the default bitrate
+OUTPUT_FORMATS = {
+    "wav": {"codec": "pcm_s16le", "muxer": "wav", "bitrate": None},
+    "mp3": {"codec": "libmp3lame", "muxer": "mp3", "bitrate": "64k"},
+    "opus": {"codec": "libopus", "muxer": "ogg", "bitrate": "32k"},
+    "m4a": {"codec": "aac", "muxer": "ipod", "bitrate": "64k"},
+}
+
+# EBU R128 single-pass loudness target (integrated LUFS, true peak dBTP, loudness range LU)
+DEFAULT_LOUDNESS = -16.0
+DEFAULT_TRUE_PEAK = -1.5
+DEFAULT_LOUDNESS_RANGE = 11.0
+
+# Rate used when the audio is resampled anyway and sample_rate is not set:
+# loudnorm works at 192 kHz and silence trimming decodes to PCM. It is the
+# rate Edge TTS and Azure produce.
+DEFAULT_SAMPLE_RATE = 24000
+
+# Bytes read per write when a finished file is fed to the encoder, and per
+# read of decoded PCM
+FILE_BLOCK_SIZE = 1024 * 1024
+PCM_BLOCK_SIZE = 256 * 1024
+
+
+class AudioEncoder:
+    """
+    Output stage converting synthesized audio with ffmpeg.
+
+    Backend audio (MP3 from Edge TTS, Azure and the fake backend, WAV from
+    espeak-ng) is piped into a single ffmpeg process per job, which can
+    resample it, normalize its loudness and encode it as WAV, MP3, Opus or
+    M4A. Chunks of long texts are written to the same pipe one after another,
+    so concatenation needs no temporary files.
+
+    With silence trimming, a second ffmpeg process decodes the audio to PCM
+    first. Long silences are then shortened (see SilenceTrimmer) before the
+    PCM is encoded, and word boundaries are moved onto the trimmed timeline.
+    """
+
+    def __init__(self, output_format, ffmpeg_path=None, sample_rate=0, bitrate=None, loudnorm=False,
+                 loudness=DEFAULT_LOUDNESS, true_peak=DEFAULT_TRUE_PEAK,
+                 loudness_range=DEFAULT_LOUDNESS_RANGE, trim_silence=False,
+                 max_silence_ms=DEFAULT_MAX_SILENCE_MS, silence_threshold_db=DEFAULT_SILENCE_THRESHOLD_DB):
+        """
+        Initialize the encoder.
+
+        Args:
+            output_format: Output format, one of OUTPUT_FORMATS
+            ffmpeg_path: ffmpeg executable; defaults to ffmpeg on the PATH
+            sample_rate: Output sample rate in Hz, or 0 to keep the input rate
+            bitrate: Bitrate of lossy formats (e.g. "64k"); defaults per format
+            loudnorm: Normalize the loudness with ffmpeg's loudnorm filter
+            loudness: Integrated loudness target in LUFS
+            true_peak: Maximum true peak in dBTP
+            loudness_range: Loudness range target in LU
+            trim_silence: Shorten silences longer than max_silence_ms
+            max_silence_ms: Longest silence kept by trimming, in milliseconds
+            silence_threshold_db: Peak level in dBFS below which audio counts as silence
+
+        Raises:
+            ValueError: If the output format is not supported
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Unsupported audio format {output_format!r}; use one of {', '.join(OUTPUT_FORMATS)}")
+        self.format = output_format
+        self.ffmpeg_path = ffmpeg_path
+        self.sample_rate = sample_rate
+        self.bitrate = bitrate or OUTPUT_FORMATS[output_format]["bitrate"]
+        self.loudnorm = loudnorm
+        self.loudness = loudness
+        self.true_peak = true_peak
+        self.loudness_range = loudness_range
+        self.trim_silence = trim_silence
+        self.max_silence_ms = max_silence_ms
+        self.silence_threshold_db = silence_threshold_db
+        if trim_silence:
+            # Fail on an unsupported rate here rather than in the middle of a job
+            self.trimmer()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create an encoder from the ``[audio]`` table of the configuration.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            AudioEncoder or None: The encoder, or None if ``format`` is empty
+                and the backend's audio is kept as it is
+
+        Raises:
+            ValueError: If silence trimming is enabled without an output format
+        """
+        audio_config = config.get("audio", {})
+        output_format = audio_config.get("format")
+        if not output_format:
+            if audio_config.get("trim_silence", False):
+                raise ValueError("trim_silence in [audio] needs an output format")
+            return None
+        return cls(
+            output_format,
+            ffmpeg_path=config.get("ffmpeg_path") or None,
+            sample_rate=int(audio_config.get("sample_rate", 0)),
+            bitrate=audio_config.get("bitrate") or None,
+            loudnorm=audio_config.get("loudnorm", False),
+            loudness=audio_config.get("loudness", DEFAULT_LOUDNESS),
+            true_peak=audio_config.get("true_peak", DEFAULT_TRUE_PEAK),
+            loudness_range=audio_config.get("loudness_range", DEFAULT_LOUDNESS_RANGE),
+            trim_silence=audio_config.get("trim_silence", False),
+            max_silence_ms=audio_config.get("max_silence_ms", DEFAULT_MAX_SILENCE_MS),
+            silence_threshold_db=audio_config.get("silence_threshold_db", DEFAULT_SILENCE_THRESHOLD_DB)
+        )
+
+    def executable(self):
+        """
+        Locate the ffmpeg executable.
+
+        Returns:
+            str: Path of the executable
+
+        Raises:
+            RuntimeError: If ffmpeg is not installed
+        """
+        if self.ffmpeg_path:
+            return self.ffmpeg_path
+        path = shutil.which("ffmpeg")
+        if path:
+            return path
+        raise RuntimeError("ffmpeg not found. Install it or set ffmpeg_path in config.toml.")
+
+    def output_path(self, output_dir):
+        """
+        Return the path of the encoded audio in an output directory.
+
+        Args:
+            output_dir: Output directory of the job
+
+        Returns:
+            str: Path of the encoded file
+        """
+        return os.path.join(output_dir, f"{ENCODED_NAME}.{self.format}")
+
+    def pcm_sample_rate(self):
+        """
+        Return the sample rate audio is decoded to for silence trimming.
+
+        Returns:
+            int: Sample rate in Hz
+        """
+        return self.sample_rate or DEFAULT_SAMPLE_RATE
+
+    def trimmer(self):
+        """
+        Create the silence trimmer of one job.
+
+        Returns:
+            SilenceTrimmer: Trimmer for the decoded PCM
+        """
+        return SilenceTrimmer(
+            self.pcm_sample_rate(), self.max_silence_ms * TICKS_PER_MILLISECOND, self.silence_threshold_db)
+
+    def command(self, input_format, output_path):
+        """
+        Build the ffmpeg command line reading audio from stdin.
+
+        Args:
+            input_format: Container of the backend audio ("mp3" or "wav"),
+                or "s16le" for the mono PCM of silence trimming
+            output_path: Path of the encoded file
+
+        Returns:
+            list: Command-line arguments
+        """
+        output = OUTPUT_FORMATS[self.format]
+        args = [self.executable(), "-hide_banner", "-loglevel", "error", "-y", "-f", input_format]
+        if input_format == "s16le":
+            args += ["-ar", str(self.pcm_sample_rate()), "-ac", "1"]
+        args += ["-i", "pipe:0", "-vn"]
+        sample_rate = self.sample_rate
+        if self.loudnorm:
+            args += ["-af", f"loudnorm=I={self.loudness}:TP={self.true_peak}:LRA={self.loudness_range}"]
+            sample_rate = sample_rate or DEFAULT_SAMPLE_RATE
+        if sample_rate:
+            args += ["-ar", str(sample_rate)]
+        args += ["-c:a", output["codec"]]
+        if self.bitrate and output["bitrate"]:
+            args += ["-b:a", self.bitrate]
+        return args + ["-f", output["muxer"], output_path]
+
+    def decode_command(self, input_format):
+        """
+        Build the ffmpeg command line decoding stdin to mono PCM on stdout.
+
+        Args:
+            input_format: Container of the backend audio ("mp3" or "wav")
+
+        Returns:
+            list: Command-line arguments
+        """
+        return [self.executable(), "-hide_banner", "-loglevel", "error",
+                "-f", input_format, "-i", "pipe:0", "-vn",
+                "-ac", "1", "-ar", str(self.pcm_sample_rate()), "-f", "s16le", "pipe:1"]
+
+    async def open(self, input_format, output_dir):
+        """
+        Start the ffmpeg processes writing the encoded audio of a job.
+
+        Args:
+            input_format: Container of the backend audio ("mp3" or "wav")
+            output_dir: Output directory of the job
+
+        Returns:
+            EncoderPipe or TrimmingPipe: Pipe to write the backend audio to
+        """
+        output_path = self.output_path(output_dir)
+        process = await asyncio.create_subprocess_exec(
+            *self.command("s16le" if self.trim_silence else input_format, output_path),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE
+        )
+        pipe = EncoderPipe(process, output_path)
+        if not self.trim_silence:
+            return pipe
+        try:
+            decoder = await asyncio.create_subprocess_exec(
+                *self.decode_command(input_format),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except BaseException:
+            await pipe.abort()
+            raise
+        return TrimmingPipe(decoder, pipe, self.trimmer())
+
+    async def encode(self, input_format, chunks, output_dir, word_boundaries):
+        """
+        Encode audio chunks, concatenated in order, through one ffmpeg pipe.
+
+        Args:
+            input_format: Container of the backend audio ("mp3" or "wav")
+            chunks: Iterable of audio bytes in playback order
+            output_dir: Output directory of the job
+            word_boundaries: Word boundaries of the audio
+
+        Returns:
+            tuple: (encoded_file_path, word_boundaries on the encoded audio's timeline)
+        """
+        pipe = await self.open(input_format, output_dir)
+        try:
+            for data in chunks:
+                await pipe.write(data)
+            return await pipe.close(), pipe.rewrite(word_boundaries)
+        finally:
+            await pipe.abort()
+
+    async def encode_file(self, input_format, audio_file, output_dir, word_boundaries):
+        """
+        Encode a finished audio file.
+
+        Args:
+            input_format: Container of the audio file ("mp3" or "wav")
+            audio_file: Path of the backend audio
+            output_dir: Output directory of the job
+            word_boundaries: Word boundaries of the audio
+
+        Returns:
+            tuple: (encoded_file_path, word_boundaries on the encoded audio's timeline)
+        """
+        with open(audio_file, "rb") as f:
+            return await self.encode(
+                input_format, iter(lambda: f.read(FILE_BLOCK_SIZE), b""), output_dir, word_boundaries)
+
+
+class EncoderPipe:
+    """
+    Running ffmpeg process of AudioEncoder.open.
+
+    Audio written to the pipe is encoded while it arrives; close() waits for
+    the encoded file. abort() stops the process unless it was closed, so
+    callers can call it unconditionally in a ``finally`` block.
+    """
+
+    def __init__(self, process, output_path):
+        """
+        Initialize the pipe.
+
+        Args:
+            process: asyncio subprocess reading audio on stdin
+            output_path: Path of the encoded file
+        """
+        self.process = process
+        self.output_path = output_path
+        # ffmpeg's messages are collected while it runs so a full stderr pipe cannot stall it
+        self._stderr = asyncio.ensure_future(process.stderr.read())
+
+    async def write(self, data):
+        """
+        Write backend audio to ffmpeg.
+
+        Args:
+            data: Audio bytes
+
+        Raises:
+            RuntimeError: If ffmpeg exited early
+        """
+        try:
+            self.process.stdin.write(data)
+            await self.process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            await _raise_exit_error(self.process, self._stderr)
+
+    async def close(self):
+        """
+        Finish the input and wait for ffmpeg to write the encoded file.
+
+        Returns:
+            str: Path of the encoded file
+
+        Raises:
+            RuntimeError: If ffmpeg failed
+        """
+        try:
+            self.process.stdin.close()
+            await self.process.stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        if await self.process.wait() != 0:
+            await _raise_exit_error(self.process, self._stderr)
+        await self._stderr
+        return self.output_path
+
+    def rewrite(self, word_boundaries):
+        """
+        Return word boundaries on the encoded audio's timeline, which is unchanged.
+
+        Args:
+            word_boundaries: List of WordBoundary
+
+        Returns:
+            list: The same word boundaries
+        """
+        return word_boundaries
+
+    async def abort(self):
+        """Stop ffmpeg if it is still running and remove the partial output."""
+        if self.process.returncode is not None:
+            return
+        self.process.kill()
+        await self.process.wait()
+        self._stderr.cancel()
+        try:
+            os.remove(self.output_path)
+        except OSError:
+            pass
+
+
+class TrimmingPipe:
+    """
+    Running ffmpeg processes of AudioEncoder.open with silence trimming.
+
+    Audio written to the pipe is decoded to PCM by one ffmpeg process; a
+    task reads the PCM, trims it and writes it to the encoding EncoderPipe.
+    It has the interface of EncoderPipe.
+    """
+
+    def __init__(self, decoder, encoder, trimmer):
+        """
+        Initialize the pipe.
+
+        Args:
+            decoder: asyncio subprocess decoding stdin to PCM on stdout
+            encoder: EncoderPipe reading PCM
+            trimmer: SilenceTrimmer for the PCM
+        """
+        self.decoder = decoder
+        self.encoder = encoder
+        self.trimmer = trimmer
+        self.output_path = encoder.output_path
+        self._stderr = asyncio.ensure_future(decoder.stderr.read())
+        self._pump = asyncio.ensure_future(self._trim())
+
+    async def write(self, data):
+        """
+        Write backend audio to the decoder.
+
+        Args:
+            data: Audio bytes
+
+        Raises:
+            RuntimeError: If ffmpeg exited early
+        """
+        try:
+            self.decoder.stdin.write(data)
+            await self.decoder.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            if self._pump.done() and self._pump.exception():
+                # The encoder failed and the decoder was stopped because of it
+                self._pump.result()
+            await _raise_exit_error(self.decoder, self._stderr)
+
+    async def close(self):
+        """
+        Finish the input and wait for the trimmed audio to be encoded.
+
+        Returns:
+            str: Path of the encoded file
+
+        Raises:
+            RuntimeError: If ffmpeg failed
+        """
+        try:
+            self.decoder.stdin.close()
+            await self.decoder.stdin.wait_closed()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        await self._pump
+        if await self.decoder.wait() != 0:
+            await _raise_exit_error(self.decoder, self._stderr)
+        await self._stderr
+        return await self.encoder.close()
+
+    async def abort(self):
+        """Stop both ffmpeg processes if they are still running and remove the partial output."""
+        if self.decoder.returncode is None:
+            self.decoder.kill()
+            await self.decoder.wait()
+            self._stderr.cancel()
+        self._pump.cancel()
+        if self._pump.done() and not self._pump.cancelled():
+            # Retrieve an error that close() did not raise
+            self._pump.exception()
+        await self.encoder.abort()
+
+    def rewrite(self, word_boundaries):
+        """
+        Move word boundaries onto the trimmed audio's timeline.
+
+        Args:
+            word_boundaries: List of WordBoundary on the backend audio's timeline
+
+        Returns:
+            list: WordBoundary records on the encoded audio's timeline
+        """
+        return self.trimmer.rewrite(word_boundaries)
+
+    async def _trim(self):
+        """Feed the decoded PCM through the trimmer into the encoder."""
+        try:
+            while True:
+                pcm = await self.decoder.stdout.read(PCM_BLOCK_SIZE)
+                if not pcm:
+                    break
+                await self.encoder.write(self.trimmer.process(pcm))
+            await self.encoder.write(self.trimmer.flush())
+        except Exception:
+            # Unblock writers waiting for the decoder to take more input
+            if self.decoder.returncode is None:
+                self.decoder.kill()
+            raise
+
+
+async def _raise_exit_error(process, stderr):
+    """
+    Wait for an ffmpeg process to exit and raise its error message.
+
+    Args:
+        process: asyncio subprocess
+        stderr: Task reading the process's stderr
+
+    Raises:
+        RuntimeError: Always
+    """
+    returncode = await process.wait()
+    message = (await stderr).decode("utf-8", "replace").strip()
+    raise RuntimeError(f"ffmpeg exited with {returncode}: {message}")
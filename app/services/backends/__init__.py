@@ -0,0 +1,10 @@
+from app.services.backends.base import (
+    BACKENDS,
+    TTSBackend,
+    create_backend,
+    mp3_duration_ticks,
+    register_backend,
+)
+
+# Import the built-in backends so they register themselves
+from app.services.backends import azure, edge, espeak, fake
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+from datetime import timedelta
+import azure.cognitiveservices.speech as speechsdk
+from app.services.backends.base import TTSBackend, register_backend
+from app.services.backends.azure_pool import AzureSynthesizerPool
+from app.services.timing import TICKS_PER_MICROSECOND, WordBoundary
+
+# Resolution of the durations the SDK reports as timedelta
+MICROSECOND = timedelta(microseconds=1)
+
+
+@register_backend
+class AzureBackend(TTSBackend):
+    """
+    Azure Cognitive Services Speech, streamed as 48 kbps MP3.
+
+    Synthesizers are borrowed from a process-wide AzureSynthesizerPool, so
+    requests skip the SDK setup and connection handshake after the first.
+    Audio is pushed out chunk by chunk while the service renders it, so a
+    long document never has to be held in memory as a whole.
+    """
+
+    name = "azure"
+    display_name = "Azure TTS"
+    fallback = "edge"
+
+    def __init__(self, config):
+        """
+        Initialize the backend with the shared synthesizer pool.
+
+        Args:
+            config: Configuration dictionary
+        """
+        super().__init__(config)
+        self.pool = AzureSynthesizerPool.shared(config)
+
+    async def stream(self, text, voice_name, rate, pitch, volume):
+        """
+        Stream Azure audio and word boundaries as the service produces them.
+
+        The SDK runs the request on its own threads and calls back with audio
+        chunks and word boundary events; both are handed to the event loop in
+        arrival order. If the consumer stops early, the request is stopped.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Azure voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+
+        Yields:
+            dict: Audio or WordBoundary items in playback order
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stopped = threading.Event()
+        current = {}
+
+        def put(item):
+            if not stopped.is_set():
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        def on_audio(data):
+            put({"type": "audio", "data": data})
+
+        def on_word_boundary(evt):
+            put({"type": "WordBoundary", "boundary": word_boundary(evt)})
+
+        def run():
+            with self.pool.synthesizer(voice_name) as pooled:
+                current["synthesizer"] = pooled.synthesizer
+                self.speak(pooled, build_ssml(text, voice_name, rate, pitch, volume),
+                           on_audio, on_word_boundary)
+
+        task = asyncio.ensure_future(asyncio.to_thread(run))
+        # Runs after every item the SDK threads scheduled before the request ended
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                yield item
+            await task
+        finally:
+            if not task.done():
+                stopped.set()
+                if "synthesizer" in current:
+                    current["synthesizer"].stop_speaking_async()
+                await asyncio.gather(task, return_exceptions=True)
+
+    @staticmethod
+    def speak(pooled, ssml, on_audio, on_word_boundary):
+        """
+        Run one request on a pooled synthesizer, blocking until it ends.
+
+        Args:
+            pooled: PooledSynthesizer borrowed for the request
+            ssml: SSML document to synthesize
+            on_audio: Called with every MP3 chunk
+            on_word_boundary: Called with every word boundary event
+
+        Raises:
+            Exception: If the synthesis does not complete
+        """
+        synthesizer = pooled.synthesizer
+        # Connect the callbacks for this request only
+        pooled.output.target = on_audio
+        synthesizer.synthesis_word_boundary.connect(on_word_boundary)
+        try:
+            result = synthesizer.speak_ssml_async(ssml).get()
+        finally:
+            pooled.output.target = None
+            synthesizer.synthesis_word_boundary.disconnect_all()
+
+        if result.reason != speechsdk.ResultReason.SynthesizingAudioCompleted:
+            # Raising discards the synthesizer instead of returning it to the pool
+            details = getattr(result.cancellation_details, "error_details", "")
+            raise Exception(f"Azure TTS synthesis failed: {result.reason} {details}".rstrip())
+
+    def warm_up(self, voice_names):
+        """
+        Pre-connect synthesizers for the voices.
+
+        Args:
+            voice_names: Azure voice names
+        """
+        self.pool.warm_up(voice_names)
+
+    def stats(self):
+        """
+        Report synthesizer pool statistics.
+
+        Returns:
+            dict: Created and reused synthesizer counts
+        """
+        return self.pool.stats()
+
+
+def build_ssml(text, voice_name, rate, pitch, volume):
+    """
+    Create the SSML document for a request with voice parameters.
+
+    Args:
+        text: Input text to synthesize
+        voice_name: Azure voice name
+        rate: Speech rate adjustment percentage
+        pitch: Pitch adjustment percentage
+        volume: Volume adjustment percentage
+
+    Returns:
+        str: SSML document
+    """
+    return f"""
+        <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>
+            <voice name='{voice_name}'>
+                <mstts:express-as style='general'>
+                    <prosody rate='{rate}%' pitch='{pitch}%' volume='{volume}%'>
+                        {text}
+                    </prosody>
+                </mstts:express-as>
+            </voice>
+        </speak>
+        """
+
+
+def word_boundary(evt):
+    """
+    Convert an Azure word boundary event.
+
+    The SDK reports ``audio_offset`` in 100-nanosecond ticks like the
+    internal timeline and ``duration`` as a ``datetime.timedelta``.
+
+    Args:
+        evt: SpeechSynthesisWordBoundaryEventArgs
+
+    Returns:
+        WordBoundary: Boundary in ticks
+    """
+    return WordBoundary(evt.text, int(evt.audio_offset), evt.duration // MICROSECOND * TICKS_PER_MICROSECOND)
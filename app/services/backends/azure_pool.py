@@ -0,0 +1,262 @@
+import threading
+import contextlib
+import azure.cognitiveservices.speech as speechsdk
+
+# Pool defaults (overridable in config.toml)
+DEFAULT_POOL_SIZE = 4
+
+# Pools shared by all AzureBackend instances of the process, by (key, region)
+_SHARED_POOLS = {}
+_SHARED_POOLS_LOCK = threading.Lock()
+
+
+class AudioForwarder(speechsdk.audio.PushAudioOutputStreamCallback):
+    """
+    Push stream callback passing a synthesizer's audio to the current request.
+
+    A synthesizer writes to the same output stream for its whole life, so
+    each request sets ``target`` to its own chunk handler while it runs.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.target = None
+
+    def write(self, audio_buffer):
+        """Forward an audio chunk produced by the synthesizer."""
+        if self.target is not None:
+            self.target(bytes(audio_buffer))
+        return audio_buffer.nbytes
+
+
+class PooledSynthesizer:
+    """A pooled Azure synthesizer with its connection and audio output."""
+
+    def __init__(self, voice_name, synthesizer, connection, output):
+        """
+        Bundle the SDK objects of one synthesizer.
+
+        Args:
+            voice_name: Azure voice name
+            synthesizer: speechsdk.SpeechSynthesizer
+            connection: speechsdk.Connection of the synthesizer
+            output: AudioForwarder receiving the synthesized MP3 audio
+        """
+        self.voice_name = voice_name
+        self.synthesizer = synthesizer
+        self.connection = connection
+        self.output = output
+
+    def close(self):
+        """Close the connection of a synthesizer that leaves the pool."""
+        self.output.target = None
+        try:
+            self.connection.close()
+        except Exception as e:
+            print(f"Failed to close the Azure connection of {self.voice_name}: {e}")
+
+
+class AzureSynthesizerPool:
+    """
+    Thread-safe pool of connected Azure speech synthesizers, kept per voice.
+
+    Creating a SpeechConfig and SpeechSynthesizer and connecting it to the
+    service adds setup latency to the first audio byte of every request.
+    Synthesizers are therefore created once, pre-connected with
+    ``Connection.open`` and reused by later requests for the same voice.
+    They produce 48 kbps MP3, the format of Edge TTS, into a push stream.
+
+    At most ``size`` synthesizers exist at once. Requests beyond that wait
+    for a synthesizer to be released; an idle synthesizer of another voice
+    is discarded when a new voice needs room. Discarded synthesizers have
+    their connection closed. One pool is shared by every VoiceService of
+    the process (GUI sessions, batch workers), so it is safe to use from
+    several threads.
+    """
+
+    def __init__(self, key, region, size=DEFAULT_POOL_SIZE):
+        """
+        Initialize an empty pool.
+
+        Args:
+            key: Azure Speech subscription key
+            region: Azure Speech region
+            size: Maximum number of synthesizers
+        """
+        self.key = key
+        self.region = region
+        self.size = max(1, size)
+        self.created = 0
+        self.reused = 0
+        self._in_use = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.size)
+        # Idle PooledSynthesizers, least recently used first
+        self._idle = []
+
+    @classmethod
+    def shared(cls, config):
+        """
+        Return the process-wide pool for the configured Azure credentials.
+
+        A pool of another ``azure_pool_size`` (e.g. before the configuration
+        was edited) is replaced and closed; synthesizers it has lent out are
+        closed when they are returned.
+
+        Args:
+            config: Configuration dictionary with the Azure credentials
+
+        Returns:
+            AzureSynthesizerPool: Shared pool
+        """
+        key = (config.get("AZURE_KEY"), config.get("AZURE_REGION"))
+        size = max(1, config.get("azure_pool_size", DEFAULT_POOL_SIZE))
+        with _SHARED_POOLS_LOCK:
+            pool = _SHARED_POOLS.get(key)
+            if pool is not None and pool.size == size:
+                return pool
+            _SHARED_POOLS[key] = cls(*key, size)
+        if pool is not None:
+            pool.close()
+        return _SHARED_POOLS[key]
+
+    @contextlib.contextmanager
+    def synthesizer(self, voice_name):
+        """
+        Borrow a connected synthesizer for a voice.
+
+        Blocks while all synthesizers are in use. A synthesizer whose request
+        raised is discarded instead of being returned to the pool.
+
+        Args:
+            voice_name: Azure voice name
+
+        Yields:
+            PooledSynthesizer: Synthesizer for the voice
+        """
+        self._slots.acquire()
+        entry = None
+        healthy = False
+        try:
+            entry = self._take(voice_name)
+            yield entry
+            healthy = True
+        finally:
+            self._put_back(entry, healthy)
+
+    def warm_up(self, voice_names):
+        """
+        Create and pre-connect a synthesizer for each voice that has none idle.
+
+        Connections are opened in the background; this returns as soon as
+        the synthesizers are created. Voices that do not fit into the pool
+        are skipped.
+
+        Args:
+            voice_names: Azure voice names
+        """
+        for voice_name in voice_names:
+            with self._lock:
+                if any(entry.voice_name == voice_name for entry in self._idle):
+                    continue
+            if not self._slots.acquire(blocking=False):
+                return
+            entry = None
+            try:
+                entry = self._take(voice_name)
+            finally:
+                self._put_back(entry, entry is not None)
+
+    def close(self):
+        """Close the idle synthesizers, and the borrowed ones once they are returned."""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for entry in idle:
+            entry.close()
+
+    def stats(self):
+        """
+        Report how many synthesizers were created and reused.
+
+        Returns:
+            dict: Created and reused counts and the number of idle synthesizers
+        """
+        with self._lock:
+            return {"created": self.created, "reused": self.reused, "idle": len(self._idle)}
+
+    def _take(self, voice_name):
+        """
+        Remove an idle synthesizer for the voice from the pool or create one.
+
+        The caller must hold a slot.
+
+        Args:
+            voice_name: Azure voice name
+
+        Returns:
+            PooledSynthesizer: Synthesizer for the voice
+        """
+        evicted = None
+        with self._lock:
+            self._in_use += 1
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i].voice_name == voice_name:
+                    self.reused += 1
+                    return self._idle.pop(i)
+            # Make room for the new synthesizer by dropping the least recently used one
+            if self._in_use + len(self._idle) > self.size:
+                evicted = self._idle.pop(0)
+            self.created += 1
+
+        if evicted is not None:
+            evicted.close()
+        try:
+            return self._create(voice_name)
+        except BaseException:
+            with self._lock:
+                self._in_use -= 1
+            raise
+
+    def _put_back(self, entry, healthy):
+        """
+        Return a borrowed synthesizer and its slot to the pool.
+
+        Args:
+            entry: PooledSynthesizer from _take, or None if taking failed
+            healthy: Whether the synthesizer can be reused
+        """
+        discarded = None
+        with self._lock:
+            if entry is not None:
+                self._in_use -= 1
+                if healthy and not self._closed:
+                    self._idle.append(entry)
+                else:
+                    discarded = entry
+        self._slots.release()
+        if discarded is not None:
+            discarded.close()
+
+    def _create(self, voice_name):
+        """
+        Create a synthesizer for the voice and start connecting it.
+
+        Args:
+            voice_name: Azure voice name
+
+        Returns:
+            PooledSynthesizer: New synthesizer
+        """
+        speech_config = speechsdk.SpeechConfig(subscription=self.key, region=self.region)
+        speech_config.speech_synthesis_voice_name = voice_name
+        speech_config.set_speech_synthesis_output_format(
+            speechsdk.SpeechSynthesisOutputFormat.Audio24Khz48KBitRateMonoMp3)
+        output = AudioForwarder()
+        audio_config = speechsdk.audio.AudioOutputConfig(
+            stream=speechsdk.audio.PushAudioOutputStream(output))
+        synthesizer = speechsdk.SpeechSynthesizer(speech_config=speech_config, audio_config=audio_config)
+        connection = speechsdk.Connection.from_speech_synthesizer(synthesizer)
+        connection.open(True)
+        return PooledSynthesizer(voice_name, synthesizer, connection, output)
@@ -0,0 +1,207 @@
+import re
+import importlib
+from app.services.alignment import CJK_CHARS
+from app.services.timing import TICKS_PER_SECOND
+
+# Edge TTS output format is audio-24khz-48kbitrate-mono-mp3
+EDGE_MP3_BITRATE = 48000
+
+# Spoken words: Latin-script words (with apostrophes) or runs of up to two
+# CJK characters, the way Edge TTS reports Chinese and Japanese words.
+# Punctuation directly following a word is captured to place pauses.
+SPOKEN_WORD_PATTERN = re.compile(
+    rf"(?:(?P<cjk>[{CJK_CHARS}]{{1,2}})|(?P<latin>[^\W{CJK_CHARS}]+(?:['’][^\W{CJK_CHARS}]+)*))"
+    r"(?P<punct>[^\w\s]*)"
+)
+
+# Registered backend classes by name
+BACKENDS = {}
+
+
+def register_backend(backend_class):
+    """
+    Class decorator adding a backend to the registry under its ``name``.
+
+    Args:
+        backend_class: TTSBackend subclass
+
+    Returns:
+        type: The backend class, unchanged
+    """
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+
+def create_backend(name, config):
+    """
+    Instantiate a TTS backend by name.
+
+    Names of the form ``package.module:ClassName`` are imported, so engines
+    living outside this package can be selected from the configuration
+    without being registered here.
+
+    Args:
+        name: Registered backend name or import path
+        config: Configuration dictionary
+
+    Returns:
+        TTSBackend: Backend instance
+
+    Raises:
+        ValueError: If no backend is registered under the name
+    """
+    if ":" in name:
+        module_name, class_name = name.split(":", 1)
+        backend_class = getattr(importlib.import_module(module_name), class_name)
+    elif name in BACKENDS:
+        backend_class = BACKENDS[name]
+    else:
+        raise ValueError(
+            f"Unknown TTS backend '{name}'. Available backends: {', '.join(sorted(BACKENDS))}")
+    return backend_class(config)
+
+
+class TTSBackend:
+    """
+    Base class of the TTS engines used by VoiceService.
+
+    Streaming backends implement ``stream`` and produce audio that can be
+    concatenated byte-wise (e.g. MP3 frames), so VoiceService may split long
+    texts into chunks and synthesize them concurrently. Other backends
+    implement ``synthesize`` and return a complete audio file at once.
+
+    Word boundaries are WordBoundary records with offsets and durations in
+    integer 100-nanosecond ticks, whatever unit the engine reports.
+    """
+
+    # Registry name, selected with TTS_BACKEND in config.toml
+    name = None
+    # Name used in log messages
+    display_name = None
+    # Extension of the produced audio files
+    audio_format = "mp3"
+    # Whether the backend implements ``stream`` with concatenable audio
+    streaming = True
+    # Backend to use if this one fails before producing output
+    fallback = None
+
+    def __init__(self, config):
+        """
+        Initialize the backend.
+
+        Args:
+            config: Configuration dictionary
+        """
+        self.config = config
+
+    async def stream(self, text, voice_name, rate, pitch, volume):
+        """
+        Yield audio and word boundaries as they are synthesized.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+
+        Yields:
+            dict: ``{"type": "audio", "data": bytes}`` or
+                ``{"type": "WordBoundary", "boundary": WordBoundary}`` items
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support streaming")
+        yield  # Makes this an async generator like the overrides
+
+    async def synthesize(self, text, voice_name, rate, pitch, volume):
+        """
+        Synthesize a complete text into memory.
+
+        The default implementation collects ``stream``.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+
+        Returns:
+            tuple: (audio_bytes, word_boundaries)
+        """
+        audio = bytearray()
+        word_boundaries = []
+        async for item in self.stream(text, voice_name, rate, pitch, volume):
+            if item["type"] == "audio":
+                audio.extend(item["data"])
+            elif item["type"] == "WordBoundary":
+                word_boundaries.append(item["boundary"])
+        return bytes(audio), word_boundaries
+
+    def duration_ticks(self, audio_data):
+        """
+        Compute the playback duration of audio produced by this backend.
+
+        Used to shift the word boundaries of consecutive chunks onto one
+        timeline. The default assumes 48 kbps constant-bitrate MP3.
+
+        Args:
+            audio_data: Audio bytes
+
+        Returns:
+            int: Duration in 100-nanosecond ticks
+        """
+        return mp3_duration_ticks(len(audio_data))
+
+    def warm_up(self, voice_names):
+        """
+        Prepare the backend for requests with the given voices, e.g. by connecting ahead of time.
+
+        Args:
+            voice_names: Voice names expected to be used
+        """
+
+    def stats(self):
+        """
+        Report backend statistics, such as connection reuse.
+
+        Returns:
+            dict or None: Statistics, or None if the backend keeps none
+        """
+        return None
+
+    async def aclose(self):
+        """Release network connections and other resources held by the backend."""
+
+
+def mp3_duration_ticks(byte_count):
+    """
+    Compute the duration of Edge TTS audio from its size.
+
+    Edge TTS always returns 48 kbps constant-bitrate MP3, so the duration in
+    100-nanosecond ticks follows directly from the byte count.
+
+    Args:
+        byte_count: Number of MP3 bytes
+
+    Returns:
+        int: Duration in 100-nanosecond ticks
+    """
+    return byte_count * 8 * TICKS_PER_SECOND // EDGE_MP3_BITRATE
+
+
+def iter_spoken_words(text):
+    """
+    Split text into the words a TTS engine reports boundaries for.
+
+    Args:
+        text: Input text
+
+    Yields:
+        tuple: (word, is_cjk, trailing_punctuation)
+    """
+    for match in SPOKEN_WORD_PATTERN.finditer(text):
+        word = match.group("cjk")
+        if word:
+            yield word, True, match.group("punct")
+        else:
+            yield match.group("latin"), False, match.group("punct")
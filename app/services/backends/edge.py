@@ -0,0 +1,137 @@
+import edge_tts
+from app.services.backends.base import TTSBackend, register_backend
+from app.services.backends.edge_pool import EdgeConnectionPool
+from app.services.timing import WordBoundary
+
+
+@register_backend
+class EdgeBackend(TTSBackend):
+    """
+    Free Microsoft Edge online TTS service, streamed as 48 kbps MP3.
+
+    Requests are sent over a pool of warm WebSocket connections (see
+    EdgeConnectionPool) unless ``edge_pool_size`` is 0, in which case every
+    request opens its own connection through ``edge_tts.Communicate``.
+    """
+
+    name = "edge"
+    display_name = "Edge TTS"
+
+    def __init__(self, config):
+        """
+        Initialize the backend and its connection pool.
+
+        Args:
+            config: Configuration dictionary
+        """
+        super().__init__(config)
+        self.pool = EdgeConnectionPool.from_config(config)
+
+    async def stream(self, text, voice_name, rate, pitch, volume):
+        """
+        Stream Edge TTS audio and word boundaries for a single request.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Edge TTS voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+
+        Yields:
+            dict: Audio or WordBoundary items in playback order
+        """
+        communicate = self.communicate(text, voice_name, rate, pitch, volume)
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                yield {"type": "audio", "data": chunk["data"]}
+            elif chunk["type"] == "WordBoundary":
+                if "boundary" in chunk:
+                    # The connection pool and the fake engine produce records already
+                    yield chunk
+                else:
+                    # edge_tts.Communicate reports flat dicts, in ticks
+                    yield {
+                        "type": "WordBoundary",
+                        "boundary": WordBoundary(chunk["text"], chunk["offset"], chunk["duration"])
+                    }
+
+    def communicate(self, text, voice_name, rate, pitch, volume):
+        """
+        Create an Edge TTS communicate instance with formatted voice parameters.
+
+        Args:
+            text: Text to synthesize
+            voice_name: Edge TTS voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+
+        Returns:
+            PooledCommunicate or edge_tts.Communicate: Communicate instance for the text
+        """
+        # Format parameters for Edge TTS
+        rate_str = f'+{rate}%' if rate >= 0 else f'{rate}%'
+        pitch_str = f'+{pitch}Hz' if pitch >= 0 else f'{pitch}Hz'
+        volume_str = f'+{volume}%' if volume >= 0 else f'{volume}%'
+
+        if self.pool:
+            return PooledCommunicate(self.pool, text, voice_name, rate_str, pitch_str, volume_str)
+
+        return edge_tts.Communicate(
+            text,
+            voice_name,
+            rate=rate_str,
+            pitch=pitch_str,
+            volume=volume_str,
+            boundary="WordBoundary"
+        )
+
+    def stats(self):
+        """
+        Report connection pool statistics.
+
+        Returns:
+            dict or None: Pool statistics, or None if pooling is disabled
+        """
+        return self.pool.stats() if self.pool else None
+
+    async def aclose(self):
+        """Close the pooled connections."""
+        if self.pool:
+            await self.pool.close()
+
+
+class PooledCommunicate:
+    """``edge_tts.Communicate`` counterpart sending its request over a connection pool."""
+
+    def __init__(self, pool, text, voice, rate, pitch, volume):
+        """
+        Initialize the request.
+
+        Args:
+            pool: EdgeConnectionPool to use
+            text: Text to synthesize
+            voice: Edge TTS voice name
+            rate: Formatted rate, e.g. "+10%"
+            pitch: Formatted pitch, e.g. "-5Hz"
+            volume: Formatted volume, e.g. "+0%"
+        """
+        self.pool = pool
+        self.text = text
+        self.voice = voice
+        self.rate = rate
+        self.pitch = pitch
+        self.volume = volume
+
+    def stream(self):
+        """
+        Yield audio and WordBoundary items like ``edge_tts.Communicate.stream``.
+
+        Word boundaries arrive as WordBoundary records under ``"boundary"``
+        rather than as flat dicts.
+
+        Returns:
+            AsyncGenerator: Audio and WordBoundary items in playback order
+        """
+        return self.pool.stream(self.text, self.voice, self.rate, self.pitch, self.volume)
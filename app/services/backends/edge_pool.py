@@ -0,0 +1,387 @@
+import ssl
+import json
+import time
+import asyncio
+from xml.sax.saxutils import escape, unescape
+import aiohttp
+import certifi
+from edge_tts.communicate import (
+    connect_id,
+    date_to_string,
+    mkssml,
+    remove_incompatible_characters,
+    split_text_by_byte_length,
+    ssml_headers_plus_data,
+)
+from edge_tts.constants import SEC_MS_GEC_VERSION, WSS_HEADERS, WSS_URL
+from edge_tts.data_classes import TTSConfig
+from edge_tts.drm import DRM
+from app.services.backends.base import mp3_duration_ticks
+from app.services.timing import WordBoundary
+
+# Pool defaults (overridable in config.toml)
+DEFAULT_POOL_SIZE = 4
+DEFAULT_IDLE_SECONDS = 30
+# The Sec-MS-GEC token in the connection URL is only valid for a few minutes
+DEFAULT_MAX_AGE_SECONDS = 240
+
+# Edge splits requests into pieces of at most this many UTF-8 bytes
+MAX_REQUEST_BYTES = 4096
+
+SSL_CONTEXT = ssl.create_default_context(cafile=certifi.where())
+
+
+class EdgeConnection:
+    """
+    One open WebSocket to the Edge TTS service.
+
+    A connection handles one synthesis turn at a time and can be reused for
+    further turns once the previous one has ended.
+    """
+
+    def __init__(self, websocket, created):
+        """
+        Wrap an open WebSocket.
+
+        Args:
+            websocket: aiohttp ClientWebSocketResponse
+            created: Monotonic time the connection was opened
+        """
+        self.websocket = websocket
+        self.created = created
+        self.last_used = created
+        self.configured = False
+
+    def is_stale(self, now, idle_seconds, max_age_seconds):
+        """
+        Check whether the connection should be recycled instead of reused.
+
+        Args:
+            now: Current monotonic time
+            idle_seconds: Maximum time since the last turn
+            max_age_seconds: Maximum time since the connection was opened
+
+        Returns:
+            bool: True if the connection is closed, idle too long or too old
+        """
+        return (
+            self.websocket.closed
+            or now - self.last_used > idle_seconds
+            or now - self.created > max_age_seconds
+        )
+
+    async def synthesize(self, tts_config, escaped_text):
+        """
+        Run one synthesis turn and yield its audio and word boundaries.
+
+        Args:
+            tts_config: edge_tts TTSConfig with the voice parameters
+            escaped_text: XML-escaped text of at most MAX_REQUEST_BYTES bytes
+
+        Yields:
+            dict: Audio or WordBoundary items with offsets relative to the turn
+
+        Raises:
+            ConnectionError: If the connection closes before the turn ends
+        """
+        websocket = self.websocket
+        if not self.configured:
+            await websocket.send_str(
+                f"X-Timestamp:{date_to_string()}\r\n"
+                "Content-Type:application/json; charset=utf-8\r\n"
+                "Path:speech.config\r\n\r\n"
+                '{"context":{"synthesis":{"audio":{"metadataoptions":{'
+                '"sentenceBoundaryEnabled":"false","wordBoundaryEnabled":"true"'
+                "},"
+                '"outputFormat":"audio-24khz-48kbitrate-mono-mp3"'
+                "}}}}\r\n"
+            )
+            self.configured = True
+
+        await websocket.send_str(ssml_headers_plus_data(
+            connect_id(), date_to_string(), mkssml(tts_config, escaped_text)))
+
+        async for received in websocket:
+            if received.type == aiohttp.WSMsgType.TEXT:
+                headers, _, body = received.data.partition("\r\n\r\n")
+                path = _header(headers, "Path")
+                if path == "audio.metadata":
+                    for metadata in json.loads(body)["Metadata"]:
+                        if metadata["Type"] == "WordBoundary":
+                            data = metadata["Data"]
+                            yield {
+                                "type": "WordBoundary",
+                                "boundary": WordBoundary(
+                                    unescape(data["text"]["Text"]), data["Offset"], data["Duration"])
+                            }
+                elif path == "turn.end":
+                    self.last_used = time.monotonic()
+                    return
+            elif received.type == aiohttp.WSMsgType.BINARY:
+                header_length = int.from_bytes(received.data[:2], "big")
+                headers = received.data[2:2 + header_length].decode("utf-8", "replace")
+                audio = received.data[2 + header_length:]
+                if _header(headers, "Path") == "audio" and audio:
+                    yield {"type": "audio", "data": audio}
+            elif received.type == aiohttp.WSMsgType.ERROR:
+                raise ConnectionError(f"Edge TTS connection failed: {received.data}")
+
+        raise ConnectionError("Edge TTS connection closed before the turn ended")
+
+    async def close(self):
+        """Close the WebSocket."""
+        await self.websocket.close()
+
+
+class EdgeConnectionPool:
+    """
+    Pool of warm WebSocket connections to the Edge TTS service.
+
+    Opening a connection costs a TLS and WebSocket handshake, which for
+    cue-length texts takes as long as the synthesis itself. Connections are
+    therefore kept open after a turn and reused by later requests. At most
+    ``size`` connections are open at once; connections idle for longer
+    than ``idle_seconds`` or older than ``max_age_seconds`` are recycled.
+
+    The pool belongs to one event loop. When it is used from a new loop
+    (e.g. a later ``asyncio.run``) it starts over with fresh connections.
+    """
+
+    def __init__(self, url=WSS_URL, size=DEFAULT_POOL_SIZE, idle_seconds=DEFAULT_IDLE_SECONDS,
+                 max_age_seconds=DEFAULT_MAX_AGE_SECONDS):
+        """
+        Initialize an empty pool.
+
+        Args:
+            url: WebSocket URL of the service
+            size: Maximum number of open connections
+            idle_seconds: Idle time after which a connection is recycled;
+                0 closes every connection after its turn
+            max_age_seconds: Age after which a connection is recycled
+        """
+        self.url = url
+        self.size = max(1, size)
+        self.idle_seconds = idle_seconds
+        self.max_age_seconds = max_age_seconds
+        self.handshakes = 0
+        self.handshake_seconds = 0.0
+        self.requests = 0
+        self.reused = 0
+        self.recycled = 0
+        self.synthesis_seconds = 0.0
+        self._loop = None
+        self._session = None
+        self._slots = None
+        self._idle = []
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a pool from the ``edge_pool_*`` configuration keys.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            EdgeConnectionPool or None: The pool, or None if pooling is disabled
+        """
+        size = config.get("edge_pool_size", DEFAULT_POOL_SIZE)
+        if not size:
+            return None
+        return cls(
+            config.get("edge_url") or WSS_URL,
+            size,
+            config.get("edge_pool_idle_seconds", DEFAULT_IDLE_SECONDS),
+            config.get("edge_pool_max_age_seconds", DEFAULT_MAX_AGE_SECONDS)
+        )
+
+    async def stream(self, text, voice_name, rate, pitch, volume):
+        """
+        Synthesize text over pooled connections.
+
+        Texts longer than one Edge request are sent as consecutive turns and
+        their offsets are placed on one timeline. A warm connection that
+        turns out to be closed by the service is replaced once before any
+        output has been yielded.
+
+        Args:
+            text: Text to synthesize
+            voice_name: Edge TTS voice name
+            rate: Formatted rate, e.g. "+10%"
+            pitch: Formatted pitch, e.g. "-5Hz"
+            volume: Formatted volume, e.g. "+0%"
+
+        Yields:
+            dict: Audio or WordBoundary items in playback order
+        """
+        tts_config = TTSConfig(voice_name, rate, volume, pitch, "WordBoundary")
+        offset_ticks = 0
+
+        for escaped_text in split_text_by_byte_length(
+                escape(remove_incompatible_characters(text)), MAX_REQUEST_BYTES):
+            audio_bytes = 0
+            yielded = False
+            for attempt in range(2):
+                connection, reused = await self.acquire()
+                started = time.monotonic()
+                completed = False
+                try:
+                    async for item in connection.synthesize(tts_config, escaped_text):
+                        if item["type"] == "audio":
+                            audio_bytes += len(item["data"])
+                        elif offset_ticks:
+                            item = {"type": "WordBoundary", "boundary": item["boundary"].shifted(offset_ticks)}
+                        yielded = True
+                        yield item
+                    completed = True
+                except (aiohttp.ClientError, ConnectionError):
+                    # A reused connection may have been closed by the service
+                    # while idle; retry once on a new one if nothing of this
+                    # piece was yielded yet, so no item is repeated
+                    if attempt or not reused or yielded:
+                        raise
+                finally:
+                    self.synthesis_seconds += time.monotonic() - started
+                    await self.release(connection, completed)
+                if completed:
+                    break
+            offset_ticks += mp3_duration_ticks(audio_bytes)
+
+    async def acquire(self):
+        """
+        Take a warm connection from the pool or open a new one.
+
+        Waits while ``size`` connections are in use.
+
+        Returns:
+            tuple: (EdgeConnection, reused)
+        """
+        self._bind_loop()
+        await self._slots.acquire()
+        try:
+            now = time.monotonic()
+            while self._idle:
+                connection = self._idle.pop()
+                if not connection.is_stale(now, self.idle_seconds, self.max_age_seconds):
+                    self.requests += 1
+                    self.reused += 1
+                    return connection, True
+                self.recycled += 1
+                await connection.close()
+
+            connection = await self._connect()
+            self.requests += 1
+            return connection, False
+        except BaseException:
+            self._slots.release()
+            raise
+
+    async def release(self, connection, reusable):
+        """
+        Return a connection to the pool after a turn.
+
+        Args:
+            connection: Connection from acquire
+            reusable: Whether the turn completed; connections interrupted
+                mid-turn still have messages in flight and are closed
+        """
+        if self._loop is not asyncio.get_running_loop():
+            return
+        if reusable and self.idle_seconds > 0 and not connection.websocket.closed:
+            self._idle.append(connection)
+        else:
+            await connection.close()
+        self._slots.release()
+
+    async def close(self):
+        """Close all idle connections and the HTTP session."""
+        if self._loop is not asyncio.get_running_loop():
+            return
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await connection.close()
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    def stats(self):
+        """
+        Report connection reuse and the time spent in handshakes and synthesis.
+
+        Returns:
+            dict: Handshake and request counters and cumulative seconds
+        """
+        return {
+            "handshakes": self.handshakes,
+            "handshake_seconds": self.handshake_seconds,
+            "requests": self.requests,
+            "reused": self.reused,
+            "recycled": self.recycled,
+            "synthesis_seconds": self.synthesis_seconds,
+            "open_idle": len(self._idle)
+        }
+
+    def _bind_loop(self):
+        """Start over with fresh connections when called from a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Connections of a previous loop cannot be used or closed from this one
+        self._loop = loop
+        self._session = None
+        self._idle = []
+        self._slots = asyncio.Semaphore(self.size)
+
+    async def _connect(self):
+        """
+        Open a new WebSocket connection, timing the handshake.
+
+        Returns:
+            EdgeConnection: The open connection
+        """
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit_per_host=self.size, ssl=SSL_CONTEXT),
+                trust_env=True,
+                timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+            )
+
+        started = time.monotonic()
+        for attempt in range(2):
+            try:
+                websocket = await self._session.ws_connect(
+                    f"{self.url}&ConnectionId={connect_id()}"
+                    f"&Sec-MS-GEC={DRM.generate_sec_ms_gec()}"
+                    f"&Sec-MS-GEC-Version={SEC_MS_GEC_VERSION}",
+                    compress=15,
+                    headers=DRM.headers_with_muid(WSS_HEADERS)
+                )
+                break
+            except aiohttp.ClientResponseError as e:
+                # A 403 means the token was rejected because of clock skew
+                if e.status != 403 or attempt:
+                    raise
+                DRM.handle_client_response_error(e)
+
+        now = time.monotonic()
+        self.handshakes += 1
+        self.handshake_seconds += now - started
+        return EdgeConnection(websocket, now)
+
+
+def _header(headers, name):
+    """
+    Read a header value from an Edge TTS message header block.
+
+    Args:
+        headers: Header lines separated by CRLF
+        name: Header name
+
+    Returns:
+        str or None: The header value
+    """
+    prefix = name + ":"
+    for line in headers.split("\r\n"):
+        if line.startswith(prefix):
+            return line[len(prefix):].strip()
+    return None
@@ -0,0 +1,258 @@
+import io
+import os
+import re
+import shutil
+import struct
+import wave
+import asyncio
+import numpy as np
+from app.utils.text_chunker import split_sentences
+from app.services.backends.base import TTSBackend, iter_spoken_words, register_backend
+from app.services.timing import TICKS_PER_SECOND, WordBoundary
+
+# Executables tried when espeak_path is not configured
+ESPEAK_EXECUTABLES = ("espeak-ng", "espeak")
+
+# Speaking speed at rate 0, in words per minute
+DEFAULT_ESPEAK_WPM = 175
+
+# espeak-ng voices for Edge/Azure locales whose names differ from the language code
+ESPEAK_VOICES = {"zh": "cmn", "zh-hk": "yue", "en-us": "en-us", "en-gb": "en-gb", "pt-br": "pt-br"}
+LOCALE_VOICE_PATTERN = re.compile(r'^([a-z]{2,3})-([A-Za-z]{2})-')
+
+# Samples quieter than this are treated as silence when placing words
+SILENCE_THRESHOLD = 300
+
+# Relative length of the pause espeak-ng makes at a clause mark
+CLAUSE_PAUSE_WEIGHT = 3
+CLAUSE_MARKS = frozenset(',;:，；：、')
+
+
+@register_backend
+class EspeakBackend(TTSBackend):
+    """
+    Local CPU-only TTS using the espeak-ng command-line synthesizer.
+
+    Every sentence is rendered by its own espeak-ng process, several at a
+    time. espeak-ng does not report word timings on the command line, so
+    they are estimated: each sentence's voiced span is measured from its
+    audio and divided among its words by length, leaving room for clause
+    pauses. No network access is needed.
+    """
+
+    name = "espeak"
+    display_name = "eSpeak NG"
+    audio_format = "wav"
+    streaming = False
+
+    async def synthesize(self, text, voice_name, rate, pitch, volume):
+        """
+        Synthesize speech with espeak-ng into a WAV file in memory.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Edge/Azure voice name (mapped to an espeak-ng voice)
+                or an espeak-ng voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+
+        Returns:
+            tuple: (audio_bytes, word_boundaries)
+        """
+        executable = self.executable()
+        args = [
+            executable, "--stdout", "-b", "1",
+            "-v", self.espeak_voice(voice_name),
+            "-s", str(max(80, round(DEFAULT_ESPEAK_WPM * (1 + rate / 100)))),
+            "-p", str(min(99, max(0, 50 + pitch))),
+            "-a", str(min(200, max(0, 100 + 2 * volume)))
+        ]
+        semaphore = asyncio.Semaphore(
+            max(1, self.config.get("espeak_concurrency", os.cpu_count() or 1)))
+
+        async def render(sentence):
+            async with semaphore:
+                return await self._render(args, sentence)
+
+        sentences = split_sentences(text)
+        rendered = await asyncio.gather(*(render(s) for s in sentences))
+
+        sample_rate = rendered[0][0] if rendered else 22050
+        pcm = bytearray()
+        word_boundaries = []
+        for sentence, (_, frames) in zip(sentences, rendered):
+            word_boundaries.extend(estimate_word_boundaries(
+                sentence, frames, sample_rate, len(pcm) // 2))
+            pcm.extend(frames)
+
+        return pcm_to_wav(bytes(pcm), sample_rate), word_boundaries
+
+    def executable(self):
+        """
+        Locate the espeak-ng executable.
+
+        Returns:
+            str: Path of the executable
+
+        Raises:
+            RuntimeError: If espeak-ng is not installed
+        """
+        configured = self.config.get("espeak_path")
+        if configured:
+            return configured
+        for name in ESPEAK_EXECUTABLES:
+            path = shutil.which(name)
+            if path:
+                return path
+        raise RuntimeError("espeak-ng not found. Install it or set espeak_path in config.toml.")
+
+    @staticmethod
+    def espeak_voice(voice_name):
+        """
+        Map an Edge/Azure voice name such as ``en-US-JennyNeural`` to an espeak-ng voice.
+
+        Names that are not Edge/Azure voice names are passed through, so
+        espeak-ng voices (e.g. ``en-us+f3``) can be used directly.
+
+        Args:
+            voice_name: Voice name
+
+        Returns:
+            str: espeak-ng voice name
+        """
+        match = LOCALE_VOICE_PATTERN.match(voice_name)
+        if not match:
+            return voice_name
+        language = match.group(1)
+        locale = f"{language}-{match.group(2).lower()}"
+        return ESPEAK_VOICES.get(locale) or ESPEAK_VOICES.get(language) or language
+
+    async def _render(self, args, sentence):
+        """
+        Render one sentence with an espeak-ng process.
+
+        Args:
+            args: espeak-ng command line
+            sentence: Sentence text, passed on stdin
+
+        Returns:
+            tuple: (sample_rate, pcm_bytes) of 16-bit mono audio
+        """
+        process = await asyncio.create_subprocess_exec(
+            *args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate(sentence.encode("utf-8"))
+        if process.returncode != 0:
+            raise RuntimeError(
+                f"espeak-ng exited with {process.returncode}: {stderr.decode('utf-8', 'replace').strip()}")
+        return read_wav_pcm(stdout)
+
+
+def read_wav_pcm(data):
+    """
+    Extract 16-bit mono PCM from a WAV file written by espeak-ng.
+
+    espeak-ng writing to stdout cannot seek back to fill in chunk sizes, so
+    the data chunk is taken to run to the end of the file.
+
+    Args:
+        data: WAV file bytes
+
+    Returns:
+        tuple: (sample_rate, pcm_bytes)
+
+    Raises:
+        ValueError: If the data is not 16-bit mono WAV
+    """
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("espeak-ng did not produce WAV audio")
+
+    sample_rate = None
+    position = 12
+    while position + 8 <= len(data):
+        chunk_id = data[position:position + 4]
+        size = struct.unpack_from("<I", data, position + 4)[0]
+        if chunk_id == b"fmt ":
+            _, channels, sample_rate, _, _, bits = struct.unpack_from("<HHIIHH", data, position + 8)
+            if channels != 1 or bits != 16:
+                raise ValueError(f"Unsupported espeak-ng audio: {channels} channels, {bits} bits")
+        elif chunk_id == b"data":
+            if sample_rate is None:
+                raise ValueError("WAV data chunk precedes its format chunk")
+            pcm = data[position + 8:]
+            return sample_rate, pcm[:len(pcm) - len(pcm) % 2]
+        position += 8 + size + (size & 1)
+
+    raise ValueError("espeak-ng WAV output has no data chunk")
+
+
+def pcm_to_wav(pcm, sample_rate):
+    """
+    Wrap 16-bit mono PCM in a WAV container.
+
+    Args:
+        pcm: PCM bytes
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        bytes: WAV file
+    """
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def estimate_word_boundaries(sentence, pcm, sample_rate, start_sample):
+    """
+    Estimate word timings of a rendered sentence.
+
+    The voiced span of the audio (leading and trailing silence removed) is
+    divided among the words in proportion to their length; CJK characters
+    count as one syllable each and clause marks add a pause.
+
+    Args:
+        sentence: Sentence text
+        pcm: 16-bit mono PCM of the sentence
+        sample_rate: Sample rate in Hz
+        start_sample: Position of the sentence in the whole audio, in samples
+
+    Returns:
+        list: Word boundaries with offsets in ticks on the whole audio's timeline
+    """
+    words = list(iter_spoken_words(sentence))
+    if not words:
+        return []
+
+    samples = np.frombuffer(pcm, dtype="<i2")
+    voiced = np.flatnonzero(np.abs(samples.astype(np.int32)) > SILENCE_THRESHOLD)
+    if len(voiced):
+        first, last = int(voiced[0]), int(voiced[-1]) + 1
+    else:
+        first, last = 0, len(samples)
+
+    # (word weight, pause weight after the word)
+    weights = [
+        (3 * len(word) if is_cjk else len(word) + 1,
+         CLAUSE_PAUSE_WEIGHT if CLAUSE_MARKS.intersection(punctuation) else 0)
+        for word, is_cjk, punctuation in words
+    ]
+    total = sum(word_weight + pause for word_weight, pause in weights) - weights[-1][1]
+    span = last - first
+
+    word_boundaries = []
+    position = 0
+    for (word, _, _), (word_weight, pause) in zip(words, weights):
+        word_start = start_sample + first + span * position // total
+        word_end = start_sample + first + span * (position + word_weight) // total
+        offset = word_start * TICKS_PER_SECOND // sample_rate
+        word_boundaries.append(WordBoundary(word, offset, word_end * TICKS_PER_SECOND // sample_rate - offset))
+        position += word_weight + pause
+    return word_boundaries
@@ -0,0 +1,148 @@
+import asyncio
+from app.services.backends.base import TICKS_PER_SECOND, iter_spoken_words, register_backend
+from app.services.backends.edge import EdgeBackend
+from app.services.timing import WordBoundary
+
+# One silent MPEG-2 Layer III frame: 24 kHz, 48 kbps, mono, no CRC. It has
+# the same format as Edge TTS output, so byte-count based durations hold.
+# 144 bytes = 576 samples = 24 ms.
+SILENT_FRAME = b"\xff\xf3\x64\xc0" + bytes(140)
+FRAME_TICKS = 240000
+
+# Default speaking speed at rate 0
+DEFAULT_WORDS_PER_MINUTE = 160
+DEFAULT_CJK_CHARS_PER_MINUTE = 250
+
+# Silence before the first word and after the last one
+EDGE_SILENCE_TICKS = 1000000
+
+# Pauses after punctuation
+SENTENCE_PAUSE_TICKS = 4000000
+CLAUSE_PAUSE_TICKS = 1500000
+SENTENCE_MARKS = frozenset('.!?。！？…')
+CLAUSE_MARKS = frozenset(',;:，；：、')
+
+# Average characters per Latin word, including the following space
+AVERAGE_WORD_CHARS = 6
+
+
+class FakeCommunicate:
+    """
+    Deterministic offline stand-in for ``edge_tts.Communicate``.
+
+    Produces silent MP3 audio and WordBoundary events with realistic timings
+    derived from the text: word durations follow the word length and the
+    speaking speed, and punctuation adds pauses. No network access is needed,
+    so the pipeline can be tested and benchmarked offline.
+    """
+
+    def __init__(self, text, voice, rate=0, words_per_minute=DEFAULT_WORDS_PER_MINUTE,
+                 cjk_chars_per_minute=DEFAULT_CJK_CHARS_PER_MINUTE):
+        """
+        Initialize the fake synthesizer.
+
+        Args:
+            text: Text to synthesize
+            voice: Voice name (accepted for compatibility, not used)
+            rate: Speech rate adjustment percentage (-50 to +50)
+            words_per_minute: Latin-script speaking speed at rate 0
+            cjk_chars_per_minute: CJK speaking speed at rate 0
+        """
+        self.text = text
+        self.voice = voice
+        speed = max(0.1, 1 + rate / 100)
+        self.latin_char_ticks = 60 * TICKS_PER_SECOND / (words_per_minute * AVERAGE_WORD_CHARS * speed)
+        self.cjk_char_ticks = 60 * TICKS_PER_SECOND / (cjk_chars_per_minute * speed)
+        self.speed = speed
+
+    def word_boundaries(self):
+        """
+        Compute the word boundaries of the text.
+
+        Returns:
+            list: WordBoundary records with integer tick offsets and durations
+        """
+        word_boundaries = []
+        offset = EDGE_SILENCE_TICKS
+        for word, is_cjk, punctuation in iter_spoken_words(self.text):
+            if is_cjk:
+                duration = int(len(word) * self.cjk_char_ticks)
+            else:
+                duration = int((len(word) + 1) * self.latin_char_ticks)
+            word_boundaries.append(WordBoundary(word, offset, duration))
+            offset += duration
+
+            punctuation = set(punctuation)
+            if punctuation & SENTENCE_MARKS:
+                offset += int(SENTENCE_PAUSE_TICKS / self.speed)
+            elif punctuation & CLAUSE_MARKS:
+                offset += int(CLAUSE_PAUSE_TICKS / self.speed)
+        return word_boundaries
+
+    async def stream(self):
+        """
+        Yield audio and WordBoundary items like ``edge_tts.Communicate.stream``,
+        with word boundaries as WordBoundary records under ``"boundary"``.
+
+        Each word boundary is followed by the silent audio frames covering
+        the speech up to the end of that word.
+
+        Yields:
+            dict: {"type": "audio", "data": bytes} or
+                {"type": "WordBoundary", "boundary": WordBoundary} items
+        """
+        frames_sent = 0
+        end_ticks = 0
+        for boundary in self.word_boundaries():
+            yield {"type": "WordBoundary", "boundary": boundary}
+            end_ticks = boundary.end
+            frames = -(-end_ticks // FRAME_TICKS) - frames_sent
+            if frames > 0:
+                yield {"type": "audio", "data": SILENT_FRAME * frames}
+                frames_sent += frames
+            # Let other chunks progress, like a network stream would
+            await asyncio.sleep(0)
+
+        frames = -(-(end_ticks + EDGE_SILENCE_TICKS) // FRAME_TICKS) - frames_sent
+        yield {"type": "audio", "data": SILENT_FRAME * frames}
+
+
+@register_backend
+class FakeBackend(EdgeBackend):
+    """Offline stand-in for Edge TTS used by tests and benchmarks."""
+
+    name = "fake"
+    display_name = "Fake TTS"
+
+    def __init__(self, config):
+        """
+        Initialize the backend without a connection pool.
+
+        Args:
+            config: Configuration dictionary
+        """
+        super().__init__(config)
+        # Fake requests never touch the network
+        self.pool = None
+
+    def communicate(self, text, voice_name, rate, pitch, volume):
+        """
+        Create a fake communicate instance for the text.
+
+        Args:
+            text: Text to synthesize
+            voice_name: Voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage (ignored)
+            volume: Volume adjustment percentage (ignored)
+
+        Returns:
+            FakeCommunicate: Communicate instance for the text
+        """
+        return FakeCommunicate(
+            text,
+            voice_name,
+            rate,
+            words_per_minute=self.config.get("fake_words_per_minute", DEFAULT_WORDS_PER_MINUTE),
+            cjk_chars_per_minute=self.config.get("fake_cjk_chars_per_minute", DEFAULT_CJK_CHARS_PER_MINUTE)
+        )
@@ -0,0 +1,261 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from app.services.timing import dump_boundaries, load_boundaries
+
+# Bump when the stored entry layout, a backend's audio format or a backend's
+# timing units change so stale entries are never read (3: Azure ticks)
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = os.path.join(".cache", "tts")
+DEFAULT_MAX_SIZE_MB = 512
+
+
+class SynthesisCache:
+    """
+    Content-addressed on-disk cache for synthesized audio and word boundaries.
+
+    Entries are keyed on a hash of the synthesis inputs and evicted in
+    least-recently-used order once the cache grows beyond its size limit.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_SIZE_MB * 1024 * 1024):
+        """
+        Initialize the cache and index the entries already on disk.
+
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_bytes: Maximum total size of cached audio and metadata
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._sizes = {}
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a cache from the ``[cache]`` table of the configuration.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            SynthesisCache or None: The cache, or None if caching is disabled
+        """
+        cache_config = config.get("cache", {})
+        if not cache_config.get("enabled", False):
+            return None
+        return cls(
+            cache_config.get("dir") or DEFAULT_CACHE_DIR,
+            int(cache_config.get("max_size_mb", DEFAULT_MAX_SIZE_MB) * 1024 * 1024)
+        )
+
+    @staticmethod
+    def make_key(text, voice_name, rate, pitch, volume, backend):
+        """
+        Hash the synthesis inputs into a cache key.
+
+        Args:
+            text: Input text
+            voice_name: Voice name
+            rate: Speech rate adjustment
+            pitch: Pitch adjustment
+            volume: Volume adjustment
+            backend: Name of the TTS backend producing the audio
+
+        Returns:
+            str: Hex digest identifying the synthesis result
+        """
+        payload = json.dumps(
+            [CACHE_VERSION, text, voice_name, rate, pitch, volume, backend],
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key, output_dir):
+        """
+        Look up an entry and copy its audio into the output directory.
+
+        Args:
+            key: Cache key from make_key
+            output_dir: Directory to copy the cached audio file into
+
+        Returns:
+            tuple or None: (audio_file_path, word_boundaries) on a hit, None on a miss
+        """
+        def copy_audio(audio_path, ext):
+            audio_file = os.path.join(output_dir, f"output.{ext}")
+            shutil.copyfile(audio_path, audio_file)
+            return audio_file
+
+        return self._lookup(key, copy_audio)
+
+    def get_bytes(self, key):
+        """
+        Look up an entry and read its audio into memory.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            tuple or None: (audio_bytes, word_boundaries) on a hit, None on a miss
+        """
+        def read_audio(audio_path, ext):
+            with open(audio_path, "rb") as f:
+                return f.read()
+
+        return self._lookup(key, read_audio)
+
+    def put(self, key, audio_file, word_boundaries):
+        """
+        Store a synthesis result and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from make_key
+            audio_file: Path of the synthesized audio file
+            word_boundaries: Word boundaries of the audio
+        """
+        ext = os.path.splitext(audio_file)[1].lstrip(".") or "bin"
+        self._store(key, ext, word_boundaries,
+                    lambda audio_path: shutil.copyfile(audio_file, audio_path))
+
+    def put_bytes(self, key, audio_data, ext, word_boundaries):
+        """
+        Store in-memory audio and evict old entries if over the size limit.
+
+        Args:
+            key: Cache key from make_key
+            audio_data: Synthesized audio bytes
+            ext: Audio file extension, e.g. "mp3"
+            word_boundaries: Word boundaries of the audio
+        """
+        def write_audio(audio_path):
+            with open(audio_path, "wb") as f:
+                f.write(audio_data)
+
+        self._store(key, ext, word_boundaries, write_audio)
+
+    def stats(self):
+        """
+        Report cache usage statistics.
+
+        Returns:
+            dict: Hits, misses, hit rate, entry count and total size in bytes
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._sizes),
+                "size_bytes": sum(self._sizes.values())
+            }
+
+    def _lookup(self, key, load_audio):
+        """
+        Read an entry's metadata and load its audio, updating statistics.
+
+        Args:
+            key: Cache key
+            load_audio: Callable taking (audio_path, ext) and returning the audio
+
+        Returns:
+            tuple or None: (audio, word_boundaries) on a hit, None on a miss
+        """
+        with self._lock:
+            meta_path = self._meta_path(key)
+            try:
+                with open(meta_path, "r", encoding="utf-8") as f:
+                    meta = json.load(f)
+                audio = load_audio(self._audio_path(key, meta["ext"]), meta["ext"])
+            except (OSError, ValueError, KeyError):
+                self.misses += 1
+                return None
+
+            # Refresh the entry's position in the LRU order
+            os.utime(meta_path)
+            self.hits += 1
+            return audio, load_boundaries(meta["word_boundaries"])
+
+    def _store(self, key, ext, word_boundaries, write_audio):
+        """
+        Write an entry's audio and metadata, then enforce the size limit.
+
+        Args:
+            key: Cache key
+            ext: Audio file extension
+            word_boundaries: Word boundaries of the audio
+            write_audio: Callable writing the audio to the given path
+        """
+        with self._lock:
+            os.makedirs(os.path.dirname(self._meta_path(key)), exist_ok=True)
+            audio_path = self._audio_path(key, ext)
+            write_audio(audio_path)
+
+            # Metadata is written last so readers never see a partial entry
+            meta_path = self._meta_path(key)
+            tmp_path = meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"ext": ext, "word_boundaries": dump_boundaries(word_boundaries)}, f,
+                          ensure_ascii=False)
+            os.replace(tmp_path, meta_path)
+
+            self._sizes[key] = os.path.getsize(audio_path) + os.path.getsize(meta_path)
+            self._evict()
+
+    def _evict(self):
+        """Remove least recently used entries until the cache fits its size limit."""
+        total = sum(self._sizes.values())
+        if total <= self.max_bytes:
+            return
+
+        by_last_use = sorted(
+            self._sizes, key=lambda k: self._last_used(k))
+        for key in by_last_use:
+            if total <= self.max_bytes:
+                break
+            total -= self._sizes.pop(key)
+            self._remove_entry(key)
+
+    def _load_index(self):
+        """Index entry sizes from the cache directory."""
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                key, ext = os.path.splitext(name)
+                path = os.path.join(root, name)
+                if ext == ".tmp":
+                    continue
+                self._sizes[key] = self._sizes.get(key, 0) + os.path.getsize(path)
+
+    def _last_used(self, key):
+        """Return the last access time of an entry."""
+        try:
+            return os.path.getmtime(self._meta_path(key))
+        except OSError:
+            return 0
+
+    def _remove_entry(self, key):
+        """Delete every file belonging to an entry."""
+        entry_dir = os.path.dirname(self._meta_path(key))
+        for name in os.listdir(entry_dir):
+            if name.startswith(key + "."):
+                try:
+                    os.remove(os.path.join(entry_dir, name))
+                except OSError:
+                    pass
+
+    def _meta_path(self, key):
+        """Return the metadata path of an entry."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _audio_path(self, key, ext):
+        """Return the audio path of an entry."""
+        return os.path.join(self.cache_dir, key[:2], f"{key}.{ext}")
@@ -0,0 +1,95 @@
+import re
+
+# Punctuation that is kept tight to the word before it and followed by a space
+SPACING_PUNCTUATION = ',.!?;:，。！？；：'
+
+# Quotes and brackets that never have spaces around them
+TIGHT_MARKS = '"\'()'
+
+# Characters dropped from words when punctuation is not preserved
+NON_WORD_PATTERN = re.compile(r"[^\w\s\-']+")
+
+# Spaces removed in one pass: before punctuation, and around quotes/brackets
+SPACE_BEFORE_PUNCTUATION_PATTERN = re.compile(
+    rf" (?=[{re.escape(SPACING_PUNCTUATION + TIGHT_MARKS)}])|(?<=[{re.escape(TIGHT_MARKS)}]) "
+)
+SPACE_AROUND_MARKS_PATTERN = re.compile(
+    rf" (?=[{re.escape(TIGHT_MARKS)}])|(?<=[{re.escape(TIGHT_MARKS)}]) "
+)
+
+# Punctuation directly followed by another character gets a space after it.
+# Quotes and brackets are excluded since they never have spaces around them.
+MISSING_SPACE_PATTERN = re.compile(
+    rf"([{re.escape(SPACING_PUNCTUATION)}])([^ {re.escape(TIGHT_MARKS)}])"
+)
+
+# Cleaned words are memoized; the cache is reset once it holds this many words
+MAX_CACHED_WORDS = 65536
+
+
+class TextCleaner:
+    """
+    Word and subtitle text cleanup with precompiled patterns.
+
+    Words repeat heavily in speech, so cleaned words are memoized per
+    instance; a SubtitleService keeps one cleaner for its lifetime.
+    """
+
+    def __init__(self):
+        """Initialize empty memo tables for both punctuation modes."""
+        self._words = {True: {}, False: {}}
+
+    def clean_word(self, word, preserve_punctuation):
+        """
+        Clean an individual word, handling punctuation and whitespace.
+
+        Args:
+            word: Original word text
+            preserve_punctuation: Whether to preserve punctuation
+
+        Returns:
+            str: Cleaned word
+        """
+        cache = self._words[preserve_punctuation]
+        cleaned = cache.get(word)
+        if cleaned is not None:
+            return cleaned
+
+        cleaned = word
+        if not preserve_punctuation and not cleaned.isalnum():
+            cleaned = NON_WORD_PATTERN.sub('', cleaned)
+        # Collapse and trim whitespace
+        cleaned = ' '.join(cleaned.split())
+
+        if len(cache) >= MAX_CACHED_WORDS:
+            cache.clear()
+        cache[word] = cleaned
+        return cleaned
+
+    def fix_spacing(self, text, preserve_punctuation):
+        """
+        Fix spacing issues in subtitle text.
+
+        Whitespace is collapsed first; spaces before punctuation and around
+        quotes and brackets are then removed in a single pass, and a space
+        is added after punctuation that is directly followed by a word.
+
+        Args:
+            text: Input text
+            preserve_punctuation: Whether punctuation is preserved
+
+        Returns:
+            str: Text with fixed spacing
+        """
+        if not text:
+            return ""
+
+        text = ' '.join(text.split())
+
+        if preserve_punctuation:
+            text = SPACE_BEFORE_PUNCTUATION_PATTERN.sub('', text)
+            text = MISSING_SPACE_PATTERN.sub(r'\1 \2', text)
+        else:
+            text = SPACE_AROUND_MARKS_PATTERN.sub('', text)
+
+        return text
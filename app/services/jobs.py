@@ -0,0 +1,500 @@
+import os
+import json
+import time
+import uuid
+import shutil
+import socket
+import sqlite3
+import weakref
+import threading
+import contextlib
+from app.services.voice import VoiceService
+from app.services.subtitle import SubtitleService
+from app.services.timing import dump_boundaries
+from app.services.retention import (
+    DEFAULT_MAX_AGE_HOURS, DEFAULT_MAX_TOTAL_MB, DEFAULT_CLEANUP_INTERVAL_SECONDS, prune_task_dirs)
+
+# Job queue defaults (overridable in the [jobs] table of config.toml)
+DEFAULT_DB_PATH = os.path.join("task", "jobs.sqlite3")
+DEFAULT_WORKERS = 2
+DEFAULT_POLL_SECONDS = 1.0
+DEFAULT_OUTPUT_ROOT = "task"
+DEFAULT_SENTENCE_LEVEL = False
+
+# Word timings of a finished job, kept so subtitles can be re-segmented without synthesis
+WORD_BOUNDARIES_FILE = "word_boundaries.json"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Share of a job's progress taken by speech synthesis; subtitles take the rest
+SYNTHESIS_SHARE = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    params TEXT NOT NULL,
+    progress REAL NOT NULL DEFAULT 0,
+    message TEXT NOT NULL DEFAULT '',
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    created REAL NOT NULL,
+    started REAL,
+    finished REAL,
+    owner TEXT
+)
+"""
+
+# Job queues of this process, keyed by the token in their owner string; a
+# queue leaves when it is garbage collected (its running workers keep it)
+_LIVE_QUEUES = weakref.WeakValueDictionary()
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once its cancellation was requested."""
+
+
+class JobQueue:
+    """
+    SQLite-backed queue of synthesis jobs run by a pool of worker threads.
+
+    The GUI submits a job and polls its status instead of synthesizing in
+    the script run, so a long job neither blocks the page nor a Streamlit
+    server thread. At most ``workers`` jobs synthesize at once on this node;
+    later ones wait in the queue. Each worker owns its VoiceService, because
+    backends keep connections bound to the worker's event loop.
+
+    A job runs synthesis and subtitle generation into
+    ``<output_root>/<job id>`` and keeps the word timings next to the
+    audio. By default the whole text is synthesized in the backend's
+    chunks, which takes the fewest requests and keeps the prosody across
+    sentences. With ``sentence_level`` every sentence is rendered on its
+    own: the job reports per-sentence progress, a cancelled job stops at
+    the next finished sentence, and a job given the output of a previous
+    one re-synthesizes only the changed sentences, at the cost of one
+    request per sentence. A cancelled job's partial output is removed.
+
+    The workers also prune the output root periodically: output directories
+    of finished jobs older than ``max_age_hours`` are deleted, then the
+    oldest ones until the rest fit into ``max_total_mb``, together with the
+    records of the jobs whose output is gone. Running jobs and directories
+    without a job record are kept.
+    """
+
+    def __init__(self, config, db_path=DEFAULT_DB_PATH, workers=DEFAULT_WORKERS,
+                 poll_seconds=DEFAULT_POLL_SECONDS, output_root=DEFAULT_OUTPUT_ROOT,
+                 max_age_hours=DEFAULT_MAX_AGE_HOURS, max_total_mb=DEFAULT_MAX_TOTAL_MB,
+                 cleanup_interval_seconds=DEFAULT_CLEANUP_INTERVAL_SECONDS,
+                 sentence_level=DEFAULT_SENTENCE_LEVEL):
+        """
+        Open the job store. Call ``start`` to run the workers.
+
+        Jobs left running by a process of this host that no longer exists,
+        or by a queue of this process that is gone, are marked as failed, so
+        the GUI and the API server can share a job store.
+
+        Args:
+            config: Configuration dictionary passed to the services
+            db_path: SQLite database file
+            workers: Maximum number of jobs synthesized at the same time
+            poll_seconds: Interval at which idle workers check for new jobs
+            output_root: Directory the job output directories are created in
+            max_age_hours: Age after which job output directories are deleted, 0 to keep them
+            max_total_mb: Size the job output directories are pruned to, 0 for no limit
+            cleanup_interval_seconds: Interval between prunes, 0 to disable pruning
+            sentence_level: Render every sentence on its own, so jobs report
+                per-sentence progress and reuse the unchanged sentences of a
+                previous job
+        """
+        self.config = config
+        self.db_path = db_path
+        self.workers = max(1, workers)
+        self.poll_seconds = poll_seconds
+        self.output_root = output_root
+        self.max_age_hours = max_age_hours
+        self.max_total_mb = max_total_mb
+        self.cleanup_interval_seconds = cleanup_interval_seconds
+        self.sentence_level = sentence_level
+        self._threads = []
+        self._stopping = threading.Event()
+        self._wakeup = threading.Condition()
+        self._cleanup_lock = threading.Lock()
+        self._last_cleanup = 0.0
+        token = uuid.uuid4().hex
+        self._owner = f"{socket.gethostname()}:{os.getpid()}:{token}"
+        _LIVE_QUEUES[token] = self
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(_SCHEMA)
+            columns = [row["name"] for row in conn.execute("PRAGMA table_info(jobs)")]
+            if "owner" not in columns:
+                conn.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+            orphaned = [row["id"] for row in conn.execute(
+                "SELECT id, owner FROM jobs WHERE status = ?", (RUNNING,)) if not _owner_alive(row["owner"])]
+            for job_id in orphaned:
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, finished = ? WHERE id = ? AND status = ?",
+                    (FAILED, "Interrupted by a restart", time.time(), job_id, RUNNING))
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Create a job queue from the ``[jobs]`` table of the configuration.
+
+        Args:
+            config: Configuration dictionary
+
+        Returns:
+            JobQueue: Job queue with its workers not yet started
+        """
+        settings = config.get("jobs", {})
+        return cls(
+            config,
+            settings.get("db") or DEFAULT_DB_PATH,
+            settings.get("workers", DEFAULT_WORKERS),
+            settings.get("poll_seconds", DEFAULT_POLL_SECONDS),
+            settings.get("output_root") or DEFAULT_OUTPUT_ROOT,
+            settings.get("max_age_hours", DEFAULT_MAX_AGE_HOURS),
+            settings.get("max_total_mb", DEFAULT_MAX_TOTAL_MB),
+            settings.get("cleanup_interval_seconds", DEFAULT_CLEANUP_INTERVAL_SECONDS),
+            settings.get("sentence_level", DEFAULT_SENTENCE_LEVEL)
+        )
+
+    def start(self):
+        """Start the worker threads."""
+        for i in range(self.workers - len(self._threads)):
+            thread = threading.Thread(target=self._work, name=f"tts-job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self, timeout=None):
+        """
+        Stop the workers after their current jobs.
+
+        Args:
+            timeout: Seconds to wait for each worker, or None to wait until it stops
+        """
+        self._stopping.set()
+        with self._wakeup:
+            self._wakeup.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, params):
+        """
+        Queue a synthesis job.
+
+        Args:
+            params: Dictionary with text, voice_name, rate, pitch, volume,
+                max_line_length, preserve_punctuation and an optional
+                previous_dir whose unchanged sentences are reused
+
+        Returns:
+            str: Job ID
+        """
+        job_id = str(uuid.uuid4())
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, params, created) VALUES (?, ?, ?, ?)",
+                (job_id, QUEUED, json.dumps(params, ensure_ascii=False), time.time()))
+        with self._wakeup:
+            self._wakeup.notify()
+        return job_id
+
+    def get(self, job_id):
+        """
+        Look up a job.
+
+        Args:
+            job_id: Job ID from submit
+
+        Returns:
+            dict: Job with id, status, progress (0 to 1), message, params,
+                result, error, cancel_requested and created/started/finished
+                timestamps, or None if the job does not exist
+        """
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job["cancel_requested"] = bool(job["cancel_requested"])
+        return job
+
+    def cancel(self, job_id):
+        """
+        Cancel a job. A queued job is cancelled at once, a running job stops
+        at its next progress report.
+
+        Args:
+            job_id: Job ID from submit
+
+        Returns:
+            bool: False if the job does not exist or has already finished
+        """
+        with self._connect() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, finished = ? WHERE id = ? AND status = ?",
+                (CANCELLED, time.time(), job_id, QUEUED)).rowcount
+            requested = conn.execute(
+                "UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?",
+                (job_id, RUNNING)).rowcount
+        return bool(cancelled or requested)
+
+    def pending(self):
+        """
+        Count the jobs waiting or running.
+
+        Returns:
+            int: Number of queued and running jobs
+        """
+        with self._connect() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", (QUEUED, RUNNING)).fetchone()[0]
+
+    def prune(self):
+        """
+        Delete expired output directories of finished jobs and their records.
+
+        Only directories of jobs in this store are deleted, never other
+        outputs under the output root. Records are deleted once their
+        output is gone and they are older than ``max_age_hours``.
+
+        Returns:
+            list: Paths of the deleted directories
+        """
+        with self._connect() as conn:
+            finished = {row["id"] for row in conn.execute(
+                "SELECT id FROM jobs WHERE status NOT IN (?, ?)", (QUEUED, RUNNING))}
+        removed = prune_task_dirs(
+            self.output_root,
+            finished,
+            self.max_age_hours * 3600 if self.max_age_hours else None,
+            self.max_total_mb * 1024 * 1024 if self.max_total_mb else None)
+
+        expired = [os.path.basename(path) for path in removed]
+        if self.max_age_hours:
+            with self._connect() as conn:
+                expired += [row["id"] for row in conn.execute(
+                    "SELECT id FROM jobs WHERE status NOT IN (?, ?) AND finished < ?",
+                    (QUEUED, RUNNING, time.time() - self.max_age_hours * 3600))
+                    if not os.path.isdir(os.path.join(self.output_root, row["id"]))]
+        with self._connect() as conn:
+            conn.executemany("DELETE FROM jobs WHERE id = ? AND status NOT IN (?, ?)",
+                             [(job_id, QUEUED, RUNNING) for job_id in set(expired)])
+        return removed
+
+    def _connect(self):
+        """
+        Open a connection to the job store for one operation.
+
+        Returns:
+            contextlib.closing: Context manager yielding a connection in
+                autocommit mode that is closed on exit
+        """
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return contextlib.closing(conn)
+
+    def _claim(self):
+        """
+        Atomically move the oldest queued job to running.
+
+        Returns:
+            dict: Claimed job, or None if the queue is empty
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? ORDER BY created LIMIT 1", (QUEUED,)).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE jobs SET status = ?, started = ?, owner = ? WHERE id = ?",
+                                 (RUNNING, time.time(), self._owner, row["id"]))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"]) if row is not None else None
+
+    def _update(self, job_id, **fields):
+        """
+        Write fields of a job.
+
+        Args:
+            job_id: Job ID
+            **fields: Column values
+        """
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as conn:
+            conn.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def _report(self, job_id, progress, message):
+        """
+        Record the progress of a running job.
+
+        Args:
+            job_id: Job ID
+            progress: Share of the job done, from 0 to 1
+            message: Description of the current step
+
+        Raises:
+            JobCancelled: If the job's cancellation was requested
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET progress = ?, message = ? WHERE id = ?",
+                         (progress, message, job_id))
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row["cancel_requested"]:
+            raise JobCancelled(f"Job {job_id} was cancelled")
+
+    def _work(self):
+        """Run queued jobs until the queue is closed."""
+        voice_service = VoiceService(self.config)
+        subtitle_service = SubtitleService(self.config)
+        while not self._stopping.is_set():
+            self._maybe_prune()
+            job = self._claim()
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(self.poll_seconds)
+                continue
+            self._execute(job, voice_service, subtitle_service)
+
+    def _maybe_prune(self):
+        """Prune the output root if the cleanup interval has passed since the last prune."""
+        if not self.cleanup_interval_seconds or not self._cleanup_lock.acquire(blocking=False):
+            return
+        try:
+            if time.time() - self._last_cleanup < self.cleanup_interval_seconds:
+                return
+            self._last_cleanup = time.time()
+            removed = self.prune()
+            if removed:
+                print(f"Removed {len(removed)} expired task directories from {self.output_root}")
+        except Exception as e:
+            print(f"Failed to prune {self.output_root}: {e}")
+        finally:
+            self._cleanup_lock.release()
+
+    def _execute(self, job, voice_service, subtitle_service):
+        """
+        Run one claimed job and record its outcome.
+
+        Args:
+            job: Job dictionary from _claim
+            voice_service: VoiceService of the worker
+            subtitle_service: SubtitleService of the worker
+        """
+        job_id = job["id"]
+        output_dir = os.path.join(self.output_root, job_id)
+        try:
+            result = self._synthesize(job_id, job["params"], output_dir, voice_service, subtitle_service)
+        except JobCancelled:
+            shutil.rmtree(output_dir, ignore_errors=True)
+            self._update(job_id, status=CANCELLED, message="", finished=time.time())
+        except Exception as e:
+            print(f"Job {job_id} failed: {e}")
+            shutil.rmtree(output_dir, ignore_errors=True)
+            self._update(job_id, status=FAILED, error=str(e), finished=time.time())
+        else:
+            self._update(job_id, status=SUCCEEDED, progress=1.0, message="",
+                         result=json.dumps(result, ensure_ascii=False), finished=time.time())
+
+    def _synthesize(self, job_id, params, output_dir, voice_service, subtitle_service):
+        """
+        Synthesize the speech and subtitles of a job.
+
+        Args:
+            job_id: Job ID
+            params: Job parameters from submit
+            output_dir: Directory to write the audio and SRT file to
+            voice_service: VoiceService of the worker
+            subtitle_service: SubtitleService of the worker
+
+        Returns:
+            dict: output_dir, audio_file_path, srt_file_path, subtitle_files (path of
+                every subtitle format written), cue_count and word_boundaries_path
+
+        Raises:
+            JobCancelled: If the job was cancelled while running
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self._report(job_id, 0.0, "Synthesizing speech")
+
+        def progress(done, total):
+            self._report(job_id, SYNTHESIS_SHARE * done / max(total, 1),
+                         f"Synthesizing sentence {done}/{total}")
+
+        if self.sentence_level:
+            previous_dir = params.get("previous_dir")
+            if previous_dir and not os.path.isdir(previous_dir):
+                previous_dir = None
+            audio_file_path, word_boundaries = voice_service.synthesize_incremental(
+                params["text"], params["voice_name"], params["rate"], params["pitch"], params["volume"],
+                output_dir, previous_dir=previous_dir, progress=progress)
+        else:
+            audio_file_path, word_boundaries = voice_service.synthesize(
+                params["text"], params["voice_name"], params["rate"], params["pitch"], params["volume"],
+                output_dir)
+
+        self._report(job_id, SYNTHESIS_SHARE, "Generating subtitles")
+        word_boundaries_path = os.path.join(output_dir, WORD_BOUNDARIES_FILE)
+        with open(word_boundaries_path, "w", encoding="utf-8") as f:
+            json.dump({"text": params["text"], "word_boundaries": dump_boundaries(word_boundaries)}, f,
+                      ensure_ascii=False)
+
+        subtitle_files, cue_count = subtitle_service.write_subtitle_files(
+            word_boundaries, output_dir, params.get("max_line_length", 40),
+            params.get("preserve_punctuation", True), params["text"])
+
+        return {
+            "output_dir": output_dir,
+            "audio_file_path": audio_file_path,
+            "srt_file_path": subtitle_files["srt"],
+            "subtitle_files": subtitle_files,
+            "cue_count": cue_count,
+            "word_boundaries_path": word_boundaries_path
+        }
+
+
+def _owner_alive(owner):
+    """
+    Check whether the queue that claimed a job may still be running it.
+
+    Args:
+        owner: ``host:pid:token`` recorded when the job was claimed, or None
+
+    Returns:
+        bool: False if the owner is unknown, a process of this host that no
+            longer exists, or a queue of this process that is gone
+    """
+    if not owner:
+        return False
+    # Jobs claimed before the token was added have a ``host:pid`` owner
+    host, pid, token = (owner.split(":", 2) + [""])[:3]
+    if host != socket.gethostname():
+        return True
+    if int(pid) == os.getpid():
+        # The pid alone cannot tell a sibling queue from a previous run: in a
+        # container the service usually runs as the same pid (often 1) after
+        # every restart, so only the token of a live queue counts
+        return token in _LIVE_QUEUES
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
@@ -0,0 +1,310 @@
+import time
+import random
+import asyncio
+
+# Resilience defaults (overridable in the [resilience] table of config.toml)
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_BURST = 10
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_MAX_SECONDS = 30
+DEFAULT_BREAKER_FAILURES = 5
+DEFAULT_BREAKER_RESET_SECONDS = 60
+
+# A throttled backend's request rate is never lowered below this share of its configured rate
+MIN_RATE_FACTOR = 0.1
+# Share of the configured rate regained with every successful request after throttling
+RECOVERY_STEP = 0.05
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a backend whose circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    Adaptive token bucket limiting the request rate to one backend.
+
+    Requests reserve a token and wait until it has been refilled, so
+    concurrent callers are spaced out without a lock. ``throttle`` halves
+    the rate after the service pushed back (HTTP 429) and ``recover``
+    raises it step by step back to the configured rate.
+    """
+
+    def __init__(self, rate, burst, clock=time.monotonic):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Configured requests per second; 0 disables rate limiting
+            burst: Maximum number of requests sent without waiting
+            clock: Monotonic time source
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.clock = clock
+        self.updated = clock()
+
+    async def acquire(self):
+        """Wait until a request may be sent."""
+        if not self.rate:
+            return
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens < 0:
+            await asyncio.sleep(-self.tokens / self.rate)
+
+    def throttle(self):
+        """Halve the request rate after the service rejected a request as too frequent."""
+        if self.rate:
+            self.rate = max(self.max_rate * MIN_RATE_FACTOR, self.rate / 2)
+
+    def recover(self):
+        """Raise a throttled request rate towards the configured rate."""
+        if self.rate:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker tracking consecutive failures of one backend.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    requests are rejected for ``reset_seconds``. Then a single trial
+    request is let through (half-open): its success closes the breaker,
+    its failure opens it again.
+    """
+
+    def __init__(self, failure_threshold, reset_seconds, clock=time.monotonic):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker
+            reset_seconds: Time the breaker stays open before a trial request
+            clock: Monotonic time source
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.trips = 0
+        self._trial_started = None
+
+    def allow(self):
+        """
+        Check whether a request may be sent.
+
+        Returns:
+            bool: False while the breaker is open or a half-open trial is running
+        """
+        if self.state == CLOSED:
+            return True
+        now = self.clock()
+        if self.state == OPEN and now - self.opened_at >= self.reset_seconds:
+            self.state = HALF_OPEN
+        # A trial that never reported back (e.g. it was cancelled) is replaced after reset_seconds
+        if self.state == HALF_OPEN and (
+                self._trial_started is None or now - self._trial_started >= self.reset_seconds):
+            self._trial_started = now
+            return True
+        return False
+
+    def record_success(self):
+        """Close the breaker after a successful request."""
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_started = None
+
+    def record_failure(self):
+        """Count a failed request, opening the breaker at the threshold."""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                self.trips += 1
+            self.state = OPEN
+            self.opened_at = self.clock()
+            self._trial_started = None
+
+
+class BackendGuard:
+    """
+    Rate limiting, retries with backoff and a circuit breaker for one backend.
+
+    Every request to the backend goes through ``call``. Failed requests are
+    retried after an exponential backoff with full jitter (or the delay the
+    service asked for), and the counters are exported by ``metrics``.
+    """
+
+    def __init__(self, display_name, bucket, breaker, retries=DEFAULT_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE_SECONDS, backoff_max=DEFAULT_BACKOFF_MAX_SECONDS):
+        """
+        Initialize the guard.
+
+        Args:
+            display_name: Backend name used in log messages
+            bucket: TokenBucket limiting the request rate
+            breaker: CircuitBreaker of the backend
+            retries: Retries of a failed request
+            backoff_base: Delay before the first retry, before jitter
+            backoff_max: Maximum delay between retries
+        """
+        self.display_name = display_name
+        self.bucket = bucket
+        self.breaker = breaker
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.requests = 0
+        self.failures = 0
+        self.retried = 0
+        self.throttled = 0
+        self.rejected = 0
+        self.failovers = 0
+
+    @classmethod
+    def from_config(cls, backend, config):
+        """
+        Create a guard from the ``[resilience]`` table of the configuration.
+
+        Settings in ``[resilience.<backend name>]`` override the shared ones.
+
+        Args:
+            backend: TTSBackend instance
+            config: Configuration dictionary
+
+        Returns:
+            BackendGuard: Guard for the backend
+        """
+        shared = config.get("resilience", {})
+        settings = {**shared, **shared.get(backend.name, {})}
+        return cls(
+            backend.display_name,
+            TokenBucket(
+                settings.get("requests_per_second", DEFAULT_REQUESTS_PER_SECOND),
+                settings.get("burst", DEFAULT_BURST)
+            ),
+            CircuitBreaker(
+                settings.get("breaker_failures", DEFAULT_BREAKER_FAILURES),
+                settings.get("breaker_reset_seconds", DEFAULT_BREAKER_RESET_SECONDS)
+            ),
+            # edge_chunk_retries predates the [resilience] table
+            settings.get("retries", config.get("edge_chunk_retries", DEFAULT_RETRIES)),
+            settings.get("backoff_base_seconds", DEFAULT_BACKOFF_BASE_SECONDS),
+            settings.get("backoff_max_seconds", DEFAULT_BACKOFF_MAX_SECONDS)
+        )
+
+    async def call(self, request):
+        """
+        Send a request through the rate limiter, retrying failures.
+
+        Args:
+            request: Callable returning a new awaitable for every attempt
+
+        Returns:
+            The request's result
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            Exception: The last error once all retries failed
+        """
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.display_name} circuit breaker is open")
+
+            await self.bucket.acquire()
+            self.requests += 1
+            try:
+                result = await request()
+            except Exception as e:
+                self.failures += 1
+                self.breaker.record_failure()
+                if is_throttled(e):
+                    self.throttled += 1
+                    self.bucket.throttle()
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                delay = max(backoff_delay(attempt, self.backoff_base, self.backoff_max), retry_after(e))
+                print(f"{self.display_name} request failed: {e}. "
+                      f"Retrying in {delay:.1f}s ({attempt + 1}/{self.retries}).")
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                self.bucket.recover()
+                return result
+
+    def metrics(self):
+        """
+        Report request, retry and circuit breaker counters.
+
+        Returns:
+            dict: Counters, current request rate and breaker state
+        """
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retried,
+            "throttled": self.throttled,
+            "rejected": self.rejected,
+            "failovers": self.failovers,
+            "requests_per_second": self.bucket.rate,
+            "breaker_state": self.breaker.state,
+            "breaker_trips": self.breaker.trips
+        }
+
+
+def backoff_delay(attempt, base, maximum):
+    """
+    Compute an exponential backoff delay with full jitter.
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        base: Delay scale of the first retry
+        maximum: Upper bound of the delay
+
+    Returns:
+        float: Delay in seconds, uniformly drawn from [0, min(maximum, base * 2 ** attempt)]
+    """
+    return random.uniform(0, min(maximum, base * 2 ** attempt))
+
+
+def is_throttled(error):
+    """
+    Check whether an error means the service rejected the request as too frequent.
+
+    Args:
+        error: Exception raised by a backend
+
+    Returns:
+        bool: True for HTTP 429 responses
+    """
+    return getattr(error, "status", None) == 429 or "429" in str(error)
+
+
+def retry_after(error):
+    """
+    Read the delay requested by a Retry-After header of an HTTP error.
+
+    Args:
+        error: Exception raised by a backend
+
+    Returns:
+        float: Requested delay in seconds, or 0
+    """
+    headers = getattr(error, "headers", None) or {}
+    try:
+        return float(headers.get("Retry-After", 0))
+    except (TypeError, ValueError):
+        return 0.0
@@ -0,0 +1,78 @@
+import os
+import time
+import shutil
+
+# Task directory retention defaults (overridable in the [jobs] table of config.toml)
+DEFAULT_MAX_AGE_HOURS = 24
+DEFAULT_MAX_TOTAL_MB = 2048
+DEFAULT_CLEANUP_INTERVAL_SECONDS = 600
+
+
+def prune_task_dirs(root, task_ids, max_age_seconds=None, max_bytes=None, now=None):
+    """
+    Delete old task directories so the output root does not grow without limit.
+
+    Only the directories of the given task IDs are considered, so outputs
+    other tools write under the same root (single-file CLI runs, batch
+    outputs) are never touched. Directories not modified for
+    ``max_age_seconds`` are deleted; then the least recently modified ones
+    are deleted until the rest fit into ``max_bytes``.
+
+    Args:
+        root: Directory holding the task directories
+        task_ids: IDs of the task directories that may be deleted (e.g. finished jobs)
+        max_age_seconds: Maximum age of a task directory, or None for no limit
+        max_bytes: Maximum total size of the considered directories, or None for no limit
+        now: Current time; defaults to time.time()
+
+    Returns:
+        list: Paths of the deleted directories
+    """
+    now = time.time() if now is None else now
+    tasks = []
+    try:
+        entries = list(os.scandir(root))
+    except OSError:
+        return []
+    for entry in entries:
+        if entry.name not in task_ids or not entry.is_dir(follow_symlinks=False):
+            continue
+        modified, size = _usage(entry.path)
+        tasks.append((modified, size, entry.path))
+
+    # Oldest first
+    tasks.sort()
+    total = sum(size for _, size, _ in tasks)
+    removed = []
+    for modified, size, path in tasks:
+        expired = max_age_seconds is not None and now - modified > max_age_seconds
+        over_budget = max_bytes is not None and total > max_bytes
+        if not expired and not over_budget:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed.append(path)
+    return removed
+
+
+def _usage(path):
+    """
+    Measure a task directory.
+
+    Args:
+        path: Task directory
+
+    Returns:
+        tuple: (latest modification time of the directory or its files, total file size in bytes)
+    """
+    modified = os.path.getmtime(path)
+    size = 0
+    for dir_path, _, files in os.walk(path):
+        for name in files:
+            try:
+                stat = os.stat(os.path.join(dir_path, name))
+            except OSError:
+                continue
+            modified = max(modified, stat.st_mtime)
+            size += stat.st_size
+    return modified, size
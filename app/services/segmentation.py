@@ -0,0 +1,179 @@
+import math
+from operator import attrgetter
+from bisect import bisect_left, bisect_right
+import numpy as np
+from app.services.timing import TICKS_PER_SECOND
+
+# Pauses longer than this (half a second, in ticks) always start a new segment
+PAUSE_BREAK_TICKS = TICKS_PER_SECOND // 2
+
+# A natural break is allowed once a segment reaches this share of the line length
+NATURAL_BREAK_RATIO = 0.6
+
+# Punctuation ending a word that makes the following word a natural break
+BREAK_PUNCTUATION = frozenset('.!?。！？,;:，；：')
+
+# Words that often start a new clause
+TRANSITION_WORDS = frozenset([
+    'and', 'but', 'or', 'so', 'then', 'however', 'therefore',
+    'moreover', 'furthermore', 'meanwhile', 'consequently', 'also',
+    'additionally', 'finally', 'firstly', 'secondly', 'lastly',
+    '而且', '但是', '然而', '因此', '所以', '然後', '同時', '另外',
+    '首先', '其次', '最後', '此外', '再者', '接著', '最終'
+])
+
+
+class WordArrays:
+    """
+    Compact column representation of cleaned word boundaries.
+
+    Offsets and durations are stored as int64 tick arrays. Word texts are
+    interned into a vocabulary and referenced by integer codes, so per-word
+    properties only have to be computed once per distinct word.
+    """
+
+    __slots__ = ("texts", "codes", "vocabulary", "offsets", "durations")
+
+    def __init__(self, texts, codes, vocabulary, offsets, durations):
+        """
+        Initialize from parallel columns.
+
+        Args:
+            texts: List of word texts
+            codes: int64 array of vocabulary indexes, one per word
+            vocabulary: List of distinct word texts
+            offsets: int64 array of offsets in ticks
+            durations: int64 array of durations in ticks
+        """
+        self.texts = texts
+        self.codes = codes
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.durations = durations
+
+    @classmethod
+    def from_boundaries(cls, word_boundaries):
+        """
+        Build the columns from WordBoundary records.
+
+        Args:
+            word_boundaries: List of cleaned word boundaries
+
+        Returns:
+            WordArrays: Column representation of the boundaries
+        """
+        texts = list(map(attrgetter("text"), word_boundaries))
+        index = {}
+        codes = [index.setdefault(text, len(index)) for text in texts]
+        return cls(
+            texts,
+            np.array(codes, dtype=np.int64),
+            list(index),
+            np.fromiter(map(attrgetter("offset"), word_boundaries), dtype=np.int64, count=len(texts)),
+            np.fromiter(map(attrgetter("duration"), word_boundaries), dtype=np.int64, count=len(texts))
+        )
+
+    def __len__(self):
+        return len(self.texts)
+
+    def spans(self):
+        """
+        Return the start and end of every word.
+
+        Returns:
+            tuple: (starts, ends) int64 arrays in ticks
+        """
+        return self.offsets, self.offsets + self.durations
+
+
+def find_segments(words, max_line_length):
+    """
+    Split words into subtitle segments using vectorized break candidates.
+
+    Produces the same segments as ``SegmentBuilder``: a segment ends before
+    a word that would push it past ``max_line_length``, before a natural
+    break point once it holds 60% of the line length, or before a pause
+    longer than half a second (compared in integer ticks). Pause gaps,
+    natural break points and cumulative character counts are computed for
+    all words at once; the remaining walk only visits segment starts.
+
+    Args:
+        words: WordArrays of cleaned word boundaries
+        max_line_length: Maximum characters per line
+
+    Returns:
+        list: (start_index, end_index) word ranges of each segment
+    """
+    count = len(words)
+    if count == 0:
+        return []
+
+    vocabulary = words.vocabulary
+    codes = words.codes
+    offsets = words.offsets
+
+    # Pause before each word, measured from the end of the previous word
+    pause_break = np.zeros(count, dtype=bool)
+    pause_break[1:] = offsets[1:] - (offsets[:-1] + words.durations[:-1]) > PAUSE_BREAK_TICKS
+
+    # Per-word properties are computed once per distinct word, then gathered
+    ends_with_break = np.array(
+        [text[-1:] in BREAK_PUNCTUATION for text in vocabulary], dtype=bool)[codes]
+    is_transition = np.array(
+        [text.lower() in TRANSITION_WORDS for text in vocabulary], dtype=bool)[codes]
+    lengths = np.array([len(text) for text in vocabulary], dtype=np.int64)[codes]
+
+    # Natural break before each word: punctuation after the previous word or a transition word
+    natural_break = is_transition
+    natural_break[1:] |= ends_with_break[:-1]
+
+    # prefix[k] = characters of words[:k] each followed by one space
+    prefix = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(lengths + 1, out=prefix[1:])
+
+    # The walk below visits one position per segment; plain lists and bisect
+    # keep its per-step cost well below that of numpy scalar calls
+    prefix = prefix.tolist()
+    next_pause = _next_true_index(pause_break).tolist()
+    next_natural = _next_true_index(natural_break).tolist()
+    natural_chars = math.ceil(max_line_length * NATURAL_BREAK_RATIO)
+
+    segments = []
+    start = 0
+    while start < count:
+        # A segment's char count before word i is prefix[i] - prefix[start] - 1
+        base = prefix[start] + 1
+        first = start + 1
+        end = next_pause[first] if first < count else count
+
+        # First word whose addition exceeds the line length
+        overflow = bisect_right(prefix, base + max_line_length) - 1
+        if overflow < end:
+            end = overflow if overflow > first else first
+
+        # First natural break once the segment holds enough characters
+        earliest = bisect_left(prefix, base + natural_chars)
+        if earliest < first:
+            earliest = first
+        if earliest < end and next_natural[earliest] < end:
+            end = next_natural[earliest]
+
+        segments.append((start, end))
+        start = end
+
+    return segments
+
+
+def _next_true_index(flags):
+    """
+    For every position, find the index of the next True flag at or after it.
+
+    Args:
+        flags: Boolean array
+
+    Returns:
+        numpy.ndarray: Index array, len(flags) where no True flag follows
+    """
+    count = len(flags)
+    positions = np.where(flags, np.arange(count), count)
+    return np.minimum.accumulate(positions[::-1])[::-1]
@@ -0,0 +1,198 @@
+"""
+Silence trimming on 16-bit mono PCM with word timings kept in sync.
+
+Audio is cut only at whole 20 ms frames, and sample rates are required to
+hold a whole number of samples per frame, so every cut lies on an exact
+tick. Word boundaries are moved by exactly the ticks removed before them.
+"""
+import numpy as np
+from app.services.timing import TICKS_PER_SECOND, WordBoundary
+
+# Length of the analysis frames in ticks (20 ms)
+FRAME_TICKS = 200000
+
+# Silence trimming defaults (overridable in the [audio] table of config.toml)
+DEFAULT_MAX_SILENCE_MS = 400
+DEFAULT_SILENCE_THRESHOLD_DB = -50.0
+
+
+class SilenceTrimmer:
+    """
+    Streaming silence shortener for 16-bit mono PCM.
+
+    Frames whose peak stays below the threshold are silent. Every run of
+    silent frames longer than ``max_silence_ticks`` (including leading and
+    trailing silence) is shortened to that length by removing its middle,
+    so the silence right after and right before speech is kept. PCM may be
+    fed in blocks of any size; only the open silent run at the end of a
+    block is held back, at most ``max_silence_ticks`` of it.
+    """
+
+    def __init__(self, sample_rate, max_silence_ticks=DEFAULT_MAX_SILENCE_MS * 10000,
+                 threshold_db=DEFAULT_SILENCE_THRESHOLD_DB):
+        """
+        Initialize the trimmer.
+
+        Args:
+            sample_rate: Sample rate of the PCM in Hz
+            max_silence_ticks: Longest silence kept, in ticks
+            threshold_db: Peak level in dBFS below which a frame is silent
+
+        Raises:
+            ValueError: If a 20 ms frame is not a whole number of samples
+        """
+        if sample_rate * FRAME_TICKS % TICKS_PER_SECOND:
+            raise ValueError(f"Silence trimming needs a sample rate divisible by 50 Hz, not {sample_rate}")
+        self.sample_rate = sample_rate
+        self.frame_samples = sample_rate * FRAME_TICKS // TICKS_PER_SECOND
+        self.max_frames = max(1, max_silence_ticks // FRAME_TICKS)
+        self.head_frames = self.max_frames // 2
+        self.tail_frames = self.max_frames - self.head_frames
+        self.threshold = int(32768 * 10 ** (threshold_db / 20))
+        self._partial = b""
+        # Frames of the silent run still open at the end of the last block
+        self._held = np.empty((0, self.frame_samples), dtype="<i2")
+        self._run_frames = 0
+        self._run_start = 0
+        self._frames_in = 0
+        # Removed frame ranges [start, end) on the input timeline
+        self._cut_starts = []
+        self._cut_ends = []
+
+    def process(self, pcm):
+        """
+        Trim a block of PCM.
+
+        Args:
+            pcm: 16-bit little-endian mono PCM bytes
+
+        Returns:
+            bytes: Trimmed PCM that is ready to be written out
+        """
+        data = self._partial + pcm
+        usable = len(data) - len(data) % (2 * self.frame_samples)
+        self._partial = data[usable:]
+        frames = np.frombuffer(data, dtype="<i2", count=usable // 2).reshape(-1, self.frame_samples)
+        return self._trim(frames, final=False)
+
+    def flush(self):
+        """
+        Trim the rest of the audio after the last block.
+
+        Returns:
+            bytes: Remaining trimmed PCM, including a final partial frame
+        """
+        frames = np.empty((0, self.frame_samples), dtype="<i2")
+        return self._trim(frames, final=True) + self._partial
+
+    def removed_ticks(self):
+        """
+        Return the total length of the removed audio.
+
+        Returns:
+            int: Removed ticks
+        """
+        return (sum(self._cut_ends) - sum(self._cut_starts)) * FRAME_TICKS
+
+    def map_ticks(self, ticks):
+        """
+        Map times of the input audio onto the trimmed audio.
+
+        Times inside a removed range move to where the range was cut.
+
+        Args:
+            ticks: Array of times in ticks on the input timeline
+
+        Returns:
+            numpy.ndarray: int64 times on the trimmed timeline
+        """
+        ticks = np.asarray(ticks, dtype=np.int64)
+        if not self._cut_starts:
+            return ticks
+        starts = np.array(self._cut_starts, dtype=np.int64) * FRAME_TICKS
+        ends = np.array(self._cut_ends, dtype=np.int64) * FRAME_TICKS
+        removed = np.concatenate(([0], np.cumsum(ends - starts)))
+        # Cuts ending at or before each time are removed entirely
+        index = np.searchsorted(ends, ticks, side="right")
+        inside = (index < len(starts)) & (ticks > starts[np.minimum(index, len(starts) - 1)])
+        return np.where(inside, starts[np.minimum(index, len(starts) - 1)], ticks) - removed[index]
+
+    def rewrite(self, word_boundaries):
+        """
+        Move word boundaries onto the trimmed timeline.
+
+        Args:
+            word_boundaries: List of WordBoundary on the input timeline
+
+        Returns:
+            list: WordBoundary records on the trimmed timeline
+        """
+        if not self._cut_starts or not word_boundaries:
+            return list(word_boundaries)
+        offsets = np.fromiter((wb.offset for wb in word_boundaries), np.int64, len(word_boundaries))
+        ends = np.fromiter((wb.end for wb in word_boundaries), np.int64, len(word_boundaries))
+        new_offsets = self.map_ticks(offsets).tolist()
+        new_ends = self.map_ticks(ends).tolist()
+        return [
+            WordBoundary(wb.text, offset, end - offset)
+            for wb, offset, end in zip(word_boundaries, new_offsets, new_ends)
+        ]
+
+    def _trim(self, frames, final):
+        """
+        Shorten the silent runs of a block of whole frames.
+
+        The frames held back from the previous block are put in front of
+        the block. They may already be shortened, in which case the run is
+        longer than the frames present and its middle is cut anyway.
+
+        Args:
+            frames: (n, frame_samples) int16 array
+            final: Close a silent run reaching the end of the block
+
+        Returns:
+            bytes: Trimmed PCM of the frames that are decided
+        """
+        peaks = np.maximum(frames.max(axis=1, initial=0), -(frames.min(axis=1, initial=0).astype(np.int32)))
+        silent = np.concatenate((np.ones(len(self._held), dtype=bool), peaks < self.threshold))
+        held = len(self._held)
+        frames = np.concatenate((self._held, frames))
+        # Frames of the held run that were already dropped
+        dropped = self._run_frames - held
+        first_frame = self._frames_in
+        self._frames_in += len(frames) - held
+
+        change = np.diff(np.concatenate(([0], silent.view(np.int8), [0])))
+        starts = np.flatnonzero(change == 1)
+        ends = np.flatnonzero(change == -1)
+        keep = np.ones(len(frames), dtype=bool)
+        decided = len(frames)
+
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            if start == 0 and self._run_frames:
+                # Continues the held run, including the frames already dropped from it
+                run_start = self._run_start
+                length = end + dropped
+            else:
+                run_start = first_frame + start - held
+                length = end - start
+            if end == len(frames) and not final:
+                # Still open: hold it back, keeping at most its head and its latest tail
+                decided = start
+                if length > self.max_frames:
+                    self._held = np.concatenate((frames[start:start + self.head_frames],
+                                                 frames[end - self.tail_frames:end]))
+                else:
+                    self._held = frames[start:end]
+                self._run_start = run_start
+                self._run_frames = length
+                break
+            if length > self.max_frames:
+                keep[start + self.head_frames:end - self.tail_frames] = False
+                self._cut_starts.append(run_start + self.head_frames)
+                self._cut_ends.append(run_start + length - self.tail_frames)
+        else:
+            self._held = frames[:0]
+            self._run_frames = 0
+
+        return frames[:decided][keep[:decided]].tobytes()
@@ -1,5 +1,9 @@
-from app.utils.text_to_srt import text_to_srt
-import re
+from contextlib import ExitStack
+from app.services.subtitle_writers import SUBTITLE_FORMATS, SrtWriter, create_writer
+from app.services.segmentation import (
+    WordArrays, find_segments, BREAK_PUNCTUATION, PAUSE_BREAK_TICKS, TRANSITION_WORDS)
+from app.services.alignment import OriginalTextAligner
+from app.services.cleanup import TextCleaner
 import string
 import os
 import sys
@@ -14,6 +18,11 @@ class SubtitleService:
     """
     Service for generating SRT subtitles with intelligent text segmentation.
     Handles punctuation preservation and spacing optimization.
+
+    Word boundaries are WordBoundary records in integer ticks; times stay in
+    ticks through cleaning, alignment and segmentation and are only
+    formatted when a cue is written. Cues are formatted by the writers of
+    ``subtitle_writers``, so one segmentation pass can feed several formats.
     """
 
     def __init__(self, config):
@@ -24,6 +33,11 @@ class SubtitleService:
             config: Configuration dictionary
         """
         self.config = config
+        self.cleaner = TextCleaner()
+        # Subtitle formats written next to output.srt
+        self.formats = list(config.get("subtitles", {}).get("formats", []))
+        for subtitle_format in self.formats:
+            create_writer(subtitle_format)
 
     def generate_srt(self, word_boundaries, max_line_length=40, preserve_punctuation=True, original_text=None):
         """
@@ -38,47 +52,255 @@ class SubtitleService:
         Returns:
             str: Complete SRT content
         """
-        if not word_boundaries:
-            return ""
+        return "".join(self.iter_srt(
+            word_boundaries, max_line_length, preserve_punctuation, original_text))
+
+    def write_srt(self, word_boundaries, destination, max_line_length=40, preserve_punctuation=True,
+                  original_text=None):
+        """
+        Write SRT content cue by cue without building the whole file in memory.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            destination: Output file path or writable text file object
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+
+        Returns:
+            int: Number of cues written
+        """
+        return self.write_subtitles(
+            word_boundaries, {"srt": destination}, max_line_length, preserve_punctuation, original_text)
+
+    def write_subtitles(self, word_boundaries, destinations, max_line_length=40, preserve_punctuation=True,
+                        original_text=None):
+        """
+        Write several subtitle formats from a single segmentation pass.
+
+        Every cue is handed to the writer of each format as soon as it
+        closes, so no file is built in memory.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            destinations: Dict mapping format names (see ``SUBTITLE_FORMATS``)
+                to output file paths or writable text file objects
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+
+        Returns:
+            int: Number of cues written
+
+        Raises:
+            ValueError: If a format is unknown
+        """
+        writers = [(create_writer(subtitle_format, self.config), destination)
+                   for subtitle_format, destination in destinations.items()]
+        with ExitStack() as stack:
+            outputs = []
+            for writer, destination in writers:
+                if isinstance(destination, (str, os.PathLike)):
+                    destination = stack.enter_context(open(destination, "w", encoding="utf-8"))
+                destination.write(writer.header())
+                outputs.append((writer, destination))
+
+            count = 0
+            for cue in self.iter_cues(word_boundaries, max_line_length, preserve_punctuation, original_text):
+                for writer, destination in outputs:
+                    destination.write(writer.cue(cue))
+                count += 1
+
+            for writer, destination in outputs:
+                destination.write(writer.footer())
+        return count
+
+    def write_subtitle_files(self, word_boundaries, output_dir, max_line_length=40, preserve_punctuation=True,
+                             original_text=None, formats=None):
+        """
+        Write output.srt and the configured subtitle formats into a directory.
+
+        The files are written under temporary names and moved into place
+        together, output.srt last, so its presence marks complete subtitles.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            output_dir: Directory to write output.<extension> files to
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+            formats: Formats written besides SRT; defaults to
+                ``formats`` in the ``[subtitles]`` table
+
+        Returns:
+            tuple: (dict with the path of the file of every format written,
+                SRT included; number of cues written)
+
+        Raises:
+            ValueError: If a format is unknown
+        """
+        formats = self.formats if formats is None else formats
+        paths = {}
+        for subtitle_format in [f for f in formats if f != "srt"] + ["srt"]:
+            if subtitle_format not in SUBTITLE_FORMATS:
+                raise ValueError(f"Unknown subtitle format {subtitle_format!r}")
+            paths[subtitle_format] = os.path.join(
+                output_dir, f"output.{SUBTITLE_FORMATS[subtitle_format].extension}")
+
+        count = self.write_subtitles(
+            word_boundaries, {subtitle_format: path + ".tmp" for subtitle_format, path in paths.items()},
+            max_line_length, preserve_punctuation, original_text)
+        for path in paths.values():
+            os.replace(path + ".tmp", path)
+        return paths, count
+
+    def iter_srt(self, word_boundaries, max_line_length=40, preserve_punctuation=True, original_text=None):
+        """
+        Yield SRT blocks one cue at a time as segments close.
+
+        Word boundaries may be any iterable, including a generator fed by a
+        TTS stream; each cue is yielded as soon as the word that closes its
+        segment arrives.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+
+        Yields:
+            str: SRT block for each subtitle cue
+        """
+        yield from self.iter_subtitles(
+            word_boundaries, "srt", max_line_length, preserve_punctuation, original_text)
+
+    def iter_subtitles(self, word_boundaries, subtitle_format="srt", max_line_length=40, preserve_punctuation=True,
+                       original_text=None):
+        """
+        Yield a subtitle file in pieces: its header, one piece per cue, its footer.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            subtitle_format: Format name (see ``SUBTITLE_FORMATS``)
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
 
-        # Clean and prepare word boundaries
+        Yields:
+            str: Non-empty pieces of the subtitle file
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        writer = create_writer(subtitle_format, self.config)
+        header = writer.header()
+        if header:
+            yield header
+        for cue in self.iter_cues(word_boundaries, max_line_length, preserve_punctuation, original_text):
+            yield writer.cue(cue)
+        footer = writer.footer()
+        if footer:
+            yield footer
+
+    def iter_cues(self, word_boundaries, max_line_length=40, preserve_punctuation=True, original_text=None):
+        """
+        Yield subtitle cues as segments close.
+
+        Word boundaries may be any iterable, including a generator fed by a
+        TTS stream. Materialized lists go through the vectorized
+        segmentation engine, which produces the same cues.
+
+        Args:
+            word_boundaries: Iterable of word boundary info from TTS service
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+
+        Yields:
+            dict: Cue with its index, text, start and end ticks and words
+        """
+        if isinstance(word_boundaries, (list, tuple)):
+            yield from self._iter_cues_vectorized(
+                word_boundaries, max_line_length, preserve_punctuation, original_text)
+            return
+
+        stream = SubtitleStream(
+            self, max_line_length, preserve_punctuation, original_text)
+        for word_info in word_boundaries:
+            yield from stream.feed_cues(word_info)
+        yield from stream.close_cues()
+
+    def _iter_cues_vectorized(self, word_boundaries, max_line_length, preserve_punctuation, original_text):
+        """
+        Yield the cues of a complete word boundary list using array segmentation.
+
+        Produces the same output as the streaming path.
+
+        Args:
+            word_boundaries: List of word boundary info from TTS service
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+
+        Yields:
+            dict: Cue with its index, text, start and end ticks and words
+        """
         cleaned_boundaries = self._clean_word_boundaries(
             word_boundaries, preserve_punctuation)
-
         if not cleaned_boundaries:
-            return ""
+            return
 
-        # If we have original text and want to preserve punctuation, use it as reference
         if original_text and preserve_punctuation:
             cleaned_boundaries = self._align_with_original_text(
                 cleaned_boundaries, original_text)
 
-        srt_content = ""
+        words = WordArrays.from_boundaries(cleaned_boundaries)
+        starts, ends = words.spans()
+        starts = starts.tolist()
+        ends = ends.tolist()
+        texts = words.texts
+
         subtitle_id = 1
+        for start, end in find_segments(words, max_line_length):
+            subtitle_text = self._fix_spacing(
+                ' '.join(texts[start:end]), preserve_punctuation).strip()
 
-        # Group words into logical subtitle segments
-        segments = self._create_segments(cleaned_boundaries, max_line_length)
+            # Skip empty segments
+            if not subtitle_text:
+                continue
 
-        for segment in segments:
-            if segment['words']:
-                # Build subtitle text with proper spacing
-                subtitle_text = self._build_subtitle_text(
-                    segment['words'], preserve_punctuation)
+            yield {
+                'index': subtitle_id,
+                'text': subtitle_text,
+                'start': starts[start],
+                'end': ends[end - 1],
+                'words': cleaned_boundaries[start:end]
+            }
+            subtitle_id += 1
 
-                # Skip empty segments
-                if not subtitle_text.strip():
-                    continue
+    async def stream_srt_async(self, items, max_line_length=40, preserve_punctuation=True, original_text=None):
+        """
+        Yield SRT blocks from an asynchronous TTS stream while it is still running.
 
-                # Generate SRT block
-                srt_content += text_to_srt(
-                    subtitle_id,
-                    subtitle_text,
-                    segment['start_time'],
-                    segment['end_time']
-                )
-                subtitle_id += 1
+        Args:
+            items: Async iterable of TTS stream items, e.g. VoiceService.stream_async;
+                items other than word boundaries are ignored
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
 
-        return srt_content
+        Yields:
+            str: SRT block for each subtitle cue
+        """
+        stream = SubtitleStream(
+            self, max_line_length, preserve_punctuation, original_text)
+        async for item in items:
+            if item["type"] != "WordBoundary":
+                continue
+            for block in stream.feed(item["boundary"]):
+                yield block
+        for block in stream.close():
+            yield block
 
     def _align_with_original_text(self, word_boundaries, original_text):
         """
@@ -94,35 +316,11 @@ class SubtitleService:
         if not word_boundaries or not original_text:
             return word_boundaries
 
-        import re
-
-        tokens = re.findall(r'\w+|[^\w\s]', original_text, re.UNICODE)
-        if not tokens:
-            return word_boundaries
-
+        aligner = OriginalTextAligner(original_text)
         aligned_boundaries = []
-        token_index = 0
-
         for wb in word_boundaries:
-            if token_index >= len(tokens):
-                aligned_boundaries.append(wb)
-                continue
-
-            pieces = []
-            while token_index < len(tokens):
-                token = tokens[token_index]
-                pieces.append(token)
-                token_index += 1
-                if re.match(r'\w', token, re.UNICODE):
-                    while token_index < len(tokens) and not re.match(r'\w', tokens[token_index], re.UNICODE):
-                        pieces.append(tokens[token_index])
-                        token_index += 1
-                    break
-
-            aligned_word = wb.copy()
-            aligned_word["text"] = ''.join(pieces)
-            aligned_boundaries.append(aligned_word)
-
+            aligned_boundaries.extend(aligner.align(wb))
+        aligned_boundaries.extend(aligner.flush())
         return aligned_boundaries
 
     def _clean_word_boundaries(self, word_boundaries, preserve_punctuation):
@@ -139,29 +337,39 @@ class SubtitleService:
         cleaned = []
 
         for word_info in word_boundaries:
-            word = word_info["text"]
+            cleaned_info = self._clean_word_info(word_info, preserve_punctuation)
+            if cleaned_info:
+                cleaned.append(cleaned_info)
 
-            # Skip completely empty words
-            if not word or not word.strip():
-                continue
+        return cleaned
 
-            # Clean the word
-            cleaned_word = self._clean_word(word, preserve_punctuation)
+    def _clean_word_info(self, word_info, preserve_punctuation):
+        """
+        Clean a single word boundary.
 
-            # Skip if cleaning resulted in empty word
-            if not cleaned_word:
-                continue
+        Args:
+            word_info: Raw word boundary
+            preserve_punctuation: Whether to preserve punctuation
 
-            # Create cleaned word info
-            cleaned_info = {
-                "text": cleaned_word,
-                "offset": word_info["offset"],
-                "duration": word_info["duration"]
-            }
+        Returns:
+            WordBoundary or None: Cleaned word boundary, or None if the word is empty
+        """
+        word = word_info.text
 
-            cleaned.append(cleaned_info)
+        # Skip completely empty words
+        if not word:
+            return None
 
-        return cleaned
+        # Clean the word
+        cleaned_word = self.cleaner.clean_word(word, preserve_punctuation)
+
+        # Skip if cleaning resulted in an empty (or whitespace-only) word
+        if not cleaned_word:
+            return None
+
+        if cleaned_word == word:
+            return word_info
+        return word_info.with_text(cleaned_word)
 
     def _clean_word(self, word, preserve_punctuation):
         """
@@ -174,17 +382,7 @@ class SubtitleService:
         Returns:
             str: Cleaned word
         """
-        # Remove extra whitespace
-        word = word.strip()
-
-        if not preserve_punctuation:
-            # Remove punctuation but keep alphanumeric and basic symbols
-            word = re.sub(r'[^\w\s\-\']', '', word)
-
-        # Clean up multiple spaces
-        word = re.sub(r'\s+', ' ', word)
-
-        return word.strip()
+        return self.cleaner.clean_word(word, preserve_punctuation)
 
     def _create_segments(self, word_boundaries, max_line_length):
         """
@@ -195,66 +393,17 @@ class SubtitleService:
             max_line_length: Maximum characters per line
 
         Returns:
-            List of segments with start_time, end_time, and words
+            List of segments with start and end ticks and their words
         """
+        builder = SegmentBuilder(self, max_line_length)
         segments = []
-        current_segment = {
-            'words': [],
-            'start_time': 0,
-            'end_time': 0,
-            'char_count': 0
-        }
-
-        for i, word_info in enumerate(word_boundaries):
-            word = word_info["text"]
-            start_time = word_info["offset"] / 10000000  # Convert to seconds
-            duration = word_info["duration"] / 10000000
-            end_time = start_time + duration
-
-            # Initialize segment if it's the first word
-            if not current_segment['words']:
-                current_segment['start_time'] = start_time
-
-            # Calculate estimated length with this word
-            space_needed = 1 if current_segment['words'] else 0
-            estimated_length = current_segment['char_count'] + \
-                len(word) + space_needed
-
-            # Determine if we should start a new segment
-            should_break = self._should_break_segment(
-                current_segment, word, estimated_length, max_line_length, i, word_boundaries
-            )
-
-            if should_break:
-                # Finalize current segment
-                if current_segment['words']:
-                    current_segment['end_time'] = current_segment['words'][-1]['end_time']
-                    segments.append(current_segment)
-
-                # Start new segment
-                current_segment = {
-                    'words': [{'text': word, 'start_time': start_time, 'end_time': end_time}],
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'char_count': len(word)
-                }
-            else:
-                # Add word to current segment
-                current_segment['words'].append({
-                    'text': word,
-                    'start_time': start_time,
-                    'end_time': end_time
-                })
-                current_segment['char_count'] += len(word) + space_needed
-                current_segment['end_time'] = end_time
-
-        # Add the last segment
-        if current_segment['words']:
-            segments.append(current_segment)
-
+        for word_info in word_boundaries:
+            segments.extend(builder.add(word_info))
+        segments.extend(builder.finish())
         return segments
 
-    def _should_break_segment(self, current_segment, word, estimated_length, max_line_length, index, word_boundaries):
+    def _should_break_segment(self, current_segment, word, estimated_length, max_line_length,
+                              word_info, previous_info):
         """
         Determine if we should break the current segment and start a new one.
 
@@ -263,8 +412,8 @@ class SubtitleService:
             word: Current word being processed
             estimated_length: Estimated total length with current word
             max_line_length: Maximum allowed length
-            index: Current word index
-            word_boundaries: All word boundaries
+            word_info: Word boundary of the current word
+            previous_info: Word boundary of the previous word, or None
 
         Returns:
             bool: True if should break segment
@@ -281,21 +430,14 @@ class SubtitleService:
         has_natural_break = (
             current_segment['char_count'] >= max_line_length * 0.6 and
             self._is_natural_break_point(
-                current_segment['words'][-1]['text'], word)
+                current_segment['words'][-1].text, word)
         )
         if has_natural_break:
             return True
 
-        # Check for long pause if we have timing information
-        if len(current_segment['words']) > 0 and index > 0:
-            last_word = current_segment['words'][-1]
-            current_start = word_boundaries[index]["offset"] / 10000000
-            previous_duration = word_boundaries[index-1]["duration"] / 10000000
-            last_end = last_word['start_time'] + previous_duration
-
-            # If there's a pause longer than 0.5 seconds, consider breaking
-            if current_start - last_end > 0.5:
-                return True
+        # Break on a pause longer than half a second after the previous word
+        if previous_info is not None and word_info.offset - previous_info.end > PAUSE_BREAK_TICKS:
+            return True
 
         return False
 
@@ -310,38 +452,19 @@ class SubtitleService:
         Returns:
             bool: True if this is a natural break point
         """
-        # Check if previous word ends with strong punctuation
-        strong_punctuation = ['.', '!', '?', '。', '！', '？']
-        for mark in strong_punctuation:
-            if previous_word.endswith(mark):
-                return True
-
-        # Check if previous word ends with medium punctuation
-        medium_punctuation = [',', ';', ':', '，', '；', '：']
-        for mark in medium_punctuation:
-            if previous_word.endswith(mark):
-                return True
-
-        # Check for transition words that often start new clauses
-        transition_words = [
-            'and', 'but', 'or', 'so', 'then', 'however', 'therefore',
-            'moreover', 'furthermore', 'meanwhile', 'consequently', 'also',
-            'additionally', 'finally', 'firstly', 'secondly', 'lastly',
-            '而且', '但是', '然而', '因此', '所以', '然後', '同時', '另外',
-            '首先', '其次', '最後', '此外', '再者', '接著', '最終'
-        ]
-
-        if current_word.lower() in transition_words:
+        # Previous word ends with strong or medium punctuation
+        if previous_word[-1:] in BREAK_PUNCTUATION:
             return True
 
-        return False
+        # Transition words often start new clauses
+        return current_word.lower() in TRANSITION_WORDS
 
     def _build_subtitle_text(self, words, preserve_punctuation):
         """
         Build subtitle text from word list with proper spacing and formatting.
 
         Args:
-            words: List of word dictionaries
+            words: List of WordBoundary records
             preserve_punctuation: Whether to preserve punctuation
 
         Returns:
@@ -351,7 +474,7 @@ class SubtitleService:
             return ""
 
         # Extract text from words
-        text_parts = [word['text'] for word in words]
+        text_parts = [word.text for word in words]
 
         # Join with single spaces
         subtitle_text = ' '.join(text_parts)
@@ -372,28 +495,200 @@ class SubtitleService:
         Returns:
             str: Text with fixed spacing
         """
-        if not text:
-            return ""
+        return self.cleaner.fix_spacing(text, preserve_punctuation)
+
+
+class SegmentBuilder:
+    """
+    Incremental segmenter that groups words into subtitle segments.
+
+    Words are added one at a time; a segment is returned as soon as the
+    next word decides that it is closed. A segment is a dict with its
+    ``words`` (WordBoundary records), ``start`` and ``end`` ticks and
+    ``char_count``.
+    """
+
+    def __init__(self, service, max_line_length):
+        """
+        Initialize the builder.
+
+        Args:
+            service: SubtitleService providing the break rules
+            max_line_length: Maximum characters per line
+        """
+        self.service = service
+        self.max_line_length = max_line_length
+        self.previous_info = None
+        self.current_segment = {'words': [], 'start': 0, 'end': 0, 'char_count': 0}
+
+    def add(self, word_info):
+        """
+        Add a cleaned word boundary.
+
+        Args:
+            word_info: Cleaned word boundary info
+
+        Returns:
+            list: Segments closed by this word (empty or one segment)
+        """
+        closed = []
+        current_segment = self.current_segment
+        word = word_info.text
+
+        # Calculate estimated length with this word
+        space_needed = 1 if current_segment['words'] else 0
+        estimated_length = current_segment['char_count'] + \
+            len(word) + space_needed
+
+        # Determine if we should start a new segment
+        should_break = self.service._should_break_segment(
+            current_segment, word, estimated_length, self.max_line_length,
+            word_info, self.previous_info
+        )
+
+        if should_break:
+            # The closed segment already ends at its last word
+            closed.append(current_segment)
+
+            # Start new segment
+            self.current_segment = {
+                'words': [word_info],
+                'start': word_info.offset,
+                'end': word_info.end,
+                'char_count': len(word)
+            }
+        else:
+            # Add word to current segment
+            if not current_segment['words']:
+                current_segment['start'] = word_info.offset
+            current_segment['words'].append(word_info)
+            current_segment['char_count'] += len(word) + space_needed
+            current_segment['end'] = word_info.end
+
+        self.previous_info = word_info
+        return closed
+
+    def finish(self):
+        """
+        Close the last segment.
+
+        Returns:
+            list: The remaining segment, if it has any words
+        """
+        segment = self.current_segment
+        self.current_segment = {'words': [], 'start': 0, 'end': 0, 'char_count': 0}
+        return [segment] if segment['words'] else []
+
+
+class SubtitleStream:
+    """
+    Push-based subtitle generator: feed word boundaries as the TTS stream
+    produces them and receive finished cues, or blocks formatted by a
+    subtitle writer (SRT by default), as segments close.
+    """
+
+    def __init__(self, service, max_line_length=40, preserve_punctuation=True, original_text=None, writer=None):
+        """
+        Initialize the stream.
+
+        Args:
+            service: SubtitleService providing cleaning and formatting rules
+            max_line_length: Maximum characters per subtitle line
+            preserve_punctuation: Whether to preserve punctuation marks
+            original_text: Original input text to preserve punctuation from
+            writer: SubtitleWriter formatting the blocks of ``feed`` and ``close``
+        """
+        self.service = service
+        self.writer = writer or SrtWriter()
+        self.preserve_punctuation = preserve_punctuation
+        self.builder = SegmentBuilder(service, max_line_length)
+        self.aligner = OriginalTextAligner(original_text) \
+            if original_text and preserve_punctuation else None
+        self.subtitle_id = 1
+
+    def feed(self, word_info):
+        """
+        Process one raw word boundary.
+
+        Args:
+            word_info: Word boundary from the TTS service
+
+        Returns:
+            list: Subtitle blocks completed by this word
+        """
+        return [self.writer.cue(cue) for cue in self.feed_cues(word_info)]
+
+    def close(self):
+        """
+        Flush the final segment.
+
+        Returns:
+            list: Remaining subtitle blocks
+        """
+        return [self.writer.cue(cue) for cue in self.close_cues()]
 
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+    def feed_cues(self, word_info):
+        """
+        Process one raw word boundary.
 
-        if preserve_punctuation:
-            # Fix spacing around punctuation
-            # Remove space before punctuation
-            text = re.sub(r'\s+([,.!?;:，。！？；：])', r'\1', text)
-            # Ensure space after punctuation (if not at end)
-            text = re.sub(r'([,.!?;:，。！？；：])([^\s])', r'\1 \2', text)
+        Args:
+            word_info: Word boundary from the TTS service
 
-        # Fix spacing around quotes
-        text = re.sub(r'\s*"\s*', '"', text)
-        text = re.sub(r"\s*'\s*", "'", text)
+        Returns:
+            list: Cues completed by this word
+        """
+        cleaned_info = self.service._clean_word_info(word_info, self.preserve_punctuation)
+        if not cleaned_info:
+            return []
+        if not self.aligner:
+            return self._cues(self.builder.add(cleaned_info))
 
-        # Fix spacing around brackets
-        text = re.sub(r'\s*\(\s*', '(', text)
-        text = re.sub(r'\s*\)\s*', ')', text)
+        segments = []
+        for aligned_info in self.aligner.align(cleaned_info):
+            segments.extend(self.builder.add(aligned_info))
+        return self._cues(segments)
 
-        # Remove spaces at the beginning and end
-        text = text.strip()
+    def close_cues(self):
+        """
+        Flush the final segment.
 
-        return text
+        Returns:
+            list: Remaining cues
+        """
+        segments = []
+        if self.aligner:
+            for aligned_info in self.aligner.flush():
+                segments.extend(self.builder.add(aligned_info))
+        segments.extend(self.builder.finish())
+        return self._cues(segments)
+
+    def _cues(self, segments):
+        """
+        Turn closed segments into numbered cues, skipping empty ones.
+
+        Args:
+            segments: Closed segments
+
+        Returns:
+            list: Cues with their index, text, start and end ticks and words
+        """
+        cues = []
+        for segment in segments:
+            if segment['words']:
+                # Build subtitle text with proper spacing
+                subtitle_text = self.service._build_subtitle_text(
+                    segment['words'], self.preserve_punctuation)
+
+                # Skip empty segments
+                if not subtitle_text.strip():
+                    continue
+
+                cues.append({
+                    'index': self.subtitle_id,
+                    'text': subtitle_text,
+                    'start': segment['start'],
+                    'end': segment['end'],
+                    'words': segment['words']
+                })
+                self.subtitle_id += 1
+        return cues
@@ -0,0 +1,246 @@
+"""
+Subtitle file writers.
+
+Writers turn the cues produced by one segmentation pass into a subtitle
+format. They are streaming: ``header`` is written first, then ``cue`` for
+every cue as it closes, then ``footer``, so several formats can be written
+side by side while the cues are produced.
+
+A cue is a dict with its ``index`` (from 1), ``text``, ``start`` and ``end``
+ticks and its ``words`` (the cleaned WordBoundary records it was built from).
+"""
+import json
+from app.services.timing import dump_boundaries
+from app.utils.text_to_srt import format_ass_ticks, format_vtt_ticks, ticks_to_srt
+
+# Style of the ASS script; a 1080p canvas with bottom-centered white text
+ASS_HEADER = """[Script Info]
+ScriptType: v4.00+
+PlayResX: 1920
+PlayResY: 1080
+WrapStyle: 0
+ScaledBorderAndShadow: yes
+
+[V4+ Styles]
+Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, \
+Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, \
+MarginV, Encoding
+Style: Default,Arial,64,&H00FFFFFF,&H000000FF,&H00000000,&H80000000,0,0,0,0,100,100,0,0,1,3,1,2,60,60,60,1
+
+[Events]
+Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
+"""
+
+
+class SubtitleWriter:
+    """Base class of the subtitle writers."""
+
+    # File extension and HTTP content type of the format
+    extension = ""
+    content_type = "text/plain"
+
+    def header(self):
+        """
+        Return the text written before the first cue.
+
+        Returns:
+            str: File header, possibly empty
+        """
+        return ""
+
+    def cue(self, cue):
+        """
+        Format one cue.
+
+        Args:
+            cue: Cue dict with index, text, start, end and words
+
+        Returns:
+            str: Formatted cue
+        """
+        raise NotImplementedError
+
+    def footer(self):
+        """
+        Return the text written after the last cue.
+
+        Returns:
+            str: File footer, possibly empty
+        """
+        return ""
+
+
+class SrtWriter(SubtitleWriter):
+    """SubRip subtitles."""
+
+    extension = "srt"
+    content_type = "application/x-subrip"
+
+    def cue(self, cue):
+        return ticks_to_srt(cue["index"], cue["text"], cue["start"], cue["end"])
+
+
+class VttWriter(SubtitleWriter):
+    """
+    WebVTT subtitles.
+
+    With ``karaoke``, every word after the first is preceded by a
+    ``<HH:MM:SS.mmm>`` timestamp tag of its start, so players can highlight
+    the words as they are spoken.
+    """
+
+    extension = "vtt"
+    content_type = "text/vtt"
+
+    def __init__(self, karaoke=True):
+        """
+        Initialize the writer.
+
+        Args:
+            karaoke: Add word timestamp tags to the cue text
+        """
+        self.karaoke = karaoke
+
+    def header(self):
+        return "WEBVTT\n\n"
+
+    def cue(self, cue):
+        start, end = cue["start"], cue["end"]
+        text = cue["text"]
+        if self.karaoke and len(cue["words"]) > 1:
+            parts = []
+            last_tag = start
+            previous = 0
+            for position, word in zip(word_positions(text, cue["words"]), cue["words"]):
+                # Timestamps must lie strictly inside the cue and increase
+                if not last_tag < word.offset < end:
+                    continue
+                parts.append(_escape_vtt(text[previous:position]))
+                parts.append(f"<{format_vtt_ticks(word.offset)}>")
+                previous = position
+                last_tag = word.offset
+            parts.append(_escape_vtt(text[previous:]))
+            text = "".join(parts)
+        else:
+            text = _escape_vtt(text)
+        return f"{cue['index']}\n{format_vtt_ticks(start)} --> {format_vtt_ticks(end)}\n{text}\n\n"
+
+
+class AssWriter(SubtitleWriter):
+    """Advanced SubStation Alpha subtitles with one Default style."""
+
+    extension = "ass"
+    content_type = "text/x-ssa"
+
+    def header(self):
+        return ASS_HEADER
+
+    def cue(self, cue):
+        # Braces would start override blocks
+        text = cue["text"].replace("{", "\\{").replace("}", "\\}")
+        return (f"Dialogue: 0,{format_ass_ticks(cue['start'])},{format_ass_ticks(cue['end'])},"
+                f"Default,,0,0,0,,{text}\n")
+
+
+class JsonWriter(SubtitleWriter):
+    """
+    JSON array of the cues with their word timings in ticks.
+
+    Every cue is written on its own line as
+    ``{"index", "start", "end", "text", "words": [{"text", "offset", "duration"}]}``.
+    """
+
+    extension = "json"
+    content_type = "application/json"
+
+    def __init__(self):
+        """Initialize the writer."""
+        self.first = True
+
+    def header(self):
+        return "["
+
+    def cue(self, cue):
+        separator = "\n" if self.first else ",\n"
+        self.first = False
+        return separator + json.dumps({
+            "index": cue["index"],
+            "start": cue["start"],
+            "end": cue["end"],
+            "text": cue["text"],
+            "words": dump_boundaries(cue["words"])
+        }, ensure_ascii=False)
+
+    def footer(self):
+        return "\n]\n"
+
+
+# Writer of every subtitle format, keyed by format name
+SUBTITLE_FORMATS = {
+    "srt": SrtWriter,
+    "vtt": VttWriter,
+    "ass": AssWriter,
+    "json": JsonWriter,
+}
+
+
+def create_writer(subtitle_format, config=None):
+    """
+    Create the writer of a subtitle format.
+
+    Args:
+        subtitle_format: Format name, e.g. "vtt"
+        config: Configuration dictionary; the ``[subtitles]`` table holds
+            the format options
+
+    Returns:
+        SubtitleWriter: New writer
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if subtitle_format not in SUBTITLE_FORMATS:
+        raise ValueError(f"Unknown subtitle format {subtitle_format!r}; "
+                         f"choose one of {', '.join(SUBTITLE_FORMATS)}")
+    if subtitle_format == "vtt":
+        return VttWriter(karaoke=(config or {}).get("subtitles", {}).get("vtt_karaoke", True))
+    return SUBTITLE_FORMATS[subtitle_format]()
+
+
+def word_positions(text, words):
+    """
+    Find where every word starts in the text of its cue.
+
+    Cue text is built by joining the words with single spaces and fixing
+    the spacing, which only removes spaces between words or adds them after
+    punctuation inside a word, so the words follow each other in the text.
+
+    Args:
+        text: Cue text
+        words: WordBoundary records of the cue
+
+    Returns:
+        list: Index of the first character of every word in ``text``
+    """
+    positions = []
+    position = 0
+    for word in words:
+        if text.startswith(" ", position):
+            position += 1
+        positions.append(position)
+        if text.startswith(word.text, position):
+            position += len(word.text)
+            continue
+        # A space was added inside the word: step over its characters one by one
+        for char in word.text:
+            if char.isspace():
+                continue
+            while text.startswith(" ", position):
+                position += 1
+            position += 1
+    return positions
+
+
+def _escape_vtt(text):
+    """Escape the characters with a meaning in WebVTT cue text."""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
@@ -0,0 +1,126 @@
+"""
+Word timing model shared by the TTS backends and the subtitle pipeline.
+
+All times are integer 100-nanosecond ticks, the unit Edge TTS and the Azure
+Speech SDK report. Backends produce WordBoundary records in ticks and every
+subtitle stage consumes them unchanged; times are converted only when a
+subtitle timestamp is formatted.
+"""
+
+# Word boundary offsets and durations are expressed in 100-nanosecond ticks
+TICKS_PER_SECOND = 10000000
+TICKS_PER_MILLISECOND = 10000
+TICKS_PER_MICROSECOND = 10
+
+
+class WordBoundary:
+    """
+    Timing of one spoken word.
+
+    Attributes:
+        text: Word as reported by the TTS engine (or restored from the input text)
+        offset: Start of the word in ticks from the start of the audio
+        duration: Length of the word in ticks
+    """
+
+    __slots__ = ("text", "offset", "duration")
+
+    def __init__(self, text, offset, duration):
+        """
+        Initialize a word boundary.
+
+        Args:
+            text: Word text
+            offset: Start in ticks (int)
+            duration: Length in ticks (int)
+        """
+        self.text = text
+        self.offset = offset
+        self.duration = duration
+
+    @property
+    def end(self):
+        """End of the word in ticks."""
+        return self.offset + self.duration
+
+    def shifted(self, ticks):
+        """
+        Copy the boundary moved along the timeline.
+
+        Args:
+            ticks: Ticks to add to the offset
+
+        Returns:
+            WordBoundary: Moved copy
+        """
+        return WordBoundary(self.text, self.offset + ticks, self.duration)
+
+    def with_text(self, text):
+        """
+        Copy the boundary with another text.
+
+        Args:
+            text: Text of the copy
+
+        Returns:
+            WordBoundary: Copy with the same timing
+        """
+        return WordBoundary(text, self.offset, self.duration)
+
+    def to_dict(self):
+        """
+        Convert to the JSON form stored in caches and manifests.
+
+        Returns:
+            dict: ``{"text", "offset", "duration"}``
+        """
+        return {"text": self.text, "offset": self.offset, "duration": self.duration}
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a boundary from its JSON form.
+
+        Args:
+            data: Dictionary with text, offset and duration in ticks
+
+        Returns:
+            WordBoundary: The boundary
+        """
+        return cls(data["text"], int(data["offset"]), int(data["duration"]))
+
+    def __eq__(self, other):
+        if not isinstance(other, WordBoundary):
+            return NotImplemented
+        return (self.text, self.offset, self.duration) == (other.text, other.offset, other.duration)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"WordBoundary({self.text!r}, {self.offset}, {self.duration})"
+
+
+def dump_boundaries(word_boundaries):
+    """
+    Convert word boundaries to their JSON form.
+
+    Args:
+        word_boundaries: Iterable of WordBoundary
+
+    Returns:
+        list: Dictionaries for json.dump
+    """
+    return [boundary.to_dict() for boundary in word_boundaries]
+
+
+def load_boundaries(data):
+    """
+    Create word boundaries from their JSON form.
+
+    Args:
+        data: List of dictionaries from dump_boundaries
+
+    Returns:
+        list: WordBoundary records
+    """
+    return [WordBoundary.from_dict(item) for item in data]
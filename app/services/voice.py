@@ -1,13 +1,26 @@
 import os
 import asyncio
-import edge_tts
-import azure.cognitiveservices.speech as speechsdk
-import re
+import json
+import difflib
+from app.utils.text_chunker import chunk_text, split_sentences
+from app.services.cache import SynthesisCache
+from app.services.audio import AudioEncoder
+from app.services.backends import create_backend, mp3_duration_ticks
+from app.services.resilience import BackendGuard
+from app.services.timing import dump_boundaries, load_boundaries
+
+# Long-text synthesis defaults (overridable in config.toml)
+DEFAULT_CHUNK_CHARS = 2000
+DEFAULT_CONCURRENCY = 4
+
+# Sentence manifest written by incremental synthesis
+MANIFEST_FILE = "segments.json"
 
 
 class VoiceService:
     """
-    Voice synthesis service supporting both Azure Cognitive Services and Edge TTS.
+    Voice synthesis service on top of pluggable TTS backends (Edge TTS, Azure
+    Cognitive Services, local espeak-ng and an offline fake engine).
     Provides text-to-speech synthesis with word boundary extraction for subtitle timing.
     """
 
@@ -19,11 +32,46 @@ class VoiceService:
             config: Configuration dictionary containing service settings
         """
         self.config = config
+        self.cache = SynthesisCache.from_config(config)
+        self.encoder = AudioEncoder.from_config(config)
+        self._backends = {}
+        self._guards = {}
 
     def synthesize(self, text, voice_name, rate, pitch, volume, output_dir):
         """
         Synthesize speech from text using the available TTS service.
 
+        Blocking wrapper around ``synthesize_async``. It starts its own event
+        loop, so callers that already run one should await
+        ``synthesize_async`` instead.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+            output_dir: Directory to save the output audio file
+
+        Returns:
+            tuple: (audio_file_path, word_boundaries)
+        """
+        return self._run(self.synthesize_async(
+            text, voice_name, rate, pitch, volume, output_dir))
+
+    async def synthesize_async(self, text, voice_name, rate, pitch, volume, output_dir):
+        """
+        Asynchronously synthesize speech from text using the available TTS service.
+
+        Results are served from the synthesis cache when it is enabled and
+        holds an entry for the same text, voice and parameters. Entries are
+        keyed on the configured backend; results that came (even partly)
+        from its fallback are not cached, so they stop being served once the
+        backend recovers. With an
+        ``[audio]`` output format configured, the audio is piped into ffmpeg
+        while it arrives and the encoded file is returned; when silence
+        trimming shortens it, the word boundaries are moved to match.
+
         Args:
             text: Input text to synthesize
             voice_name: Name of the voice to use
@@ -35,136 +83,713 @@ class VoiceService:
         Returns:
             tuple: (audio_file_path, word_boundaries)
         """
-        use_azure = self.config.get(
-            "AZURE_KEY") and self.config.get("AZURE_REGION")
-        if use_azure:
+        primary = self._backend()
+
+        if self.cache:
+            cached = self.cache.get(
+                self.cache.make_key(text, voice_name, rate, pitch, volume, primary.name),
+                output_dir
+            )
+            if cached:
+                audio_file, word_boundaries = cached
+                if self.encoder:
+                    audio_file, word_boundaries = await self.encoder.encode_file(
+                        os.path.splitext(audio_file)[1][1:], audio_file, output_dir, word_boundaries)
+                return audio_file, word_boundaries
+
+        used_backends = set()
+        backend, source = await self._start_synthesis(text, voice_name, rate, pitch, volume, used_backends)
+        audio_file = os.path.join(output_dir, f"output.{backend.audio_format}")
+        word_boundaries = []
+        pipe = await self.encoder.open(backend.audio_format, output_dir) if self.encoder else None
+
+        try:
+            with open(audio_file, "wb") as f:
+                async for item in source:
+                    if item["type"] == "audio":
+                        f.write(item["data"])
+                        if pipe:
+                            await pipe.write(item["data"])
+                    else:
+                        word_boundaries.append(item["boundary"])
+            if pipe:
+                encoded_file = await pipe.close()
+        finally:
+            if pipe:
+                await pipe.abort()
+
+        if self.cache and used_backends == {primary.name}:
+            self.cache.put(
+                self.cache.make_key(text, voice_name, rate, pitch, volume, primary.name),
+                audio_file,
+                word_boundaries
+            )
+        if pipe:
+            return encoded_file, pipe.rewrite(word_boundaries)
+        return audio_file, word_boundaries
+
+    async def stream_async(self, text, voice_name, rate, pitch, volume):
+        """
+        Synthesize speech and yield audio and word boundaries as they arrive.
+
+        Audio chunks are yielded as ``{"type": "audio", "data": bytes}`` and
+        word boundaries as ``{"type": "WordBoundary", "boundary": WordBoundary}``
+        on one continuous timeline. Long Edge TTS texts are
+        synthesized concurrently and yielded chunk by chunk in document order.
+        Caching follows ``synthesize_async``.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+
+        Yields:
+            dict: Audio or WordBoundary items in playback order
+        """
+        primary = self._backend()
+
+        if self.cache:
+            cached = self.cache.get_bytes(
+                self.cache.make_key(text, voice_name, rate, pitch, volume, primary.name))
+            if cached:
+                audio_data, word_boundaries = cached
+                yield {"type": "audio", "data": audio_data}
+                for boundary in word_boundaries:
+                    yield {"type": "WordBoundary", "boundary": boundary}
+                return
+
+        used_backends = set()
+        backend, source = await self._start_synthesis(text, voice_name, rate, pitch, volume, used_backends)
+
+        audio = bytearray()
+        word_boundaries = []
+        async for item in source:
+            if self.cache:
+                if item["type"] == "audio":
+                    audio.extend(item["data"])
+                else:
+                    word_boundaries.append(item["boundary"])
+            yield item
+
+        if self.cache and used_backends == {primary.name}:
+            self.cache.put_bytes(
+                self.cache.make_key(text, voice_name, rate, pitch, volume, primary.name),
+                bytes(audio), backend.audio_format, word_boundaries)
+
+    def synthesize_incremental(self, text, voice_name, rate, pitch, volume, output_dir, previous_dir=None,
+                               progress=None):
+        """
+        Synthesize speech sentence by sentence, reusing a previous job's audio.
+
+        Blocking wrapper around ``synthesize_incremental_async``.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+            output_dir: Directory to save the output audio file and manifest
+            previous_dir: Output directory of the previous job, if any
+            progress: Optional callable receiving (sentences_done, sentences_total)
+
+        Returns:
+            tuple: (audio_file_path, word_boundaries)
+        """
+        return self._run(self.synthesize_incremental_async(
+            text, voice_name, rate, pitch, volume, output_dir, previous_dir, progress))
+
+    async def synthesize_incremental_async(self, text, voice_name, rate, pitch, volume, output_dir,
+                                           previous_dir=None, progress=None):
+        """
+        Asynchronously synthesize speech sentence by sentence, reusing a previous job's audio.
+
+        The text is split into sentences and diffed against the sentence list
+        recorded by the job in ``previous_dir``. Unchanged sentences reuse the
+        previous audio and word boundaries; only inserted or edited sentences
+        are sent to the TTS service. The result is stitched into a single file
+        on one timeline and a new sentence manifest is written to output_dir.
+        With an ``[audio]`` output format configured, the sentence audio is
+        also piped through one ffmpeg pipe and the encoded file is returned,
+        with word boundaries on its timeline. The manifest keeps the backend's
+        timeline.
+
+        Sentence-level synthesis needs a streaming backend (Edge TTS, Azure or
+        the fake backend); other backends fall back to a regular full synthesis.
+
+        ``progress`` is called with the number of finished and total sentences
+        once reused sentences are known and after every synthesized sentence.
+        An exception raised by it aborts the synthesis.
+
+        Args:
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment (-50 to +50)
+            pitch: Pitch adjustment (-50 to +50)
+            volume: Volume adjustment (-50 to +50)
+            output_dir: Directory to save the output audio file and manifest
+            previous_dir: Output directory of the previous job, if any
+            progress: Optional callable receiving (sentences_done, sentences_total)
+
+        Returns:
+            tuple: (audio_file_path, word_boundaries)
+        """
+        progress = progress or (lambda done, total: None)
+        backend = self._backend()
+        if not backend.streaming:
+            progress(0, 1)
+            result = await self.synthesize_async(text, voice_name, rate, pitch, volume, output_dir)
+            progress(1, 1)
+            return result
+
+        return await self._incremental_async(
+            backend, text, voice_name, rate, pitch, volume, output_dir, previous_dir, progress)
+
+    def warm_up(self, voice_names):
+        """
+        Let the configured backend connect ahead of the first request.
+
+        Failures are reported and otherwise ignored; the request itself
+        will surface them.
+
+        Args:
+            voice_names: Voice names expected to be used
+        """
+        backend = self._backend()
+        try:
+            backend.warm_up(voice_names)
+        except Exception as e:
+            print(f"{backend.display_name} warm-up failed: {e}")
+
+    def audio_format(self):
+        """
+        Return the audio container produced by the configured backend.
+
+        Returns:
+            str: File extension of the audio, e.g. "mp3"
+        """
+        return self._backend().audio_format
+
+    def backend_stats(self):
+        """
+        Report statistics of the backends used so far, such as Edge TTS
+        connection reuse and handshake versus synthesis time.
+
+        Returns:
+            dict: Statistics by backend name, for backends that keep any
+        """
+        stats = {}
+        for name, backend in self._backends.items():
+            backend_stats = backend.stats()
+            if backend_stats is not None:
+                stats[name] = backend_stats
+        return stats
+
+    def resilience_metrics(self):
+        """
+        Report request, retry, failover and circuit breaker metrics per backend.
+
+        Returns:
+            dict: BackendGuard metrics by backend name
+        """
+        return {name: guard.metrics() for name, guard in self._guards.items()}
+
+    async def aclose(self):
+        """
+        Close the network connections held by the backends.
+
+        Call this before the event loop running the service ends; the
+        blocking wrappers do so themselves.
+        """
+        for backend in self._backends.values():
+            await backend.aclose()
+
+    def _run(self, coroutine):
+        """
+        Run a coroutine in a new event loop and close the backends' connections after it.
+
+        Args:
+            coroutine: Coroutine using this service
+
+        Returns:
+            The coroutine's result
+        """
+        async def run():
             try:
-                return self._synthesize_with_azure(text, voice_name, rate, pitch, volume, output_dir)
-            except Exception as e:
-                print(f"Azure TTS failed: {e}. Falling back to Edge TTS.")
-                return self._synthesize_with_edge(text, voice_name, rate, pitch, volume, output_dir)
-        else:
-            return self._synthesize_with_edge(text, voice_name, rate, pitch, volume, output_dir)
+                return await coroutine
+            finally:
+                await self.aclose()
 
-    def _synthesize_with_azure(self, text, voice_name, rate, pitch, volume, output_dir):
+        return asyncio.run(run())
+
+    def _backend_name(self):
+        """
+        Return the name of the configured backend.
+
+        ``TTS_BACKEND`` in the configuration selects a registered backend
+        (or a ``package.module:ClassName`` import path). If it is empty,
+        "azure" is used if credentials are set, else "edge".
         """
-        Synthesize speech using Azure Cognitive Services Speech SDK.
+        name = self.config.get("TTS_BACKEND")
+        if name:
+            return name
+        if self.config.get("AZURE_KEY") and self.config.get("AZURE_REGION"):
+            return "azure"
+        return "edge"
+
+    def _backend(self, name=None):
+        """
+        Return the backend instance for a name, creating it on first use.
+
+        Args:
+            name: Backend name; defaults to the configured backend
+
+        Returns:
+            TTSBackend: Backend instance
+        """
+        name = name or self._backend_name()
+        if name not in self._backends:
+            self._backends[name] = create_backend(name, self.config)
+        return self._backends[name]
+
+    def _guard(self, backend):
+        """
+        Return the rate limiter, retry policy and circuit breaker of a backend.
+
+        Args:
+            backend: TTSBackend instance
+
+        Returns:
+            BackendGuard: Guard for the backend
+        """
+        if backend.name not in self._guards:
+            self._guards[backend.name] = BackendGuard.from_config(backend, self.config)
+        return self._guards[backend.name]
+
+    def _chunk_fallback(self, backend):
+        """
+        Return the backend that may synthesize single chunks the backend failed on.
+
+        Chunks are stitched together, so the fallback has to produce audio
+        in the same format.
+
+        Args:
+            backend: TTSBackend instance
+
+        Returns:
+            TTSBackend or None: Fallback backend
+        """
+        if not backend.fallback:
+            return None
+        fallback = self._backend(backend.fallback)
+        if fallback.audio_format != backend.audio_format:
+            return None
+        return fallback
+
+    async def _start_synthesis(self, text, voice_name, rate, pitch, volume, used_backends):
+        """
+        Start synthesis on the configured backend.
+
+        If the backend fails before producing any output (after its retries,
+        or at once while its circuit breaker is open) and defines a fallback
+        (Azure falls back to Edge TTS), the fallback is used instead.
 
         Args:
             text: Input text to synthesize
-            voice_name: Azure voice name
+            voice_name: Name of the voice to use
             rate: Speech rate adjustment percentage
             pitch: Pitch adjustment percentage
             volume: Volume adjustment percentage
-            output_dir: Output directory for audio file
+            used_backends: Set receiving the names of the backends that
+                produced the audio, filled in while the source is consumed
 
         Returns:
-            tuple: (audio_file_path, word_boundaries)
+            tuple: (backend, source) where source is an async iterator of
+                audio and WordBoundary items
         """
-        speech_config = speechsdk.SpeechConfig(
-            subscription=self.config["AZURE_KEY"],
-            region=self.config["AZURE_REGION"]
-        )
-        speech_config.speech_synthesis_voice_name = voice_name
-        audio_file = os.path.join(output_dir, "output.wav")
-
-        # Create SSML with voice parameters
-        ssml_string = f"""
-        <speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis' xmlns:mstts='http://www.w3.org/2001/mstts' xml:lang='en-US'>
-            <voice name='{voice_name}'>
-                <mstts:express-as style='general'>
-                    <prosody rate='{rate}%' pitch='{pitch}%' volume='{volume}%'>
-                        {text}
-                    </prosody>
-                </mstts:express-as>
-            </voice>
-        </speak>
-        """
-
-        speech_synthesizer = speechsdk.SpeechSynthesizer(
-            speech_config=speech_config,
-            audio_config=None
-        )
-        word_boundaries = []
+        backend = self._backend()
+        try:
+            return backend, await self._open_stream(backend, text, voice_name, rate, pitch, volume, used_backends)
+        except Exception as e:
+            if not backend.fallback:
+                raise
+            fallback = self._backend(backend.fallback)
+            self._guard(backend).failovers += 1
+            print(f"{backend.display_name} failed: {e}. Falling back to {fallback.display_name}.")
+            return fallback, await self._open_stream(fallback, text, voice_name, rate, pitch, volume, used_backends)
 
-        def word_boundary_cb(evt):
-            """Callback function to capture word boundary events."""
-            word_boundaries.append({
-                "text": evt.text,
-                "offset": evt.audio_offset / 10000,  # Convert to milliseconds
-                "duration": evt.audio_duration / 10000
-            })
+    async def _open_stream(self, backend, text, voice_name, rate, pitch, volume, used_backends):
+        """
+        Open a stream of audio and word boundaries on a backend.
 
-        # Connect word boundary callback
-        speech_synthesizer.synthesis_word_boundary.connect(word_boundary_cb)
-        result = speech_synthesizer.speak_ssml_async(ssml_string).get()
+        Streaming backends are streamed (in chunks for long texts) and their
+        first item is awaited here, so a backend that cannot start fails
+        before this returns; other backends synthesize the complete text
+        before this returns.
 
-        if result.reason == speechsdk.ResultReason.SynthesizingAudioCompleted:
-            with open(audio_file, "wb") as f:
-                f.write(result.audio_data)
-            return audio_file, word_boundaries
-        else:
-            raise Exception(f"Azure TTS synthesis failed: {result.reason}")
+        Args:
+            backend: TTSBackend instance
+            text: Input text to synthesize
+            voice_name: Name of the voice to use
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+            used_backends: Set receiving the names of the backends that produced the audio
+
+        Returns:
+            async iterator: Audio and WordBoundary items in playback order
+        """
+        if backend.streaming:
+            return await _start(self._chunked_stream(backend, text, voice_name, rate, pitch, volume, used_backends))
+        audio_data, word_boundaries = await self._guard(backend).call(
+            lambda: backend.synthesize(text, voice_name, rate, pitch, volume))
+        used_backends.add(backend.name)
+        return _iter_result(audio_data, word_boundaries)
 
-    def _synthesize_with_edge(self, text, voice_name, rate, pitch, volume, output_dir):
+    async def _chunked_stream(self, backend, text, voice_name, rate, pitch, volume, used_backends):
         """
-        Synthesize speech using Edge TTS (wrapper for async function).
+        Stream audio and word boundaries for a text of any length.
+
+        Texts longer than ``edge_chunk_chars`` are split at sentence and
+        paragraph boundaries and synthesized concurrently, at most
+        ``edge_concurrency`` chunks at a time. Chunks are yielded in document
+        order with offsets shifted by the cumulative duration of the chunks
+        before them; shorter texts are streamed live from a single request.
 
         Args:
+            backend: Streaming TTSBackend instance
             text: Input text to synthesize
-            voice_name: Edge TTS voice name
+            voice_name: Voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+            used_backends: Set receiving the names of the backends that
+                produced the chunks; a failed chunk may come from the fallback
+
+        Yields:
+            dict: Audio or WordBoundary items in playback order
+        """
+        chunk_chars = self.config.get("edge_chunk_chars", DEFAULT_CHUNK_CHARS)
+        chunks = chunk_text(text, chunk_chars) if chunk_chars and len(text) > chunk_chars else [text]
+
+        if len(chunks) == 1:
+            # Requests are retried until their first item arrives; later errors are raised
+            source = await self._guard(backend).call(
+                lambda: _start(backend.stream(text, voice_name, rate, pitch, volume)))
+            used_backends.add(backend.name)
+            async for item in source:
+                yield item
+            return
+
+        semaphore = asyncio.Semaphore(
+            max(1, self.config.get("edge_concurrency", DEFAULT_CONCURRENCY)))
+
+        async def synthesize_chunk(chunk):
+            async with semaphore:
+                return await self._synthesize_chunk(backend, chunk, voice_name, rate, pitch, volume)
+
+        tasks = [asyncio.ensure_future(synthesize_chunk(c)) for c in chunks]
+        try:
+            offset_ticks = 0
+            for task in tasks:
+                audio_data, chunk_boundaries, chunk_backend = await task
+                used_backends.add(chunk_backend.name)
+                yield {"type": "audio", "data": audio_data}
+                for boundary in chunk_boundaries:
+                    yield {"type": "WordBoundary", "boundary": boundary.shifted(offset_ticks)}
+                offset_ticks += chunk_backend.duration_ticks(audio_data)
+        finally:
+            # Stop outstanding chunks if the consumer stops early or a chunk fails
+            for task in tasks:
+                task.cancel()
+
+    async def _synthesize_chunks(self, backend, chunks, voice_name, rate, pitch, volume, on_done=None):
+        """
+        Synthesize text chunks concurrently into memory.
+
+        At most ``edge_concurrency`` chunks are in flight at once.
+
+        Args:
+            backend: Streaming TTSBackend instance
+            chunks: List of text chunks
+            voice_name: Voice name
             rate: Speech rate adjustment percentage
             pitch: Pitch adjustment percentage
             volume: Volume adjustment percentage
-            output_dir: Output directory for audio file
+            on_done: Optional callable invoked after every finished chunk
 
         Returns:
-            tuple: (audio_file_path, word_boundaries)
+            list: (audio_bytes, word_boundaries, backend) per chunk, in input
+                order, where backend is the one that produced the chunk
         """
-        return asyncio.run(self._edge_tts_async(text, voice_name, rate, pitch, volume, output_dir))
+        semaphore = asyncio.Semaphore(
+            max(1, self.config.get("edge_concurrency", DEFAULT_CONCURRENCY)))
+
+        async def synthesize_chunk(chunk):
+            async with semaphore:
+                result = await self._synthesize_chunk(backend, chunk, voice_name, rate, pitch, volume)
+            if on_done:
+                on_done()
+            return result
+
+        tasks = [asyncio.ensure_future(synthesize_chunk(c)) for c in chunks]
+        try:
+            return await asyncio.gather(*tasks)
+        finally:
+            # Stop the other chunks if one fails or the caller aborts
+            for task in tasks:
+                task.cancel()
 
-    async def _edge_tts_async(self, text, voice_name, rate, pitch, volume, output_dir):
+    async def _incremental_async(self, backend, text, voice_name, rate, pitch, volume, output_dir, previous_dir,
+                                 progress):
         """
-        Asynchronously synthesize speech using Edge TTS.
+        Asynchronously run sentence-level incremental synthesis.
 
         Args:
+            backend: Streaming TTSBackend instance
             text: Input text to synthesize
-            voice_name: Edge TTS voice name
+            voice_name: Voice name
             rate: Speech rate adjustment percentage
             pitch: Pitch adjustment percentage
             volume: Volume adjustment percentage
-            output_dir: Output directory for audio file
+            output_dir: Output directory for audio file and manifest
+            previous_dir: Output directory of the previous job, if any
+            progress: Callable receiving (sentences_done, sentences_total)
 
         Returns:
             tuple: (audio_file_path, word_boundaries)
         """
-        audio_file = os.path.join(output_dir, "output.mp3")
-
-        # Format parameters for Edge TTS
-        rate_str = f'+{rate}%' if rate >= 0 else f'{rate}%'
-        pitch_str = f'+{pitch}Hz' if pitch >= 0 else f'{pitch}Hz'
-        volume_str = f'+{volume}%' if volume >= 0 else f'{volume}%'
-
-        # Create Edge TTS communicate instance
-        communicate = edge_tts.Communicate(
-            text,
-            voice_name,
-            rate=rate_str,
-            pitch=pitch_str,
-            volume=volume_str
-        )
-        word_boundaries = []
+        sentences = split_sentences(text)
+        params = {"backend": backend.name, "voice": voice_name, "rate": rate, "pitch": pitch, "volume": volume}
+        results = reuse_previous_sentences(sentences, params, previous_dir)
+
+        # Sentences shared with other jobs (intros, outros) come from the cache
+        if self.cache:
+            for i, result in enumerate(results):
+                if result is None:
+                    results[i] = self.cache.get_bytes(self.cache.make_key(
+                        sentences[i], voice_name, rate, pitch, volume, backend.name))
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        done = len(sentences) - len(missing)
+        progress(done, len(sentences))
 
-        # Stream synthesis and collect word boundaries
-        with open(audio_file, "wb") as f:
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    f.write(chunk["data"])
-                elif chunk["type"] == "WordBoundary":
-                    word_boundaries.append({
-                        "text": chunk["text"],
-                        "offset": chunk["offset"],
-                        "duration": chunk["duration"]
-                    })
+        def sentence_done():
+            nonlocal done
+            done += 1
+            progress(done, len(sentences))
 
+        # Backend that rendered every sentence; reused ones were rendered by the configured one
+        sentence_backends = [backend.name] * len(sentences)
+        synthesized = await self._synthesize_chunks(
+            backend, [sentences[i] for i in missing], voice_name, rate, pitch, volume, sentence_done)
+        for i, (audio_data, boundaries, sentence_backend) in zip(missing, synthesized):
+            results[i] = (audio_data, boundaries)
+            sentence_backends[i] = sentence_backend.name
+            # Sentences that failed over are cached as the fallback's, not as the configured backend's
+            if self.cache:
+                self.cache.put_bytes(
+                    self.cache.make_key(sentences[i], voice_name, rate, pitch, volume, sentence_backend.name),
+                    audio_data, sentence_backend.audio_format, boundaries)
+
+        audio_file = os.path.join(output_dir, f"output.{backend.audio_format}")
+        word_boundaries, spans = stitch_chunks(results, audio_file, backend.duration_ticks)
+
+        manifest = {
+            "params": params,
+            "audio_file": os.path.basename(audio_file),
+            "sentences": [
+                {
+                    "text": sentence,
+                    "backend": sentence_backend,
+                    "audio_start": start,
+                    "audio_end": end,
+                    "word_boundaries": dump_boundaries(boundaries)
+                }
+                for sentence, sentence_backend, (start, end), (_, boundaries)
+                in zip(sentences, sentence_backends, spans, results)
+            ]
+        }
+        with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+
+        if self.encoder:
+            audio_file, word_boundaries = await self.encoder.encode(
+                backend.audio_format, (audio_data for audio_data, _ in results), output_dir, word_boundaries)
         return audio_file, word_boundaries
+
+    async def _synthesize_chunk(self, backend, text, voice_name, rate, pitch, volume):
+        """
+        Synthesize a single chunk into memory, retrying failed requests.
+
+        A chunk the backend keeps failing on (or that it rejects while its
+        circuit breaker is open) is synthesized by the fallback backend, so
+        the rest of a long job is kept.
+
+        Args:
+            backend: TTSBackend instance
+            text: Chunk text
+            voice_name: Voice name
+            rate: Speech rate adjustment percentage
+            pitch: Pitch adjustment percentage
+            volume: Volume adjustment percentage
+
+        Returns:
+            tuple: (audio_bytes, word_boundaries, backend) with offsets relative
+                to the chunk and the backend that synthesized it
+        """
+        try:
+            audio_data, word_boundaries = await self._guard(backend).call(
+                lambda: backend.synthesize(text, voice_name, rate, pitch, volume))
+            return audio_data, word_boundaries, backend
+        except Exception as e:
+            fallback = self._chunk_fallback(backend)
+            if fallback is None:
+                raise
+            self._guard(backend).failovers += 1
+            print(f"{backend.display_name} failed on a chunk: {e}. Synthesizing it with {fallback.display_name}.")
+            audio_data, word_boundaries = await self._guard(fallback).call(
+                lambda: fallback.synthesize(text, voice_name, rate, pitch, volume))
+            return audio_data, word_boundaries, fallback
+
+
+async def _iter_result(audio_data, word_boundaries):
+    """
+    Yield a completed synthesis result in stream item form.
+
+    Args:
+        audio_data: Synthesized audio bytes
+        word_boundaries: Word boundaries of the audio
+
+    Yields:
+        dict: One audio item followed by the WordBoundary items
+    """
+    yield {"type": "audio", "data": audio_data}
+    for boundary in word_boundaries:
+        yield {"type": "WordBoundary", "boundary": boundary}
+
+
+async def _start(source):
+    """
+    Wait for the first item of a stream so that failures to start surface here.
+
+    Args:
+        source: Async iterator of audio and WordBoundary items
+
+    Returns:
+        async iterator: The same items, including the first one
+    """
+    try:
+        first = await source.__anext__()
+    except StopAsyncIteration:
+        return _iter_result(b"", [])
+    return _prepend(first, source)
+
+
+async def _prepend(item, source):
+    """
+    Yield an item that was already taken from a stream, then the rest of the stream.
+
+    Args:
+        item: First item
+        source: Async iterator of the remaining items
+
+    Yields:
+        dict: Audio or WordBoundary items
+    """
+    yield item
+    async for item in source:
+        yield item
+
+
+def reuse_previous_sentences(sentences, params, previous_dir):
+    """
+    Match sentences against a previous job and load the audio of unchanged ones.
+
+    Sentences the previous job had to synthesize with a fallback backend
+    are synthesized again.
+
+    Args:
+        sentences: Sentence list of the new text
+        params: Voice parameters of the new job
+        previous_dir: Output directory of the previous job, or None
+
+    Returns:
+        list: (audio_bytes, word_boundaries) for reused sentences and None for
+            sentences that need to be synthesized, in sentence order
+    """
+    results = [None] * len(sentences)
+    if not previous_dir:
+        return results
+
+    try:
+        with open(os.path.join(previous_dir, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        return results
+
+    # Audio rendered with different voice settings cannot be reused
+    if previous.get("params") != params:
+        return results
+
+    previous_sentences = previous["sentences"]
+    matcher = difflib.SequenceMatcher(
+        None, [s["text"] for s in previous_sentences], sentences, autojunk=False)
+
+    try:
+        f = open(os.path.join(previous_dir, previous["audio_file"]), "rb")
+    except OSError:
+        return results
+
+    with f:
+        for tag, i1, i2, j1, _ in matcher.get_opcodes():
+            if tag != "equal":
+                continue
+            for offset, entry in enumerate(previous_sentences[i1:i2]):
+                # Manifests written before fallback tracking have no per-sentence backend
+                if entry.get("backend", params["backend"]) != params["backend"]:
+                    continue
+                f.seek(entry["audio_start"])
+                audio = f.read(entry["audio_end"] - entry["audio_start"])
+                results[j1 + offset] = (audio, load_boundaries(entry["word_boundaries"]))
+
+    return results
+
+
+def stitch_chunks(results, audio_file, duration_ticks=None):
+    """
+    Concatenate chunk audio into one file and shift offsets onto one timeline.
+
+    Each chunk's word boundary offsets are shifted by the cumulative duration
+    of the chunks before it. The input boundaries are left untouched.
+
+    Args:
+        results: List of (audio_bytes, word_boundaries) in playback order
+        audio_file: Path of the stitched output audio file
+        duration_ticks: Callable returning the duration of chunk audio in
+            ticks; defaults to 48 kbps MP3
+
+    Returns:
+        tuple: (word_boundaries, spans) where spans lists the (start, end)
+            byte range of every chunk inside the output file
+    """
+    if duration_ticks is None:
+        def duration_ticks(audio_data):
+            return mp3_duration_ticks(len(audio_data))
+
+    word_boundaries = []
+    spans = []
+    offset_ticks = 0
+    position = 0
+    with open(audio_file, "wb") as f:
+        for audio_data, chunk_boundaries in results:
+            f.write(audio_data)
+            word_boundaries.extend(boundary.shifted(offset_ticks) for boundary in chunk_boundaries)
+            spans.append((position, position + len(audio_data)))
+            position += len(audio_data)
+            offset_ticks += duration_ticks(audio_data)
+
+    return word_boundaries, spans
+
@@ -1,8 +1,7 @@
 import streamlit as st
-import toml
 import os
+import mimetypes
 import sys
-import uuid
 import time
 from pathlib import Path
 
@@ -14,15 +13,13 @@ if project_root not in sys.path:
 if current_dir not in sys.path:
     sys.path.insert(0, current_dir)
 
-# Add services directory to Python path
-services_path = os.path.join(os.path.dirname(__file__), '..', 'services')
-if services_path not in sys.path:
-    sys.path.insert(0, services_path)
-
 # Import services
 try:
-    from voice import VoiceService
-    from subtitle import SubtitleService
+    from app.services.jobs import QUEUED, RUNNING, SUCCEEDED, CANCELLED
+    from app.ui.resources import (
+        find_file, read_toml, get_voice_service, get_subtitle_service, get_job_queue, get_media_url,
+        load_word_boundaries
+    )
 except ImportError as e:
     st.error(f"Failed to import required modules: {e}")
     st.stop()
@@ -41,19 +38,17 @@ st.set_page_config(
 def load_translation(lang):
     """Load translation file for the specified language."""
     # Try different paths for locales directory
-    possible_paths = [
+    path, mtime = find_file([
         f"locales/{lang}.toml",
         f"../../locales/{lang}.toml",
         f"{project_root}/locales/{lang}.toml"
-    ]
+    ])
 
-    for path in possible_paths:
+    if path:
         try:
-            if os.path.exists(path):
-                with open(path, "r", encoding="utf-8") as f:
-                    return toml.load(f)
+            return read_toml(path, mtime)
         except Exception:
-            continue
+            pass
 
     st.error(f"Translation file for {lang} not found.")
     return {}
@@ -85,23 +80,34 @@ if 'task' not in st.session_state:
 if 'generation_in_progress' not in st.session_state:
     st.session_state['generation_in_progress'] = False
 
+if 'job_id' not in st.session_state:
+    st.session_state['job_id'] = None
+
+# Seconds between two progress checks of a running job
+JOB_POLL_SECONDS = 0.5
+
+# Characters of the SRT file shown in the preview; the download has all of it
+SRT_PREVIEW_CHARS = 20000
+
 # Load configuration with multiple path attempts
 
 
-def load_config():
-    """Load configuration file from multiple possible locations."""
-    possible_config_paths = [
+def find_config():
+    """Return the path and modification time of the first configuration file found."""
+    return find_file([
         "config.toml",
         "config.example.toml",
         "../../config.toml",
         "../../config.example.toml",
         f"{project_root}/config.toml",
         f"{project_root}/config.example.toml"
-    ]
+    ])
+
 
-    for path in possible_config_paths:
-        if os.path.exists(path):
-            return toml.load(path)
+def load_config(path, mtime):
+    """Load the configuration file, or the default configuration if there is none."""
+    if path:
+        return read_toml(path, mtime)
 
     # Fallback default configuration
     return {
@@ -116,12 +122,17 @@ def load_config():
     }
 
 
-config = load_config()
+# Parsed files and services are cached across reruns; see resources.py
+config_path, config_mtime = find_config()
+config = load_config(config_path, config_mtime)
+
 
 # Initialize services
 try:
-    voice_service = VoiceService(config)
-    subtitle_service = SubtitleService(config)
+    voice_service = get_voice_service(config_path, config_mtime, config)
+    subtitle_service = get_subtitle_service(config_path, config_mtime, config)
+    job_queue = get_job_queue(config)
+    media_url = get_media_url(config, job_queue)
 except Exception as e:
     st.error(f"Failed to initialize services: {e}")
     st.stop()
@@ -166,6 +177,8 @@ selected_voice_name = st.sidebar.selectbox(
 if selected_voice_name in config.get("voices", {}):
     voice_info = config["voices"][selected_voice_name]
     st.sidebar.info(f"🎙️ Voice: {voice_info['name']}")
+    # Connect ahead of the first request; backends keep warm connections across reruns
+    voice_service.warm_up([voice_info['name']])
 
 st.sidebar.markdown("---")
 
@@ -285,86 +298,99 @@ generate_clicked = st.button(
 # Generation Logic
 if generate_clicked:
     if text_input:
-        st.session_state.generation_in_progress = True
-        start_time = time.time()
-
-        # Progress indicators
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-
-        task_id = str(uuid.uuid4())
-        output_dir = os.path.join("task", task_id)
-        os.makedirs(output_dir, exist_ok=True)
-
-        try:
-            # Step 1: Voice synthesis
-            status_text.text(
-                t("generating_spinner", "Generating speech and subtitles...")
-            )
-            progress_bar.progress(25)
-
-            voice_name = config["voices"][selected_voice_name]["name"]
-            audio_file_path, word_boundaries = voice_service.synthesize(
-                text_input, voice_name, rate, pitch, volume, output_dir
-            )
-
-            # Step 2: Subtitle generation
-            status_text.text("🔄 Generating subtitles...")
-            progress_bar.progress(75)
-
-            srt_content = subtitle_service.generate_srt(
-                word_boundaries,
-                max_line_length,
-                preserve_punctuation,
-                text_input
-            )
-            srt_file_path = os.path.join(output_dir, "output.srt")
-            with open(srt_file_path, "w", encoding="utf-8") as f:
-                f.write(srt_content)
-
-            # Step 3: Complete
-            progress_bar.progress(100)
-            status_text.text("✅ Generation complete!")
-
-            end_time = time.time()
-
-            st.session_state["task"] = {
-                "output_dir": output_dir,
-                "audio_file_path": audio_file_path,
-                "srt_file_path": srt_file_path,
-                "srt_content": srt_content,
-                "gen_time": end_time - start_time,
-                "voice_name": selected_voice_name,
-                "settings": {
-                    "rate": rate,
-                    "pitch": pitch,
-                    "volume": volume,
-                    "max_line_length": max_line_length,
-                    "preserve_punctuation": preserve_punctuation
-                }
+        # With [jobs] sentence_level, re-synthesize only the sentences changed since the last result
+        previous_task = st.session_state.get("task")
+
+        # Synthesis runs on the job queue's workers; this script run only polls it
+        st.session_state.job_id = job_queue.submit({
+            "text": text_input,
+            "voice_name": config["voices"][selected_voice_name]["name"],
+            "rate": rate,
+            "pitch": pitch,
+            "volume": volume,
+            "max_line_length": max_line_length,
+            "preserve_punctuation": preserve_punctuation,
+            "previous_dir": previous_task["output_dir"] if previous_task else None
+        })
+        st.session_state.job_settings = {
+            "voice_name": selected_voice_name,
+            "settings": {
+                "rate": rate,
+                "pitch": pitch,
+                "volume": volume,
+                "max_line_length": max_line_length,
+                "preserve_punctuation": preserve_punctuation
             }
-
-            st.session_state.generation_in_progress = False
-            st.rerun()
-
-        except Exception as e:
-            st.session_state.generation_in_progress = False
-            st.error(
-                f"❌ {t('error_message', 'An error occurred:')} {e}"
-            )
-            st.session_state["task"] = None
+        }
+        st.session_state.generation_in_progress = True
+        st.rerun()
 
     else:
         st.warning(
             f"⚠️ {t('warning_no_text', 'Please enter some text to start generation.')}"
         )
 
+# Job Progress
+job_id = st.session_state.get("job_id")
+job = job_queue.get(job_id) if job_id else None
+if job and job["status"] in (QUEUED, RUNNING):
+    if job["status"] == QUEUED:
+        status = t("job_queued", "Waiting for a free worker...")
+    else:
+        status = job["message"] or t("generating_spinner", "Generating speech and subtitles...")
+    st.progress(int(job["progress"] * 100))
+    st.text(status)
+
+    if job["cancel_requested"]:
+        st.caption(t("job_cancelling", "Cancelling..."))
+    elif st.button(f"⏹️ {t('cancel_button_label', 'Cancel')}", key="cancel_job"):
+        job_queue.cancel(job_id)
+
+    time.sleep(JOB_POLL_SECONDS)
+    st.rerun()
+
+elif job_id:
+    st.session_state.job_id = None
+    st.session_state.generation_in_progress = False
+
+    if job and job["status"] == SUCCEEDED:
+        # Only paths and metadata are kept in the session; files are read when served
+        st.session_state["task"] = {
+            **job["result"],
+            **st.session_state.pop("job_settings", {}),
+            "job_id": job_id,
+            "gen_time": job["finished"] - job["created"]
+        }
+        st.rerun()
+    elif job and job["status"] == CANCELLED:
+        st.info(t("job_cancelled", "Generation cancelled."))
+    else:
+        error = job["error"] if job else "job not found"
+        st.error(f"❌ {t('error_message', 'An error occurred:')} {error}")
+        st.session_state["task"] = None
+
 # Display Results
 task = st.session_state.get("task")
+if task and not all(os.path.exists(task[key]) for key in ("audio_file_path", "word_boundaries_path")):
+    # The task directory was pruned by the job queue's cleanup
+    st.warning(t("results_expired", "These results have expired and were removed. Please generate them again."))
+    st.session_state["task"] = task = None
 if task and not st.session_state.generation_in_progress:
     st.markdown("---")
     st.header("🎉 " + t("output_section_header", "Generation Results"))
 
+    # Subtitles follow the sidebar settings: when they change, the kept word
+    # timings are re-segmented straight into the job's subtitle files
+    # instead of synthesizing again
+    subtitle_settings = {"max_line_length": max_line_length, "preserve_punctuation": preserve_punctuation}
+    if any(task["settings"][key] != value for key, value in subtitle_settings.items()):
+        timing = load_word_boundaries(
+            task["word_boundaries_path"], os.path.getmtime(task["word_boundaries_path"]))
+        _, task["cue_count"] = subtitle_service.write_subtitle_files(
+            timing["word_boundaries"], task["output_dir"], max_line_length, preserve_punctuation, timing["text"],
+            formats=[key for key in task.get("subtitle_files", {}) if key != "srt"])
+        task["settings"].update(subtitle_settings)
+
     # Success message
     st.success(f"""
     🎉 {t('generation_success', 'Generation complete!')}
@@ -375,12 +401,17 @@ if task and not st.session_state.generation_in_progress:
 
     # Results display
     col_audio, col_subtitle = st.columns([1, 1])
+    audio_mime = mimetypes.guess_type(task["audio_file_path"])[0] or "audio/mpeg"
 
     with col_audio:
         st.subheader("🔊 " + t("audio_output_subheader", "Audio Output"))
 
-        # Audio player
-        st.audio(task["audio_file_path"])
+        # Audio player: streamed from disk with range requests by the job file
+        # routes; Streamlit would load the whole file into memory on every rerun
+        if media_url and task.get("job_id"):
+            st.audio(f"{media_url}/jobs/{task['job_id']}/audio", format=audio_mime)
+        else:
+            st.audio(task["audio_file_path"], format=audio_mime)
 
         # Audio file info
         audio_path = Path(task["audio_file_path"])
@@ -390,41 +421,37 @@ if task and not st.session_state.generation_in_progress:
     with col_subtitle:
         st.subheader("📜 " + t("srt_output_subheader", "SRT Subtitle"))
 
-        # SRT preview
-        st.text_area(
-            label="SRT Preview",
-            value=task["srt_content"],
-            height=200,
-            key="srt_output_main",
-            label_visibility="collapsed"
-        )
+        # SRT preview, read from the file and not kept in the session
+        with open(task["srt_file_path"], "r", encoding="utf-8") as f:
+            srt_preview = f.read(SRT_PREVIEW_CHARS + 1)
+        if len(srt_preview) > SRT_PREVIEW_CHARS:
+            srt_preview = srt_preview[:SRT_PREVIEW_CHARS] + "\n…"
+        st.code(srt_preview, language=None, wrap_lines=True, height=200)
 
-        # SRT info
-        srt_lines = len(
-            [line for line in task["srt_content"].split('\n') if line.strip()])
-        st.caption(f"📊 Total lines: {srt_lines}")
+        # SRT info, counted when the subtitles were segmented
+        if "cue_count" in task:
+            st.caption(f"📊 Total cues: {task['cue_count']}")
 
     # Download section
     st.subheader("⬇️ " + t("download_files_subheader", "Download Files"))
 
     col_dl1, col_dl2, col_dl3 = st.columns([1, 1, 1])
 
+    # Downloads read the files only when clicked, not on every rerun
     with col_dl1:
-        with open(task["audio_file_path"], "rb") as f:
-            st.download_button(
-                label=f"📥 {t('download_audio_button', 'Download Audio')}",
-                data=f,
-                file_name=os.path.basename(task["audio_file_path"]),
-                mime="audio/wav" if task["audio_file_path"].endswith(
-                    '.wav') else "audio/mp3",
-                key="download_audio_main",
-                use_container_width=True
-            )
+        st.download_button(
+            label=f"📥 {t('download_audio_button', 'Download Audio')}",
+            data=Path(task["audio_file_path"]).read_bytes,
+            file_name=os.path.basename(task["audio_file_path"]),
+            mime=audio_mime,
+            key="download_audio_main",
+            use_container_width=True
+        )
 
     with col_dl2:
         st.download_button(
             label=f"📝 {t('download_srt_button', 'Download Subtitle')}",
-            data=task["srt_content"],
+            data=Path(task["srt_file_path"]).read_bytes,
             file_name=os.path.basename(task["srt_file_path"]),
             mime="text/plain",
             key="download_srt_main",
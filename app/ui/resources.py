@@ -0,0 +1,152 @@
+"""
+Cached resources of the web interface.
+
+Streamlit re-executes gui.py on every interaction. Parsed files and service
+objects are therefore cached, and the cached functions live in this module
+so they are defined once per process instead of on every rerun. File
+caches are keyed on the modification time, so edits are picked up on the
+next rerun.
+"""
+import os
+import json
+import streamlit as st
+import toml
+from app.api.server import DEFAULT_HOST, start_media_server
+from app.services.jobs import JobQueue
+from app.services.subtitle import SubtitleService
+from app.services.timing import load_boundaries
+from app.services.voice import VoiceService
+
+
+def find_file(possible_paths):
+    """
+    Find the first existing file of a list.
+
+    Args:
+        possible_paths: Candidate paths in order of preference
+
+    Returns:
+        tuple: (path, modification time), or (None, None) if none exists
+    """
+    for path in possible_paths:
+        try:
+            return path, os.path.getmtime(path)
+        except OSError:
+            continue
+    return None, None
+
+
+@st.cache_data
+def read_toml(path, mtime):
+    """
+    Parse a TOML file.
+
+    Args:
+        path: File path
+        mtime: Modification time of the file, only used as part of the cache key
+
+    Returns:
+        dict: Parsed content
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return toml.load(f)
+
+
+@st.cache_resource(max_entries=1)
+def get_voice_service(config_path, config_mtime, _config):
+    """
+    Create the voice service shared by all sessions until the configuration changes.
+
+    Args:
+        config_path: Path of the configuration file, part of the cache key
+        config_mtime: Modification time of the configuration file, part of the cache key
+        _config: Configuration dictionary (not hashed)
+
+    Returns:
+        VoiceService: Shared voice service
+    """
+    return VoiceService(_config)
+
+
+@st.cache_resource(max_entries=1)
+def get_subtitle_service(config_path, config_mtime, _config):
+    """
+    Create the subtitle service shared by all sessions until the configuration changes.
+
+    Args:
+        config_path: Path of the configuration file, part of the cache key
+        config_mtime: Modification time of the configuration file, part of the cache key
+        _config: Configuration dictionary (not hashed)
+
+    Returns:
+        SubtitleService: Shared subtitle service
+    """
+    return SubtitleService(_config)
+
+
+@st.cache_resource(max_entries=16)
+def load_word_boundaries(path, mtime):
+    """
+    Load the text and word timings a job kept next to its audio.
+
+    Cached as a resource, so sessions share one read-only copy.
+
+    Args:
+        path: Word boundaries file of the job
+        mtime: Modification time of the file, only used as part of the cache key
+
+    Returns:
+        dict: The synthesized text and its word boundaries
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        timing = json.load(f)
+    timing["word_boundaries"] = load_boundaries(timing["word_boundaries"])
+    return timing
+
+
+@st.cache_resource
+def get_job_queue(_config):
+    """
+    Start the job queue shared by all sessions of this server.
+
+    The workers keep the configuration they were started with for the
+    lifetime of the process.
+
+    Args:
+        _config: Configuration dictionary (not hashed)
+
+    Returns:
+        JobQueue: Started job queue
+    """
+    job_queue = JobQueue.from_config(_config)
+    job_queue.start()
+    return job_queue
+
+
+@st.cache_resource
+def get_media_url(_config, _job_queue):
+    """
+    Start serving the files of finished jobs for the audio player.
+
+    The audio is streamed from disk with range requests by the HTTP API's
+    file routes, run in a background thread of this server unless
+    ``[gui] media_url`` points the browser at a separately run API.
+
+    Args:
+        _config: Configuration dictionary (not hashed)
+        _job_queue: JobQueue the jobs are looked up in (not hashed)
+
+    Returns:
+        str: Base URL of the file routes as seen from the browser, or None
+            if the server could not be started
+    """
+    settings = _config.get("gui", {})
+    if settings.get("media_url"):
+        return settings["media_url"].rstrip("/")
+    host = settings.get("media_host", DEFAULT_HOST)
+    try:
+        port = start_media_server(_job_queue, host, settings.get("media_port", 0))
+    except OSError as e:
+        print(f"Failed to start the media server on {host}: {e}")
+        return None
+    return f"http://{host}:{port}"
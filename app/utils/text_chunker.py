@@ -0,0 +1,128 @@
+import re
+
+# A sentence runs up to and including its terminal punctuation plus any
+# closing quotes/brackets; paragraph breaks always end a sentence.
+SENTENCE_PATTERN = re.compile(
+    r'[^\n.!?。！？…]*(?:[.!?。！？…]+["\'”’」』）)\]]*|\n+|$)'
+)
+
+# Soft split points used when a single sentence is longer than a chunk.
+SOFT_BREAK_PATTERN = re.compile(r'(?<=[,;:，；：、])|\s+')
+
+# Full-width clause and sentence marks (and closing brackets) are not followed
+# by a space when pieces or sentences are rejoined.
+CJK_CLAUSE_MARKS = "，；：、"
+CJK_JOIN_MARKS = CJK_CLAUSE_MARKS + "。！？」』）"
+
+
+def split_sentences(text):
+    """
+    Split text into sentences at sentence punctuation and paragraph breaks.
+
+    Args:
+        text: Input text
+
+    Returns:
+        list: Non-empty, stripped sentence strings in document order
+    """
+    if not text:
+        return []
+
+    sentences = []
+    for match in SENTENCE_PATTERN.finditer(text):
+        sentence = match.group(0).strip()
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def chunk_text(text, max_chars):
+    """
+    Group sentences into chunks of at most max_chars characters.
+
+    Sentences are never merged across a chunk boundary; a single sentence
+    longer than max_chars is split at commas or whitespace, and only as a
+    last resort at a hard character limit.
+
+    Args:
+        text: Input text
+        max_chars: Maximum characters per chunk
+
+    Returns:
+        list: Chunk strings in document order
+    """
+    if max_chars <= 0:
+        raise ValueError("max_chars must be greater than 0")
+
+    chunks = []
+    current = ""
+
+    for sentence in split_sentences(text):
+        for piece in _split_long_sentence(sentence, max_chars):
+            candidate = _join(current, piece)
+            if len(candidate) <= max_chars:
+                current = candidate
+            else:
+                chunks.append(current)
+                current = piece
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def _split_long_sentence(sentence, max_chars):
+    """
+    Split a sentence that does not fit into a single chunk.
+
+    Args:
+        sentence: Sentence text
+        max_chars: Maximum characters per piece
+
+    Returns:
+        list: Pieces of at most max_chars characters
+    """
+    if len(sentence) <= max_chars:
+        return [sentence]
+
+    pieces = []
+    current = ""
+    for part in SOFT_BREAK_PATTERN.split(sentence):
+        if not part:
+            continue
+        candidate = _join(current, part)
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+
+        if current:
+            pieces.append(current)
+        # Hard split parts that have no soft break inside (e.g. CJK runs)
+        while len(part) > max_chars:
+            pieces.append(part[:max_chars])
+            part = part[max_chars:]
+        current = part
+
+    if current:
+        pieces.append(current)
+
+    return pieces
+
+
+def _join(current, piece):
+    """
+    Append a piece to a chunk, separated by a space unless the chunk ends with full-width punctuation.
+
+    Args:
+        current: Chunk so far, possibly empty
+        piece: Sentence or sentence piece to append
+
+    Returns:
+        str: Joined text
+    """
+    if not current:
+        return piece
+    if current[-1] in CJK_JOIN_MARKS:
+        return current + piece
+    return f"{current} {piece}"
@@ -1,5 +1,74 @@
-import os
-from datetime import timedelta
+from app.services.timing import TICKS_PER_MICROSECOND, TICKS_PER_SECOND
+
+
+def split_ticks(ticks):
+    """
+    Split a tick count into hours, minutes, seconds and milliseconds.
+
+    Ticks are rounded to whole microseconds (half to even, like
+    ``datetime.timedelta``) and then truncated to milliseconds, the rounding
+    the float formatter applied, so cue times are unchanged. The only
+    exception are exact half-microsecond ties, which the float path
+    resolved by representation error. Only integer arithmetic is used.
+    Hours are not wrapped at 24.
+
+    Args:
+        ticks: Time in 100-nanosecond ticks (int)
+
+    Returns:
+        tuple: (hours, minutes, seconds, milliseconds)
+    """
+    microseconds, remainder = divmod(ticks, TICKS_PER_MICROSECOND)
+    if remainder * 2 > TICKS_PER_MICROSECOND or (remainder * 2 == TICKS_PER_MICROSECOND and microseconds % 2):
+        microseconds += 1
+    total_seconds, milliseconds = divmod(microseconds // 1000, 1000)
+    minutes, seconds = divmod(total_seconds, 60)
+    hours, minutes = divmod(minutes, 60)
+    return hours, minutes, seconds, milliseconds
+
+
+def format_ticks(ticks):
+    """
+    Format a tick count into the SRT time format (HH:MM:SS,ms).
+
+    Args:
+        ticks: Time in 100-nanosecond ticks (int)
+
+    Returns:
+        str: Formatted time string in SRT format
+    """
+    hours, minutes, seconds, milliseconds = split_ticks(ticks)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+
+
+def format_vtt_ticks(ticks):
+    """
+    Format a tick count into the WebVTT time format (HH:MM:SS.mmm).
+
+    Args:
+        ticks: Time in 100-nanosecond ticks (int)
+
+    Returns:
+        str: Formatted time string in WebVTT format
+    """
+    hours, minutes, seconds, milliseconds = split_ticks(ticks)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{milliseconds:03d}"
+
+
+def format_ass_ticks(ticks):
+    """
+    Format a tick count into the ASS time format (H:MM:SS.cc).
+
+    Milliseconds are truncated to centiseconds like they are truncated for SRT.
+
+    Args:
+        ticks: Time in 100-nanosecond ticks (int)
+
+    Returns:
+        str: Formatted time string in ASS format
+    """
+    hours, minutes, seconds, milliseconds = split_ticks(ticks)
+    return f"{hours:d}:{minutes:02d}:{seconds:02d}.{milliseconds // 10:02d}"
 
 
 def format_time(seconds):
@@ -12,17 +81,28 @@ def format_time(seconds):
     Returns:
         str: Formatted time string in SRT format
     """
-    delta = timedelta(seconds=seconds)
-    hours = delta.seconds // 3600
-    minutes = (delta.seconds % 3600) // 60
-    seconds = delta.seconds % 60
-    milliseconds = delta.microseconds // 1000
-    return f"{hours:02d}:{minutes:02d}:{seconds:02d},{milliseconds:03d}"
+    return format_ticks(round(seconds * TICKS_PER_SECOND))
+
+
+def ticks_to_srt(subtitle_id, text, start_ticks, end_ticks):
+    """
+    Generate a single SRT subtitle block from tick times.
+
+    Args:
+        subtitle_id: Sequential ID number for the subtitle
+        text: Subtitle text content
+        start_ticks: Start time in 100-nanosecond ticks
+        end_ticks: End time in 100-nanosecond ticks
+
+    Returns:
+        str: Complete SRT block formatted string
+    """
+    return f"{subtitle_id}\n{format_ticks(start_ticks)} --> {format_ticks(end_ticks)}\n{text}\n\n"
 
 
 def text_to_srt(subtitle_id, text, start_time, end_time):
     """
-    Generate a single SRT subtitle block.
+    Generate a single SRT subtitle block from times in seconds.
 
     Args:
         subtitle_id: Sequential ID number for the subtitle
@@ -33,6 +113,5 @@ def text_to_srt(subtitle_id, text, start_time, end_time):
     Returns:
         str: Complete SRT block formatted string
     """
-    start_str = format_time(start_time)
-    end_str = format_time(end_time)
-    return f"{subtitle_id}\n{start_str} --> {end_str}\n{text}\n\n"
+    return ticks_to_srt(
+        subtitle_id, text, round(start_time * TICKS_PER_SECOND), round(end_time * TICKS_PER_SECOND))
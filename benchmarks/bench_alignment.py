@@ -0,0 +1,127 @@
+"""
+Benchmark punctuation alignment on CJK and English corpora.
+
+Compares the aligner with the previous per-token regex implementation and
+reports how many words keep their correct text when the TTS reads numbers out.
+
+Usage:
+    python -m benchmarks.bench_alignment [--words 50000] [--repeat 3]
+"""
+import argparse
+import random
+import re
+import time
+from app.services.subtitle import SubtitleService
+from app.services.timing import WordBoundary
+
+ENGLISH_WORDS = ["the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "while", "reading"]
+CJK_WORDS = ["我們", "今天", "學習", "中文", "字幕", "時間", "很", "好", "語音", "合成"]
+PUNCTUATION = {"en": [",", ".", "!", "?", ""], "cjk": ["，", "。", "！", "？", ""]}
+
+
+def make_corpus(language, count, seed=0, numbers=False):
+    """
+    Build an original text and the word boundaries a TTS would report for it.
+
+    Args:
+        language: "en" or "cjk"
+        count: Number of words
+        seed: Random seed
+        numbers: Insert numbers that the TTS reads out as two words
+
+    Returns:
+        tuple: (original_text, word_boundaries, expected_cores)
+    """
+    rng = random.Random(seed)
+    vocabulary = ENGLISH_WORDS if language == "en" else CJK_WORDS
+    separator = " " if language == "en" else ""
+    parts = []
+    word_boundaries = []
+    expected = []
+    offset = 0
+    for i in range(count):
+        if numbers and i % 50 == 25:
+            parts.append("100")
+            spoken = ["one", "hundred"] if language == "en" else ["一", "百"]
+            expected.extend(["100", "100"])
+        else:
+            word = rng.choice(vocabulary)
+            punctuation = rng.choice(PUNCTUATION[language]) if i % 7 == 6 else ""
+            parts.append(word + punctuation)
+            spoken = [word]
+            expected.append(word)
+        for text in spoken:
+            word_boundaries.append(WordBoundary(text, offset, 3000000))
+            offset += 3000000
+    return separator.join(parts), word_boundaries, expected
+
+
+def legacy_align(word_boundaries, original_text):
+    """The previous implementation, kept here as the benchmark baseline."""
+    tokens = re.findall(r'\w+|[^\w\s]', original_text, re.UNICODE)
+    aligned_boundaries = []
+    token_index = 0
+    for wb in word_boundaries:
+        if token_index >= len(tokens):
+            aligned_boundaries.append(wb)
+            continue
+        pieces = []
+        while token_index < len(tokens):
+            token = tokens[token_index]
+            pieces.append(token)
+            token_index += 1
+            if re.match(r'\w', token, re.UNICODE):
+                while token_index < len(tokens) and not re.match(r'\w', tokens[token_index], re.UNICODE):
+                    pieces.append(tokens[token_index])
+                    token_index += 1
+                break
+        aligned_boundaries.append(wb.with_text(''.join(pieces)))
+    return aligned_boundaries
+
+
+def accuracy(aligned, expected):
+    """Share of TTS words whose aligned text is exactly the expected word."""
+    by_offset = {wb.offset: wb for wb in aligned}
+    hits = 0
+    current = None
+    for i, word in enumerate(expected):
+        # A merged boundary also covers the offsets of the words merged into it
+        current = by_offset.get(i * 3000000, current)
+        hits += ''.join(re.findall(r'\w+', current.text)) == word
+    return hits / len(expected)
+
+
+def best_of(repeat, func):
+    """Return the best wall-clock time of several runs and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    service = SubtitleService({})
+    for language in ("en", "cjk"):
+        text, word_boundaries, _ = make_corpus(language, args.words)
+        legacy, _ = best_of(args.repeat, lambda: legacy_align(word_boundaries, text))
+        current, _ = best_of(
+            args.repeat, lambda: service._align_with_original_text(word_boundaries, text))
+
+        text, word_boundaries, expected = make_corpus(language, args.words, numbers=True)
+        legacy_accuracy = accuracy(legacy_align(word_boundaries, text), expected)
+        current_accuracy = accuracy(service._align_with_original_text(word_boundaries, text), expected)
+
+        print(f"{language:>3} {args.words} words  legacy {legacy * 1000:8.1f} ms ({legacy_accuracy:6.1%} correct)"
+              f"   aligner {current * 1000:8.1f} ms ({current_accuracy:6.1%} correct)")
+
+
+if __name__ == "__main__":
+    main()
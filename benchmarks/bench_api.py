@@ -0,0 +1,144 @@
+"""
+Load-test the HTTP API locally with the fake TTS backend.
+
+Starts the API in-process on a free port and drives it with concurrent
+clients: first every client submits jobs, polls them to completion and
+downloads their audio and subtitles, then the clients stream speech. Reports
+submit and end-to-end latency percentiles, throughput and how many
+requests were turned away by backpressure (503).
+
+Usage:
+    python -m benchmarks.bench_api [--jobs 200] [--clients 32] [--workers 4]
+        [--streams 100] [--sentences 8]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import aiohttp
+from aiohttp import web
+from app.api.server import create_app
+from app.services.jobs import JobQueue
+from benchmarks.bench_pipeline import make_text
+
+VOICE = "en-US-JennyNeural"
+
+
+def percentile(values, share):
+    """Return the value below which ``share`` of the sorted values fall."""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(share * len(values)))]
+
+
+async def render_job(session, url, body, stats):
+    """Submit one job, poll it and download its outputs, retrying on 503."""
+    start = time.perf_counter()
+    while True:
+        async with session.post(f"{url}/jobs", json=body) as response:
+            if response.status != 503:
+                job = await response.json()
+                break
+            stats["rejected"] += 1
+        await asyncio.sleep(0.05)
+    stats["submit"].append(time.perf_counter() - start)
+
+    while job["status"] in ("queued", "running"):
+        await asyncio.sleep(0.02)
+        async with session.get(f"{url}/jobs/{job['id']}") as response:
+            job = await response.json()
+    if job["status"] != "succeeded":
+        stats["failed"] += 1
+        return
+
+    for link in (job["audio"], job["srt"]):
+        async with session.get(url + link) as response:
+            await response.read()
+    stats["job"].append(time.perf_counter() - start)
+
+
+async def stream_speech(session, url, body, stats):
+    """Stream one text, retrying on 503, and record the time to its first audio byte."""
+    start = time.perf_counter()
+    while True:
+        async with session.post(f"{url}/speech", json=body) as response:
+            if response.status != 503:
+                await response.content.readany()
+                stats["first_byte"].append(time.perf_counter() - start)
+                await response.read()
+                break
+            stats["rejected"] += 1
+        await asyncio.sleep(0.05)
+    stats["stream"].append(time.perf_counter() - start)
+
+
+async def drive(count, clients, worker):
+    """Run ``count`` calls of ``worker`` with ``clients`` of them in flight."""
+    semaphore = asyncio.Semaphore(clients)
+
+    async def run(i):
+        async with semaphore:
+            await worker(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run(i) for i in range(count)))
+    return time.perf_counter() - start
+
+
+async def benchmark(jobs, clients, workers, streams, sentences):
+    """Serve the API and report job and streaming load-test results."""
+    with tempfile.TemporaryDirectory() as tmp:
+        config = {
+            "TTS_BACKEND": "fake",
+            "cache": {"enabled": False},
+            "resilience": {"requests_per_second": 0},
+            "api": {"max_pending_jobs": workers * 4, "stream_concurrency": workers}
+        }
+        queue = JobQueue(config, os.path.join(tmp, "jobs.sqlite3"), workers, poll_seconds=0.05,
+                         output_root=os.path.join(tmp, "task"))
+        runner = web.AppRunner(create_app(config, queue), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = "http://{}:{}".format(*runner.addresses[0][:2])
+
+        texts = [make_text("en", sentences, seed=i) for i in range(max(jobs, streams))]
+        try:
+            async with aiohttp.ClientSession() as session:
+                stats = {"submit": [], "job": [], "rejected": 0, "failed": 0}
+                wall = await drive(jobs, clients, lambda i: render_job(
+                    session, url, {"text": texts[i], "voice": VOICE}, stats))
+                print(f"jobs    {jobs:>5} in {wall:6.2f}s  {jobs / wall:7.1f} jobs/s  "
+                      f"submit p50 {percentile(stats['submit'], 0.5) * 1000:7.1f} ms "
+                      f"p95 {percentile(stats['submit'], 0.95) * 1000:7.1f} ms  "
+                      f"end-to-end p50 {percentile(stats['job'], 0.5) * 1000:7.1f} ms "
+                      f"p95 {percentile(stats['job'], 0.95) * 1000:7.1f} ms  "
+                      f"{stats['rejected']} rejected  {stats['failed']} failed")
+
+                stats = {"first_byte": [], "stream": [], "rejected": 0}
+                wall = await drive(streams, clients, lambda i: stream_speech(
+                    session, url, {"text": texts[i], "voice": VOICE}, stats))
+                print(f"streams {streams:>5} in {wall:6.2f}s  {len(stats['stream']) / wall:7.1f} req/s  "
+                      f"first byte p50 {percentile(stats['first_byte'], 0.5) * 1000:7.1f} ms "
+                      f"p95 {percentile(stats['first_byte'], 0.95) * 1000:7.1f} ms  "
+                      f"{stats['rejected']} rejected")
+        finally:
+            await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent clients.")
+    parser.add_argument("--workers", type=int, default=4, help="Job workers of the server.")
+    parser.add_argument("--streams", type=int, default=100, help="Streaming requests.")
+    parser.add_argument("--sentences", type=int, default=8, help="Sentences per text.")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.jobs, args.clients, args.workers, args.streams, args.sentences))
+
+
+if __name__ == "__main__":
+    main()
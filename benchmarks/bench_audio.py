@@ -0,0 +1,114 @@
+"""
+Benchmark the ffmpeg output stage on a long render.
+
+Synthesizes a long text sentence by sentence with the fake backend and
+encodes the sentence audio into every output format, once through the
+single ffmpeg pipe of AudioEncoder and once the way chunked renders used to
+be assembled: every chunk encoded from its own temporary file, then joined
+with ffmpeg's concat demuxer. Reports wall time, the realtime factor
+(seconds of audio encoded per second) and the output size. Needs ffmpeg.
+
+Usage:
+    python -m benchmarks.bench_audio [--sentences 400] [--formats wav,mp3,opus,m4a]
+        [--loudnorm]
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from app.services.audio import OUTPUT_FORMATS, AudioEncoder
+from app.services.backends import create_backend
+from app.services.timing import TICKS_PER_SECOND
+from app.utils.text_chunker import split_sentences
+from benchmarks.bench_pipeline import make_text
+
+VOICE = "en-US-JennyNeural"
+
+
+async def synthesize(sentences):
+    """
+    Synthesize every sentence with the fake backend.
+
+    Args:
+        sentences: Sentence texts
+
+    Returns:
+        tuple: (audio chunks, audio seconds)
+    """
+    backend = create_backend("fake", {})
+    results = await asyncio.gather(*(backend.synthesize(s, VOICE, 0, 0, 0) for s in sentences))
+    chunks = [audio for audio, _ in results]
+    return chunks, sum(backend.duration_ticks(audio) for audio in chunks) / TICKS_PER_SECOND
+
+
+def encode_per_chunk(encoder, chunks, work_dir):
+    """
+    Encode every chunk from a temporary file, then concatenate the results.
+
+    Args:
+        encoder: AudioEncoder
+        chunks: Audio chunks
+        work_dir: Directory for the temporary files
+
+    Returns:
+        str: Path of the joined file
+    """
+    listing = os.path.join(work_dir, "chunks.txt")
+    with open(listing, "w", encoding="utf-8") as f:
+        for i, audio in enumerate(chunks):
+            source = os.path.join(work_dir, f"source{i}.mp3")
+            with open(source, "wb") as chunk_file:
+                chunk_file.write(audio)
+            target = os.path.join(work_dir, f"chunk{i}.{encoder.format}")
+            args = encoder.command("mp3", target)
+            args[args.index("pipe:0")] = source
+            subprocess.run(args, check=True, stdin=subprocess.DEVNULL)
+            f.write(f"file '{target}'\n")
+    output_path = os.path.join(work_dir, f"joined.{encoder.format}")
+    subprocess.run([encoder.executable(), "-hide_banner", "-loglevel", "error", "-y",
+                    "-f", "concat", "-safe", "0", "-i", listing, "-c", "copy", output_path],
+                   check=True, stdin=subprocess.DEVNULL)
+    return output_path
+
+
+def report(label, output_format, wall, audio_seconds, path):
+    """Print one result line."""
+    print(f"{output_format:<5} {label:<10} {wall:8.2f} s  {audio_seconds / wall:8.1f}x realtime  "
+          f"{os.path.getsize(path) / 1024 / 1024:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sentences", type=int, default=400)
+    parser.add_argument("--formats", default=",".join(OUTPUT_FORMATS))
+    parser.add_argument("--loudnorm", action="store_true", help="Normalize the loudness while encoding.")
+    args = parser.parse_args()
+
+    try:
+        AudioEncoder("wav").executable()
+    except RuntimeError as e:
+        print(e)
+        sys.exit(1)
+
+    sentences = split_sentences(make_text("en", args.sentences))
+    chunks, audio_seconds = asyncio.run(synthesize(sentences))
+    print(f"{len(chunks)} chunks, {audio_seconds / 60:.1f} min of audio, "
+          f"{sum(map(len, chunks)) / 1024 / 1024:.1f} MiB of MP3")
+
+    for output_format in args.formats.split(","):
+        encoder = AudioEncoder(output_format, loudnorm=args.loudnorm)
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            path, _ = asyncio.run(encoder.encode("mp3", chunks, tmp, []))
+            report("pipe", output_format, time.perf_counter() - start, audio_seconds, path)
+
+            start = time.perf_counter()
+            path = encode_per_chunk(encoder, chunks, tmp)
+            report("per-chunk", output_format, time.perf_counter() - start, audio_seconds, path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Micro-benchmark the subtitle text cleanup against the previous implementation.
+
+Reports the per-word (or per-cue) cost of word cleaning, natural break
+detection and spacing fixes. Exits with status 1 if any case is slower than
+the previous implementation by more than the allowed ratio, or slower than
+an optional absolute budget, so it can guard against regressions in CI.
+
+Usage:
+    python -m benchmarks.bench_cleanup [--words 100000] [--repeat 5]
+        [--min-speedup 1.0] [--max-ns-per-word 2000]
+"""
+import argparse
+import random
+import re
+import sys
+import time
+from app.services.subtitle import SubtitleService
+from app.services.cleanup import TextCleaner
+
+WORDS = [
+    "the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog.", "and", "however,",
+    "\"quoted\"", "(aside)", "it's", "well-known", "3.14", "then", "我們", "今天", "學習。",
+    "但是", "world!", " spaced ", "tab\tbed", "§note"
+]
+
+
+def legacy_clean_word(word, preserve_punctuation):
+    """The previous SubtitleService._clean_word."""
+    word = word.strip()
+    if not preserve_punctuation:
+        word = re.sub(r'[^\w\s\-\']', '', word)
+    word = re.sub(r'\s+', ' ', word)
+    return word.strip()
+
+
+def legacy_is_natural_break_point(previous_word, current_word):
+    """The previous SubtitleService._is_natural_break_point."""
+    for mark in ['.', '!', '?', '。', '！', '？']:
+        if previous_word.endswith(mark):
+            return True
+    for mark in [',', ';', ':', '，', '；', '：']:
+        if previous_word.endswith(mark):
+            return True
+    transition_words = [
+        'and', 'but', 'or', 'so', 'then', 'however', 'therefore',
+        'moreover', 'furthermore', 'meanwhile', 'consequently', 'also',
+        'additionally', 'finally', 'firstly', 'secondly', 'lastly',
+        '而且', '但是', '然而', '因此', '所以', '然後', '同時', '另外',
+        '首先', '其次', '最後', '此外', '再者', '接著', '最終'
+    ]
+    return current_word.lower() in transition_words
+
+
+def legacy_fix_spacing(text, preserve_punctuation):
+    """The previous SubtitleService._fix_spacing."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    if preserve_punctuation:
+        text = re.sub(r'\s+([,.!?;:，。！？；：])', r'\1', text)
+        text = re.sub(r'([,.!?;:，。！？；：])([^\s])', r'\1 \2', text)
+    text = re.sub(r'\s*"\s*', '"', text)
+    text = re.sub(r"\s*'\s*", "'", text)
+    text = re.sub(r'\s*\(\s*', '(', text)
+    text = re.sub(r'\s*\)\s*', ')', text)
+    return text.strip()
+
+
+def make_words(count, seed=0, unique=False):
+    """Generate words, optionally all distinct so memoization never hits."""
+    rng = random.Random(seed)
+    words = [rng.choice(WORDS) for _ in range(count)]
+    if unique:
+        words = [f"{word}{i}" for i, word in enumerate(words)]
+    return words
+
+
+def make_cues(words, size=7):
+    """Join words into cue texts the way segments are built."""
+    return [' '.join(words[i:i + size]) for i in range(0, len(words), size)]
+
+
+def per_item_ns(repeat, func, items):
+    """Return the best time per item in nanoseconds and the results."""
+    best = float("inf")
+    results = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = func(items)
+        best = min(best, time.perf_counter() - start)
+    return best / len(items) * 1e9, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-speedup", type=float, default=1.0,
+                        help="Fail if a case is not at least this much faster than before.")
+    parser.add_argument("--max-ns-per-word", type=float, default=None,
+                        help="Fail if a case costs more than this many nanoseconds per item.")
+    args = parser.parse_args()
+
+    words = make_words(args.words)
+    unique_words = make_words(args.words, unique=True)
+    pairs = list(zip(words, words[1:]))
+    cues = make_cues(words)
+    service = SubtitleService({})
+
+    def clean_all(cleaner, preserve):
+        return lambda items: [cleaner(word, preserve) for word in items]
+
+    def fix_all(fixer, preserve):
+        return lambda items: [fixer(cue, preserve) for cue in items]
+
+    cases = [
+        ("clean_word (preserve)", words,
+         clean_all(legacy_clean_word, True), clean_all(service._clean_word, True)),
+        ("clean_word (strip)", words,
+         clean_all(legacy_clean_word, False), clean_all(service._clean_word, False)),
+        # A fresh cleaner per run with distinct words measures the uncached path
+        ("clean_word (distinct)", unique_words,
+         clean_all(legacy_clean_word, False),
+         lambda items: clean_all(TextCleaner().clean_word, False)(items)),
+        ("natural break", pairs,
+         lambda items: [legacy_is_natural_break_point(p, c) for p, c in items],
+         lambda items: [service._is_natural_break_point(p, c) for p, c in items]),
+        ("fix_spacing (per cue)", cues,
+         fix_all(legacy_fix_spacing, True), fix_all(service._fix_spacing, True)),
+    ]
+
+    failed = False
+    for name, items, legacy, current in cases:
+        legacy_ns, expected = per_item_ns(args.repeat, legacy, items)
+        current_ns, results = per_item_ns(args.repeat, current, items)
+        assert results == expected, f"{name}: output differs from the previous implementation"
+
+        speedup = legacy_ns / current_ns
+        over_budget = args.max_ns_per_word is not None and current_ns > args.max_ns_per_word
+        status = "FAIL" if speedup < args.min_speedup or over_budget else "ok"
+        failed = failed or status == "FAIL"
+        print(f"{name:<24} legacy {legacy_ns:8.0f} ns   current {current_ns:8.0f} ns   "
+              f"{speedup:5.1f}x  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
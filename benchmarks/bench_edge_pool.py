@@ -0,0 +1,82 @@
+"""
+Benchmark Edge TTS connection reuse against the local stand-in server.
+
+Synthesizes many cue-length texts the way batch jobs and incremental
+synthesis do, once opening a new WebSocket per request and once through
+the connection pool, and reports wall time and the time spent in
+handshakes versus synthesis. The stand-in delays every handshake to
+emulate the TLS and WebSocket setup cost of the real service.
+
+Usage:
+    python -m benchmarks.bench_edge_pool [--requests 200] [--concurrency 4]
+        [--handshake-ms 80]
+"""
+import argparse
+import asyncio
+import time
+from app.services.backends.edge import EdgeBackend
+from benchmarks.edge_standin import EdgeStandInServer
+from benchmarks.bench_pipeline import make_text
+
+VOICE = "en-US-JennyNeural"
+
+
+async def run(server, texts, concurrency, pooled):
+    """
+    Synthesize all texts with bounded concurrency.
+
+    Args:
+        server: Running EdgeStandInServer
+        texts: Texts to synthesize
+        concurrency: Maximum number of requests in flight
+        pooled: Keep connections open between requests
+
+    Returns:
+        tuple: (wall_seconds, pool_stats)
+    """
+    backend = EdgeBackend({
+        "edge_url": server.url,
+        "edge_pool_size": concurrency,
+        # An idle limit of 0 closes every connection after its request
+        "edge_pool_idle_seconds": 30 if pooled else 0
+    })
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def synthesize(text):
+        async with semaphore:
+            return await backend.synthesize(text, VOICE, 0, 0, 0)
+
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(synthesize(text) for text in texts))
+    finally:
+        await backend.aclose()
+    return time.perf_counter() - start, backend.stats()
+
+
+async def benchmark(requests, concurrency, handshake_seconds):
+    """Run the fresh-connection and pooled cases and print their timings."""
+    texts = [make_text("en", 1, seed=i) for i in range(requests)]
+
+    async with EdgeStandInServer(handshake_delay=handshake_seconds) as server:
+        for label, pooled in (("fresh", False), ("pooled", True)):
+            wall, stats = await run(server, texts, concurrency, pooled)
+            print(f"{label:<7} {wall * 1000:9.1f} ms wall  {requests / wall:8.1f} req/s  "
+                  f"{stats['handshakes']:>5} handshakes  "
+                  f"handshake {stats['handshake_seconds'] * 1000:9.1f} ms  "
+                  f"synthesis {stats['synthesis_seconds'] * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--handshake-ms", type=float, default=80,
+                        help="Emulated handshake latency per connection.")
+    args = parser.parse_args()
+
+    asyncio.run(benchmark(args.requests, args.concurrency, args.handshake_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark the cost of a Streamlit rerun of the web interface.
+
+Streamlit re-executes app/ui/gui.py on every widget interaction. This runs
+the script headless with Streamlit's AppTest, changes a sidebar slider
+repeatedly and reports the time spent executing the script per rerun
+(AppTest's own polling is excluded). The page runs in a temporary
+directory with the fake backend, so no TTS service is contacted. The
+synthesis cache can be pre-filled to emulate a long-running instance.
+
+Usage:
+    python -m benchmarks.bench_gui [--reruns 50] [--cache-entries 2000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+import toml
+from streamlit.runtime.scriptrunner import script_runner
+from streamlit.testing.v1 import AppTest
+from app.services.cache import SynthesisCache
+
+GUI_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app", "ui", "gui.py"))
+CONFIG_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "config.example.toml"))
+
+
+def benchmark(reruns):
+    """
+    Time reruns triggered by slider changes.
+
+    Args:
+        reruns: Number of timed reruns
+
+    Returns:
+        list: Seconds of script execution per rerun
+    """
+    timings = []
+    execute = script_runner.exec_func_with_error_handling
+
+    def timed_execute(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return execute(*args, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+
+    script_runner.exec_func_with_error_handling = timed_execute
+    try:
+        app = AppTest.from_file(GUI_PATH, default_timeout=60)
+        app.run()
+        if app.exception:
+            raise RuntimeError(app.exception[0].message)
+
+        del timings[:]
+        for i in range(reruns):
+            app.slider(key="rate_slider_main").set_value(5 * (i % 10 - 5)).run()
+    finally:
+        script_runner.exec_func_with_error_handling = execute
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=50)
+    parser.add_argument("--cache-entries", type=int, default=0,
+                        help="Synthesis cache entries created before the run.")
+    args = parser.parse_args()
+
+    config = toml.load(CONFIG_PATH)
+    config["TTS_BACKEND"] = "fake"
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "config.toml"), "w", encoding="utf-8") as f:
+            toml.dump(config, f)
+        cache = SynthesisCache(os.path.join(tmp, config["cache"]["dir"]))
+        for i in range(args.cache_entries):
+            cache.put_bytes(cache.make_key(f"Sentence {i}.", "voice", 0, 0, 0, "fake"),
+                            bytes(144), "mp3", [])
+        os.chdir(tmp)
+        try:
+            timings = benchmark(args.reruns)
+        finally:
+            os.chdir(cwd)
+
+    print(f"{len(timings)} reruns: mean {statistics.mean(timings) * 1000:.1f} ms  "
+          f"median {statistics.median(timings) * 1000:.1f} ms  "
+          f"max {max(timings) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Benchmark the full TTS-to-SRT pipeline offline with the fake TTS backend.
+
+Measures end-to-end throughput, per-stage latency (synthesis, cleaning,
+alignment, segmentation, SRT writing) and peak memory for English and CJK
+texts from a single sentence to a full book. Results are stored as JSON so
+runs can be compared over time.
+
+Usage:
+    python -m benchmarks.bench_pipeline [--sizes sentence,paragraph,chapter,book]
+        [--languages en,cjk] [--repeat 3] [--output results.json] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from app.services.voice import VoiceService
+from app.services.subtitle import SubtitleService
+from app.services.segmentation import WordArrays, find_segments
+from app.utils.text_to_srt import ticks_to_srt
+
+RESULTS_DIR = os.path.join("benchmarks", "results")
+
+# Number of sentences per input size
+SIZES = {
+    "sentence": 1,
+    "paragraph": 8,
+    "chapter": 400,
+    "book": 8000,
+}
+
+ENGLISH_WORDS = [
+    "the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog", "while", "reading",
+    "subtitles", "should", "stay", "readable", "and", "however", "it's", "morning", "river", "light"
+]
+CJK_WORDS = ["我們", "今天", "學習", "中文", "字幕", "時間", "很", "好", "語音", "合成", "但是", "所以"]
+
+VOICES = {"en": "en-US-JennyNeural", "cjk": "zh-TW-HsiaoChenNeural"}
+STAGES = ("synthesis", "cleaning", "alignment", "segmentation", "srt_writing")
+
+
+def make_text(language, sentences, seed=0):
+    """
+    Generate a deterministic text of the given number of sentences.
+
+    Args:
+        language: "en" or "cjk"
+        sentences: Number of sentences
+        seed: Random seed
+
+    Returns:
+        str: Text with clause and sentence punctuation and paragraph breaks
+    """
+    rng = random.Random(seed)
+    parts = []
+    for i in range(sentences):
+        if language == "en":
+            words = [rng.choice(ENGLISH_WORDS) for _ in range(rng.randint(6, 18))]
+            words[0] = words[0].capitalize()
+            if len(words) > 8:
+                words[len(words) // 2] += ","
+            sentence = " ".join(words) + rng.choice([".", ".", "!", "?"])
+        else:
+            words = [rng.choice(CJK_WORDS) for _ in range(rng.randint(5, 14))]
+            if len(words) > 7:
+                words[len(words) // 2] += "，"
+            sentence = "".join(words) + rng.choice(["。", "。", "！", "？"])
+        parts.append(sentence)
+        if i % 8 == 7:
+            parts.append("\n\n")
+        elif language == "en":
+            parts.append(" ")
+    return "".join(parts).strip()
+
+
+def run_stages(text, voice_name, config, output_dir):
+    """
+    Run the pipeline once, timing every stage.
+
+    Args:
+        text: Input text
+        voice_name: Voice name
+        config: Configuration dictionary using the fake backend
+        output_dir: Directory for the audio and SRT files
+
+    Returns:
+        tuple: (stage_seconds, details) where details counts words, cues and audio length
+    """
+    voice_service = VoiceService(config)
+    subtitle_service = SubtitleService(config)
+    timings = {}
+
+    start = time.perf_counter()
+    audio_file, word_boundaries = asyncio.run(
+        voice_service.synthesize_async(text, voice_name, 0, 0, 0, output_dir))
+    timings["synthesis"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cleaned = subtitle_service._clean_word_boundaries(word_boundaries, True)
+    timings["cleaning"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    aligned = subtitle_service._align_with_original_text(cleaned, text)
+    timings["alignment"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    words = WordArrays.from_boundaries(aligned)
+    segments = find_segments(words, 40)
+    timings["segmentation"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    starts, ends = words.spans()
+    starts = starts.tolist()
+    ends = ends.tolist()
+    cues = 0
+    with open(os.path.join(output_dir, "output.srt"), "w", encoding="utf-8") as f:
+        for first, last in segments:
+            subtitle_text = subtitle_service._fix_spacing(' '.join(words.texts[first:last]), True)
+            if subtitle_text:
+                cues += 1
+                f.write(ticks_to_srt(cues, subtitle_text, starts[first], ends[last - 1]))
+    timings["srt_writing"] = time.perf_counter() - start
+
+    details = {
+        "words": len(word_boundaries),
+        "cues": cues,
+        "audio_seconds": os.path.getsize(audio_file) * 8 / 48000
+    }
+    return timings, details
+
+
+def measure_peak_memory(text, voice_name, config, output_dir):
+    """
+    Run the pipeline once under tracemalloc and report peak memory per stage.
+
+    Timings are taken in separate runs, since tracing slows allocation down.
+
+    Returns:
+        dict: Peak traced memory in bytes per stage and overall
+    """
+    peaks = {}
+    tracemalloc.start()
+    try:
+        voice_service = VoiceService(config)
+        subtitle_service = SubtitleService(config)
+
+        def stage(name, func):
+            tracemalloc.reset_peak()
+            result = func()
+            peaks[name] = tracemalloc.get_traced_memory()[1]
+            return result
+
+        _, word_boundaries = stage("synthesis", lambda: asyncio.run(
+            voice_service.synthesize_async(text, voice_name, 0, 0, 0, output_dir)))
+        cleaned = stage("cleaning", lambda: subtitle_service._clean_word_boundaries(word_boundaries, True))
+        aligned = stage("alignment", lambda: subtitle_service._align_with_original_text(cleaned, text))
+        stage("segmentation", lambda: find_segments(WordArrays.from_boundaries(aligned), 40))
+        stage("srt_writing", lambda: subtitle_service.write_srt(
+            word_boundaries, os.path.join(output_dir, "output.srt"), original_text=text))
+    finally:
+        tracemalloc.stop()
+    peaks["overall"] = max(peaks.values())
+    return peaks
+
+
+def benchmark(language, size, repeat):
+    """
+    Benchmark one language and input size.
+
+    Args:
+        language: "en" or "cjk"
+        size: Key of SIZES
+        repeat: Number of timed runs; the fastest run per stage is reported
+
+    Returns:
+        dict: Result record
+    """
+    text = make_text(language, SIZES[size])
+    # The offline engine needs no rate limiting
+    config = {"TTS_BACKEND": "fake", "cache": {"enabled": False}, "resilience": {"requests_per_second": 0}}
+    best = {name: float("inf") for name in STAGES}
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        for _ in range(repeat):
+            timings, details = run_stages(text, VOICES[language], config, output_dir)
+            for name in STAGES:
+                best[name] = min(best[name], timings[name])
+        peaks = measure_peak_memory(text, VOICES[language], config, output_dir)
+
+    total = sum(best.values())
+    return {
+        "language": language,
+        "size": size,
+        "sentences": SIZES[size],
+        "chars": len(text),
+        **details,
+        "stages": {
+            name: {"seconds": best[name], "peak_bytes": peaks[name]} for name in STAGES
+        },
+        "end_to_end_seconds": total,
+        "words_per_second": details["words"] / total if total else 0.0,
+        "peak_bytes": peaks["overall"]
+    }
+
+
+def git_revision():
+    """Return the current git commit hash, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    """Print the end-to-end time of each case relative to a previous run."""
+    with open(previous_path, "r", encoding="utf-8") as f:
+        previous = {(r["language"], r["size"]): r for r in json.load(f)["results"]}
+
+    print(f"\nCompared with {previous_path}:")
+    for result in results:
+        before = previous.get((result["language"], result["size"]))
+        if before:
+            ratio = result["end_to_end_seconds"] / before["end_to_end_seconds"]
+            print(f"{result['language']:>3} {result['size']:<10} {ratio:6.2f}x time "
+                  f"({before['end_to_end_seconds'] * 1000:.1f} -> {result['end_to_end_seconds'] * 1000:.1f} ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default=",".join(SIZES))
+    parser.add_argument("--languages", default="en,cjk")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="JSON results path. Defaults to benchmarks/results/pipeline-<time>.json.")
+    parser.add_argument("--compare", help="Previous JSON results to compare against.")
+    args = parser.parse_args()
+
+    results = []
+    for language in args.languages.split(","):
+        for size in args.sizes.split(","):
+            result = benchmark(language, size, args.repeat)
+            results.append(result)
+            stages = "  ".join(
+                f"{name} {result['stages'][name]['seconds'] * 1000:.1f}" for name in STAGES)
+            print(f"{language:>3} {size:<10} {result['words']:>7} words  "
+                  f"{result['words_per_second']:>9.0f} words/s  "
+                  f"peak {result['peak_bytes'] / 1024 / 1024:6.1f} MiB  [ms] {stages}")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results
+    }
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime("pipeline-%Y%m%d-%H%M%S.json"))
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark the vectorized segmentation engine against the per-word path.
+
+Also breaks generate_srt down into its stages and writes every subtitle
+format, once in a single segmentation pass and once with a pass per format.
+
+On 100k words the vectorized engine segments 1.6-2x faster than the
+per-word builder, but generate_srt as a whole is about as fast on either
+path: segmentation is under a fifth of it. Formatting the cue timestamps
+and building the cue text (joining the words and fixing its spacing) take
+about three quarters, and both engines share that work. The
+per-word builder stays because streams of word boundaries cannot be
+segmented in arrays; complete lists take the vectorized engine.
+
+Usage:
+    python -m benchmarks.bench_segmentation [--words 100000] [--repeat 3]
+"""
+import argparse
+import io
+import random
+import time
+from app.services.subtitle import SubtitleService
+from app.services.segmentation import WordArrays, find_segments
+from app.services.subtitle_writers import SUBTITLE_FORMATS
+from app.services.timing import WordBoundary
+from app.utils.text_to_srt import ticks_to_srt
+
+WORDS = [
+    "the", "quick", "brown", "fox", "jumps", "over", "lazy", "dog.", "and", "however,",
+    "subtitles", "should", "stay", "readable;", "then", "我們", "今天", "學習。", "但是", "world!"
+]
+
+
+def make_word_boundaries(count, seed=0):
+    """Generate synthetic word boundaries with realistic timing and pauses."""
+    rng = random.Random(seed)
+    word_boundaries = []
+    offset = 500000
+    for _ in range(count):
+        duration = rng.randint(1500000, 5000000)
+        word_boundaries.append(WordBoundary(rng.choice(WORDS), offset, duration))
+        offset += duration + rng.choice([0, 0, 0, 500000, 6000000])
+    return word_boundaries
+
+
+def best_of(repeat, func):
+    """Return the best wall-clock time of several runs and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def generate_srt_stages(service, word_boundaries, max_line_length):
+    """
+    Run the stages of generate_srt on the vectorized path one after the other.
+
+    Returns:
+        tuple: (dict of stage name to seconds, SRT content)
+    """
+    times = {}
+    start = time.perf_counter()
+    cleaned = service._clean_word_boundaries(word_boundaries, True)
+    times["clean words"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    words = WordArrays.from_boundaries(cleaned)
+    ranges = find_segments(words, max_line_length)
+    times["segment"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    texts = [service._fix_spacing(" ".join(words.texts[first:end]), True).strip() for first, end in ranges]
+    times["cue text"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    starts, ends = words.spans()
+    starts, ends = starts.tolist(), ends.tolist()
+    srt = "".join(ticks_to_srt(index, text, starts[first], ends[end - 1])
+                  for index, (text, (first, end)) in enumerate(zip(texts, ranges), 1))
+    times["timestamps"] = time.perf_counter() - start
+    return times, srt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--words", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-line-length", type=int, default=40)
+    args = parser.parse_args()
+
+    service = SubtitleService({})
+    word_boundaries = make_word_boundaries(args.words)
+    cleaned = service._clean_word_boundaries(word_boundaries, True)
+
+    per_word, segments = best_of(
+        args.repeat, lambda: service._create_segments(cleaned, args.max_line_length))
+    vectorized, ranges = best_of(
+        args.repeat, lambda: find_segments(WordArrays.from_boundaries(cleaned), args.max_line_length))
+    assert [len(s["words"]) for s in segments] == [end - start for start, end in ranges]
+
+    streaming, srt_streaming = best_of(
+        args.repeat, lambda: "".join(service.iter_srt(iter(word_boundaries), args.max_line_length)))
+    batch, srt_batch = best_of(
+        args.repeat, lambda: service.generate_srt(word_boundaries, args.max_line_length))
+    assert srt_streaming == srt_batch
+    stages, srt_stages = min((generate_srt_stages(service, word_boundaries, args.max_line_length)
+                              for _ in range(args.repeat)), key=lambda run: sum(run[0].values()))
+    assert srt_stages == srt_batch
+
+    def single_pass():
+        outputs = {subtitle_format: io.StringIO() for subtitle_format in SUBTITLE_FORMATS}
+        service.write_subtitles(word_boundaries, outputs, args.max_line_length)
+        return {subtitle_format: output.getvalue() for subtitle_format, output in outputs.items()}
+
+    shared, files_shared = best_of(args.repeat, single_pass)
+    per_format, files_per_format = best_of(args.repeat, lambda: {
+        subtitle_format: "".join(service.iter_subtitles(word_boundaries, subtitle_format, args.max_line_length))
+        for subtitle_format in SUBTITLE_FORMATS
+    })
+    assert files_shared == files_per_format and files_shared["srt"] == srt_batch
+
+    print(f"{args.words} words, {len(ranges)} segments")
+    print(f"segmentation  per-word {per_word * 1000:8.1f} ms   vectorized {vectorized * 1000:8.1f} ms"
+          f"   speedup {per_word / vectorized:5.1f}x")
+    print(f"generate_srt  per-word {streaming * 1000:8.1f} ms   vectorized {batch * 1000:8.1f} ms"
+          f"   speedup {streaming / batch:5.1f}x")
+    total = sum(stages.values())
+    print("generate_srt stages  " + "   ".join(
+        f"{name} {seconds * 1000:.1f} ms ({seconds / total:.0%})" for name, seconds in stages.items()))
+    print(f"{len(SUBTITLE_FORMATS)} formats     per-format {per_format * 1000:6.1f} ms   single pass {shared * 1000:6.1f} ms"
+          f"   speedup {per_format / shared:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
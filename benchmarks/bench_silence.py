@@ -0,0 +1,76 @@
+"""
+Benchmark silence trimming on a long render.
+
+Trims synthetic 24 kHz speech (words with short gaps and long pauses
+between sentences) in the blocks the decoder pipe delivers, and moves the
+word boundaries onto the trimmed timeline. Reports the realtime factor of
+trimming, the audio removed and the time to rewrite the boundaries. Does
+not need ffmpeg.
+
+Usage:
+    python -m benchmarks.bench_silence [--minutes 60] [--max-silence-ms 400]
+"""
+import argparse
+import time
+import numpy as np
+from app.services.audio import DEFAULT_SAMPLE_RATE, PCM_BLOCK_SIZE
+from app.services.silence import SilenceTrimmer
+from app.services.timing import TICKS_PER_SECOND, WordBoundary
+
+
+def make_speech(minutes, sample_rate, seed=0):
+    """
+    Generate noisy speech-like PCM and its word boundaries.
+
+    Args:
+        minutes: Length of the audio
+        sample_rate: Sample rate in Hz
+        seed: Random seed
+
+    Returns:
+        tuple: (PCM bytes, list of WordBoundary)
+    """
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * sample_rate)
+    pcm = rng.integers(-20, 20, total, dtype=np.int16)
+    word_boundaries = []
+    position = sample_rate // 2
+    while True:
+        word = int(rng.integers(sample_rate // 6, sample_rate // 2))
+        if position + word > total:
+            break
+        pcm[position:position + word] = rng.integers(-8000, 8000, word, dtype=np.int16)
+        word_boundaries.append(WordBoundary(
+            "word", position * TICKS_PER_SECOND // sample_rate, word * TICKS_PER_SECOND // sample_rate))
+        # Mostly short gaps, sometimes a sentence pause
+        gap = sample_rate * (1.5 if rng.random() < 0.1 else 0.05)
+        position += word + int(gap)
+    return pcm.astype("<i2").tobytes(), word_boundaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=60)
+    parser.add_argument("--max-silence-ms", type=int, default=400)
+    args = parser.parse_args()
+
+    pcm, word_boundaries = make_speech(args.minutes, DEFAULT_SAMPLE_RATE)
+    audio_seconds = len(pcm) / 2 / DEFAULT_SAMPLE_RATE
+    print(f"{audio_seconds / 60:.1f} min of audio, {len(word_boundaries)} words")
+
+    trimmer = SilenceTrimmer(DEFAULT_SAMPLE_RATE, args.max_silence_ms * 10000)
+    start = time.perf_counter()
+    trimmed = sum(len(trimmer.process(pcm[i:i + PCM_BLOCK_SIZE])) for i in range(0, len(pcm), PCM_BLOCK_SIZE))
+    trimmed += len(trimmer.flush())
+    wall = time.perf_counter() - start
+    print(f"trim     {wall:8.3f} s  {audio_seconds / wall:10.0f}x realtime  "
+          f"{trimmer.removed_ticks() / TICKS_PER_SECOND:.1f} s removed")
+    assert trimmed == len(pcm) - trimmer.removed_ticks() * DEFAULT_SAMPLE_RATE // TICKS_PER_SECOND * 2
+
+    start = time.perf_counter()
+    rewritten = trimmer.rewrite(word_boundaries)
+    print(f"rewrite  {time.perf_counter() - start:8.3f} s  {len(rewritten)} word boundaries")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Local Edge TTS stand-in server for tests and benchmarks.
+
+Not part of the application: bench_edge_pool and tests/test_edge_pool.py
+run the Edge backend against it without network access.
+"""
+import re
+import json
+import asyncio
+from xml.sax.saxutils import escape, unescape
+from aiohttp import web, WSMsgType
+from app.services.backends.fake import FakeCommunicate
+
+SSML_PROSODY_PATTERN = re.compile(r"<prosody[^>]*rate='([+-]\d+)%'[^>]*>(.*?)</prosody>", re.S)
+
+
+class EdgeStandInServer:
+    """
+    Local WebSocket server speaking the Edge TTS protocol.
+
+    Answers SSML requests with the silent audio and word boundaries of
+    FakeCommunicate, so the Edge TTS client and its connection pool can be
+    tested and benchmarked offline. A handshake delay emulates the TLS and
+    WebSocket setup cost of the real service, and idle connections can be
+    dropped like the service does.
+
+    Point the Edge backend at it with ``edge_url = server.url``.
+    """
+
+    def __init__(self, handshake_delay=0.0, idle_timeout=None, host="127.0.0.1"):
+        """
+        Initialize the server.
+
+        Args:
+            handshake_delay: Seconds to wait before accepting a connection
+            idle_timeout: Seconds after which an idle connection is closed, or None
+            host: Interface to listen on
+        """
+        self.handshake_delay = handshake_delay
+        self.idle_timeout = idle_timeout
+        self.host = host
+        self.connections = 0
+        self.requests = 0
+        self.url = None
+        self._runner = None
+        self._websockets = set()
+
+    async def start(self):
+        """
+        Start listening on a free port.
+
+        Returns:
+            str: URL to use as ``edge_url``
+        """
+        app = web.Application()
+        app.router.add_get("/edge", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.host, 0).start()
+        port = self._runner.addresses[0][1]
+        self.url = f"ws://{self.host}:{port}/edge?TrustedClientToken=stand-in"
+        return self.url
+
+    async def stop(self):
+        """Close all connections and stop the server."""
+        for websocket in list(self._websockets):
+            await websocket.close()
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+    async def _handle(self, request):
+        """Serve one WebSocket connection until the client closes it."""
+        await asyncio.sleep(self.handshake_delay)
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        self.connections += 1
+        self._websockets.add(websocket)
+
+        try:
+            while True:
+                try:
+                    received = await websocket.receive(timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                if received.type != WSMsgType.TEXT:
+                    break
+                headers, _, body = received.data.partition("\r\n\r\n")
+                if "Path:ssml" in headers:
+                    self.requests += 1
+                    await self._answer(websocket, body)
+        except ConnectionResetError:
+            # The client dropped the connection mid-turn
+            pass
+        finally:
+            self._websockets.discard(websocket)
+            await websocket.close()
+        return websocket
+
+    async def _answer(self, websocket, ssml):
+        """Send the audio, word boundaries and turn messages for one SSML request."""
+        match = SSML_PROSODY_PATTERN.search(ssml)
+        rate, text = (int(match.group(1)), unescape(match.group(2))) if match else (0, "")
+
+        await websocket.send_str(_text_message("turn.start", "{}"))
+        async for item in FakeCommunicate(text, None, rate).stream():
+            if item["type"] == "audio":
+                header = b"Content-Type:audio/mpeg\r\nPath:audio\r\n"
+                await websocket.send_bytes(len(header).to_bytes(2, "big") + header + item["data"])
+            else:
+                boundary = item["boundary"]
+                await websocket.send_str(_text_message("audio.metadata", json.dumps({
+                    "Metadata": [{
+                        "Type": "WordBoundary",
+                        "Data": {
+                            "Offset": boundary.offset,
+                            "Duration": boundary.duration,
+                            "text": {"Text": escape(boundary.text), "BoundaryType": "WordBoundary"}
+                        }
+                    }]
+                })))
+        await websocket.send_str(_text_message("turn.end", "{}"))
+
+
+def _text_message(path, body):
+    """Format a text message of the Edge TTS protocol."""
+    return f"Content-Type:application/json; charset=utf-8\r\nPath:{path}\r\n\r\n{body}"
@@ -0,0 +1,29 @@
+import asyncio
+import threading
+import pytest
+from app.services.backends import BACKENDS, register_backend
+from app.services.backends.fake import FakeBackend, FakeCommunicate
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Register a "gated" backend whose sentences wait until the event is set."""
+    release = threading.Event()
+
+    class GatedCommunicate(FakeCommunicate):
+        async def stream(self):
+            while not release.is_set():
+                await asyncio.sleep(0.01)
+            async for item in super().stream():
+                yield item
+
+    class GatedBackend(FakeBackend):
+        name = "gated"
+
+        def communicate(self, text, voice_name, rate, pitch, volume):
+            return GatedCommunicate(text, voice_name, rate)
+
+    monkeypatch.setitem(BACKENDS, "gated", GatedBackend)
+    register_backend(GatedBackend)
+    yield release
+    release.set()
@@ -0,0 +1,54 @@
+from app.services.alignment import OriginalTextAligner, tokenize_original_text
+from app.services.subtitle import SubtitleService
+from app.services.timing import WordBoundary
+
+
+def make_word_boundaries(words):
+    return [WordBoundary(word, i * 1000000, 1000000) for i, word in enumerate(words)]
+
+
+def align(words, original_text):
+    return SubtitleService({})._align_with_original_text(make_word_boundaries(words), original_text)
+
+
+def test_tokenize_attaches_punctuation():
+    texts, cores = tokenize_original_text("«Hello», world! 你好，世界。")
+
+    assert texts == ["«Hello»,", "world!", "你", "好，", "世", "界。"]
+    assert cores == ["hello", "world", "你", "好", "世", "界"]
+
+
+def test_align_cjk_words_span_several_characters():
+    aligned = align(["你好", "世界", "再見"], "你好，世界！再見。")
+
+    assert [wb.text for wb in aligned] == ["你好，", "世界！", "再見。"]
+
+
+def test_align_resyncs_after_numbers_read_out():
+    aligned = align(["I", "paid", "one", "hundred", "dollars", "today"], "I paid 100 dollars, today.")
+
+    assert [wb.text for wb in aligned] == ["I", "paid", "100", "dollars,", "today."]
+    assert aligned[2].offset == 2000000
+    assert aligned[2].duration == 2000000
+
+
+def test_align_attaches_symbols_to_previous_word():
+    aligned = align(["see", "the", "notes"], "See § the notes.")
+
+    assert [wb.text for wb in aligned] == ["See§", "the", "notes."]
+
+
+def test_align_falls_back_to_position_without_match():
+    aligner = OriginalTextAligner("alpha beta gamma", window=1)
+    aligned = []
+    for wb in make_word_boundaries(["x", "y", "z"]):
+        aligned.extend(aligner.align(wb))
+    aligned.extend(aligner.flush())
+
+    assert [wb.text for wb in aligned] == ["alpha", "beta", "gamma"]
+
+
+def test_align_keeps_unspoken_words_with_next_spoken_word():
+    aligned = align(["chapter", "begins"], "Chapter IV begins.")
+
+    assert [wb.text for wb in aligned] == ["Chapter", "IV begins."]
@@ -0,0 +1,156 @@
+import asyncio
+import time
+import urllib.error
+import urllib.request
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+from app.api.server import create_app, start_media_server
+from app.services.backends.fake import SILENT_FRAME
+from app.services.jobs import JobQueue
+
+BODY = {"text": "Hello there. Second sentence.", "voice": "en-US", "rate": 10}
+
+
+def run_with_client(test, tmp_path, backend="fake", api=None, subtitles=None):
+    """Run an async test body against the API served with a job queue in tmp_path."""
+    config = {
+        "TTS_BACKEND": backend,
+        "cache": {"enabled": False},
+        "voices": {"en-US": {"name": "en-US-JennyNeural"}},
+        "api": api or {},
+        "subtitles": subtitles or {}
+    }
+    queue = JobQueue(config, str(tmp_path / "jobs.sqlite3"), workers=1, poll_seconds=0.05,
+                     output_root=str(tmp_path / "task"))
+
+    async def run():
+        async with TestClient(TestServer(create_app(config, queue))) as client:
+            return await test(client)
+
+    return asyncio.run(run())
+
+
+async def wait_for_job(client, job_id, timeout=10):
+    """Poll a job until it is no longer queued or running."""
+    for _ in range(int(timeout / 0.02)):
+        job = await (await client.get(f"/jobs/{job_id}")).json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        await asyncio.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_submit_poll_and_download(tmp_path):
+    async def test(client):
+        response = await client.post("/jobs", json=BODY)
+        assert response.status == 202
+        job = await response.json()
+        assert response.headers["Location"] == f"/jobs/{job['id']}"
+
+        job = await wait_for_job(client, job["id"])
+        assert job["status"] == "succeeded", job["error"]
+
+        audio = await client.get(job["audio"])
+        audio_bytes = await audio.read()
+        partial = await client.get(job["audio"], headers={"Range": "bytes=0-143"})
+        srt = await client.get(job["srt"])
+        return audio.headers, audio_bytes, partial.status, await partial.read(), await srt.text()
+
+    headers, audio, partial_status, partial, srt = run_with_client(test, tmp_path)
+
+    assert headers["Content-Type"] == "audio/mpeg"
+    assert audio and len(audio) % len(SILENT_FRAME) == 0
+    assert partial_status == 206
+    assert partial == SILENT_FRAME
+    assert srt.startswith("1\n00:00:00,")
+    assert "Second sentence." in srt
+
+
+def test_subtitle_formats_are_downloadable(tmp_path):
+    async def test(client):
+        job = await (await client.post("/jobs", json=BODY)).json()
+        job = await wait_for_job(client, job["id"])
+        vtt = await client.get(job["subtitles"]["vtt"])
+        missing = await client.get(f"/jobs/{job['id']}/subtitles/ass")
+        return job["subtitles"], vtt.headers["Content-Type"], await vtt.text(), missing.status
+
+    links, content_type, vtt, missing_status = run_with_client(test, tmp_path, subtitles={"formats": ["vtt"]})
+
+    assert sorted(links) == ["srt", "vtt"]
+    assert content_type == "text/vtt; charset=utf-8"
+    assert vtt.startswith("WEBVTT\n\n1\n00:00:00.")
+    assert missing_status == 404
+
+
+def test_invalid_and_oversized_requests_are_rejected(tmp_path):
+    async def test(client):
+        statuses = []
+        for body in ({"voice": "en-US"}, {**BODY, "rate": 80}, {**BODY, "text": "x" * 2048}):
+            statuses.append((await client.post("/jobs", json=body)).status)
+        missing = await client.get("/jobs/unknown")
+        return statuses, missing.status, await missing.json()
+
+    statuses, missing_status, missing = run_with_client(test, tmp_path, api={"max_body_kb": 1})
+
+    assert statuses == [400, 400, 413]
+    assert missing_status == 404
+    assert missing == {"error": "Job not found"}
+
+
+def test_full_queue_answers_503_and_jobs_can_be_cancelled(tmp_path, gate):
+    async def test(client):
+        first = await (await client.post("/jobs", json=BODY)).json()
+        rejected = await client.post("/jobs", json=BODY)
+        cancelled = await client.delete(f"/jobs/{first['id']}")
+        gate.set()
+        job = await wait_for_job(client, first["id"])
+        download = await client.get(f"/jobs/{first['id']}/audio")
+        return rejected, cancelled.status, job, download.status
+
+    rejected, cancel_status, job, download_status = run_with_client(
+        test, tmp_path, backend="gated", api={"max_pending_jobs": 1})
+
+    assert rejected.status == 503
+    assert rejected.headers["Retry-After"]
+    assert cancel_status == 200
+    assert job["status"] == "cancelled"
+    assert download_status == 409
+
+
+def test_speech_streams_audio(tmp_path):
+    async def test(client):
+        response = await client.post("/speech", json=BODY)
+        return response.status, response.headers, await response.read()
+
+    status, headers, audio = run_with_client(test, tmp_path)
+
+    assert status == 200
+    assert headers["Content-Type"] == "audio/mpeg"
+    assert headers.get("Transfer-Encoding") == "chunked"
+    assert audio and len(audio) % len(SILENT_FRAME) == 0
+
+
+def test_media_server_streams_job_files_from_a_background_thread(tmp_path):
+    queue = JobQueue({"TTS_BACKEND": "fake", "cache": {"enabled": False}}, str(tmp_path / "jobs.sqlite3"),
+                     workers=1, poll_seconds=0.05, output_root=str(tmp_path / "task"))
+    queue.start()
+    try:
+        job_id = queue.submit({"text": "Hello there.", "voice_name": "en-US-JennyNeural",
+                               "rate": 0, "pitch": 0, "volume": 0})
+        for _ in range(500):
+            if queue.get(job_id)["status"] == "succeeded":
+                break
+            time.sleep(0.02)
+        port = start_media_server(queue)
+        base = f"http://127.0.0.1:{port}"
+
+        request = urllib.request.Request(f"{base}/jobs/{job_id}/audio", headers={"Range": "bytes=0-143"})
+        with urllib.request.urlopen(request) as response:
+            assert response.status == 206
+            assert response.read() == SILENT_FRAME
+        # Only the file routes are served
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(urllib.request.Request(f"{base}/jobs", data=b"{}", method="POST"))
+        assert error.value.code in (404, 405)
+    finally:
+        queue.close()
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import os
+import shutil
+import sys
+import types
+import wave
+import numpy as np
+import pytest
+from app.services.audio import AudioEncoder
+from app.services.backends import BACKENDS, TTSBackend, register_backend
+from app.services.backends.espeak import pcm_to_wav
+from app.services.subtitle import SubtitleService
+from app.services.timing import WordBoundary
+from app.services.voice import VoiceService
+
+# Copies stdin to the output path (the last argument) and logs every
+# invocation. Decoding to "pipe:1" only strips the WAV header.
+FAKE_FFMPEG = """
+import json, os, sys
+with open(os.path.join(os.path.dirname(sys.argv[0]), "calls.jsonl"), "a") as log:
+    log.write(json.dumps(sys.argv[1:]) + "\\n")
+data = sys.stdin.buffer.read()
+if b"fail" in data:
+    sys.stderr.write("Invalid data found when processing input")
+    sys.exit(1)
+if sys.argv[-1] == "pipe:1":
+    sys.stdout.buffer.write(data[44:] if data[:4] == b"RIFF" else data)
+else:
+    with open(sys.argv[-1], "wb") as f:
+        f.write(data)
+"""
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Uses a script as the ffmpeg executable")
+
+
+@pytest.fixture
+def ffmpeg(tmp_path):
+    script = tmp_path / "bin" / "ffmpeg"
+    script.parent.mkdir()
+    script.write_text(f"#!{sys.executable}\n{FAKE_FFMPEG}")
+    os.chmod(script, 0o755)
+
+    def calls():
+        with open(script.parent / "calls.jsonl") as f:
+            return [json.loads(line) for line in f]
+
+    return types.SimpleNamespace(path=str(script), calls=calls)
+
+
+def test_command_selects_codec_filters_and_rate():
+    encoder = AudioEncoder("opus", ffmpeg_path="ffmpeg", loudnorm=True)
+
+    args = encoder.command("mp3", "out/audio.opus")
+
+    assert args[args.index("-i") - 2:args.index("-i") + 2] == ["-f", "mp3", "-i", "pipe:0"]
+    assert args[args.index("-af") + 1] == "loudnorm=I=-16.0:TP=-1.5:LRA=11.0"
+    # loudnorm upsamples to 192 kHz, so the output rate is set explicitly
+    assert args[args.index("-ar") + 1] == "24000"
+    assert args[args.index("-c:a") + 1] == "libopus"
+    assert args[args.index("-b:a") + 1] == "32k"
+    assert args[-3:] == ["-f", "ogg", "out/audio.opus"]
+
+    wav = AudioEncoder("wav", ffmpeg_path="ffmpeg", sample_rate=16000).command("mp3", "audio.wav")
+    assert "-b:a" not in wav and "-af" not in wav
+    assert wav[wav.index("-ar") + 1] == "16000"
+
+
+def test_encoder_is_configured_by_the_audio_table():
+    assert AudioEncoder.from_config({}) is None
+    assert AudioEncoder.from_config({"audio": {"format": ""}}) is None
+
+    encoder = AudioEncoder.from_config({"ffmpeg_path": "/opt/ffmpeg", "audio": {"format": "m4a", "bitrate": "96k"}})
+    assert encoder.executable() == "/opt/ffmpeg"
+    assert encoder.bitrate == "96k"
+    with pytest.raises(ValueError):
+        AudioEncoder.from_config({"audio": {"format": "flac"}})
+
+
+def test_chunks_are_encoded_through_a_single_pipe(ffmpeg, tmp_path):
+    config = {"TTS_BACKEND": "fake", "edge_chunk_chars": 40, "ffmpeg_path": ffmpeg.path,
+              "audio": {"format": "mp3", "loudnorm": True}}
+    service = VoiceService(config)
+    text = "The quick brown fox jumps over the lazy dog. " * 6
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+
+    audio_file, _ = service.synthesize_incremental(text, "en-US-JennyNeural", 0, 0, 0, str(output_dir))
+
+    assert audio_file == str(output_dir / "audio.mp3")
+    # Every chunk went through one ffmpeg process; the backend's audio is kept for --previous
+    assert len(ffmpeg.calls()) == 1
+    assert (output_dir / "audio.mp3").read_bytes() == (output_dir / "output.mp3").read_bytes()
+
+    streamed_dir = tmp_path / "streamed"
+    streamed_dir.mkdir()
+    audio_file, _ = service.synthesize(text, "en-US-JennyNeural", 0, 0, 0, str(streamed_dir))
+    assert (streamed_dir / "audio.mp3").read_bytes() == (streamed_dir / "output.mp3").read_bytes()
+    assert len(ffmpeg.calls()) == 2
+
+
+def test_ffmpeg_errors_are_raised(ffmpeg, tmp_path):
+    encoder = AudioEncoder("wav", ffmpeg_path=ffmpeg.path)
+
+    with pytest.raises(RuntimeError, match="Invalid data"):
+        asyncio.run(encoder.encode("mp3", [b"fail"], str(tmp_path), []))
+
+
+def register_tone_backend(monkeypatch):
+    """Register a backend speaking two 0.5 s tones as 24 kHz WAV, with 0.3 s of silence around them and 2 s between."""
+    class ToneBackend(TTSBackend):
+        name = "tone"
+        display_name = "Tone"
+        audio_format = "wav"
+        streaming = False
+
+        async def synthesize(self, text, voice_name, rate, pitch, volume):
+            tone = np.full(12000, 8000, dtype="<i2")
+            silence = np.zeros(7200, dtype="<i2")
+            pause = np.zeros(48000, dtype="<i2")
+            pcm = np.concatenate([silence, tone, pause, tone, silence])
+            return pcm_to_wav(pcm.tobytes(), 24000), [WordBoundary("Hello", 3000000, 5000000), WordBoundary("world.", 28000000, 5000000)]
+
+    monkeypatch.setitem(BACKENDS, "tone", ToneBackend)
+    register_backend(ToneBackend)
+
+
+def test_silence_trimming_keeps_subtitles_in_sync(ffmpeg, tmp_path, monkeypatch):
+    register_tone_backend(monkeypatch)
+    service = VoiceService({"TTS_BACKEND": "tone", "ffmpeg_path": ffmpeg.path,
+                            "audio": {"format": "wav", "trim_silence": True, "max_silence_ms": 400}})
+
+    audio_file, word_boundaries = service.synthesize("Hello world.", "voice", 0, 0, 0, str(tmp_path))
+
+    # The 2 s pause is shortened to 0.4 s; the 0.3 s of leading and trailing silence are kept
+    assert os.path.getsize(audio_file) == os.path.getsize(tmp_path / "output.wav") - 44 - 1.6 * 24000 * 2
+    assert word_boundaries == [WordBoundary("Hello", 3000000, 5000000), WordBoundary("world.", 12000000, 5000000)]
+    # The subtitle ends where the second tone ends in the trimmed audio
+    assert "00:00:00,300 --> 00:00:01,700" in SubtitleService({}).generate_srt(word_boundaries, 40)
+    # One decoder and one encoder, started together
+    assert sorted(call[-1] for call in ffmpeg.calls()) == [audio_file, "pipe:1"]
+
+
+def test_silence_trimming_needs_an_output_format():
+    with pytest.raises(ValueError):
+        AudioEncoder.from_config({"audio": {"trim_silence": True}})
+    with pytest.raises(ValueError):
+        AudioEncoder("wav", sample_rate=22051, trim_silence=True)
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg is not installed")
+def test_fake_audio_is_encoded_by_ffmpeg(tmp_path):
+    service = VoiceService({"TTS_BACKEND": "fake", "audio": {"format": "wav", "sample_rate": 16000}})
+
+    audio_file, word_boundaries = service.synthesize(
+        "Hello there, world.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    with wave.open(audio_file) as wav:
+        assert wav.getframerate() == 16000
+        assert wav.getnframes() / 16000 * 10000000 >= word_boundaries[-1].end
+
+
+@pytest.mark.skipif(not shutil.which("ffmpeg"), reason="ffmpeg is not installed")
+def test_silence_is_trimmed_through_ffmpeg(tmp_path, monkeypatch):
+    register_tone_backend(monkeypatch)
+    service = VoiceService({"TTS_BACKEND": "tone", "audio": {"format": "wav", "trim_silence": True}})
+
+    audio_file, word_boundaries = service.synthesize("Hello world.", "voice", 0, 0, 0, str(tmp_path))
+
+    with wave.open(audio_file) as wav:
+        assert wav.getnframes() == 3.6 * 24000 - 1.6 * 24000
+    assert word_boundaries[1].offset == 12000000
@@ -0,0 +1,307 @@
+import asyncio
+import concurrent.futures
+import os
+import sys
+import time
+import types
+import wave
+import threading
+from datetime import timedelta
+import pytest
+import azure.cognitiveservices.speech as speechsdk
+from app.services.backends import BACKENDS, TTSBackend, create_backend, register_backend
+from app.services.backends.azure import AzureBackend, word_boundary
+from app.services.backends.azure_pool import AzureSynthesizerPool
+from app.services.backends.edge import EdgeBackend
+from app.services.backends.espeak import EspeakBackend
+from app.services.backends.fake import FakeCommunicate
+from app.services.timing import WordBoundary
+from app.services.voice import VoiceService
+
+FAKE_ESPEAK = """
+import struct, sys
+text = sys.stdin.buffer.read().decode("utf-8")
+rate = 22050
+# 0.1 s silence, 0.05 s of tone per character, 0.1 s silence
+pcm = bytes(4410) + struct.pack("<h", 8000) * int(rate * 0.05 * len(text.strip())) + bytes(4410)
+# Streamed WAV: chunk sizes are left as placeholders like espeak-ng does
+header = b"RIFF" + struct.pack("<I", 0x7ffff024) + b"WAVE"
+header += b"fmt " + struct.pack("<IHHIIHH", 16, 1, 1, rate, rate * 2, 2, 16)
+header += b"data" + struct.pack("<I", 0x7ffff000)
+sys.stdout.buffer.write(header + pcm)
+"""
+
+
+def test_create_backend_by_name_and_import_path():
+    assert create_backend("fake", {}).name == "fake"
+    assert create_backend("app.services.backends.fake:FakeBackend", {}).name == "fake"
+    with pytest.raises(ValueError):
+        create_backend("missing", {})
+
+
+def test_registered_backend_is_used_by_voice_service(tmp_path, monkeypatch):
+    class EchoBackend(TTSBackend):
+        name = "echo"
+        display_name = "Echo"
+        audio_format = "raw"
+        streaming = False
+
+        async def synthesize(self, text, voice_name, rate, pitch, volume):
+            return text.encode(), [WordBoundary(text, 0, 10)]
+
+    # setitem first so the registration is undone after the test
+    monkeypatch.setitem(BACKENDS, "echo", EchoBackend)
+    register_backend(EchoBackend)
+    service = VoiceService({"TTS_BACKEND": "echo"})
+
+    audio_file, word_boundaries = service.synthesize("hi", "voice", 0, 0, 0, str(tmp_path))
+
+    assert audio_file.endswith("output.raw")
+    assert word_boundaries == [WordBoundary("hi", 0, 10)]
+
+
+@pytest.fixture
+def fake_speechsdk(monkeypatch):
+    """
+    Replace the Speech SDK objects used by the synthesizer pool.
+
+    Fake synthesizers speak every word of the SSML as one 4800-byte MP3
+    chunk (0.8 s) from a worker thread, like the SDK's callbacks.
+    """
+    sdk = types.SimpleNamespace(opened=[], closed=[], audio=types.SimpleNamespace())
+
+    class SpeechConfig:
+        def __init__(self, subscription, region):
+            self.speech_synthesis_voice_name = None
+
+        def set_speech_synthesis_output_format(self, output_format):
+            self.output_format = output_format
+
+    class Signal:
+        def __init__(self):
+            self.callbacks = []
+
+        def connect(self, callback):
+            self.callbacks.append(callback)
+
+        def disconnect_all(self):
+            self.callbacks = []
+
+    class SpeechSynthesizer:
+        def __init__(self, speech_config, audio_config):
+            self.voice = speech_config.speech_synthesis_voice_name
+            self.output = audio_config.stream.callback
+            self.synthesis_word_boundary = Signal()
+
+        def speak_ssml_async(self, ssml):
+            words = ssml.split("<prosody")[1].split(">", 1)[1].split("<")[0].split()
+            result = concurrent.futures.Future()
+
+            def speak():
+                try:
+                    for i, word in enumerate(words):
+                        for callback in self.synthesis_word_boundary.callbacks:
+                            # Like the SDK: offset in ticks, duration as a timedelta
+                            callback(types.SimpleNamespace(
+                                text=word, audio_offset=i * 8000000, duration=timedelta(milliseconds=700)))
+                        self.output.write(memoryview(b"\x00" * 4800))
+                except Exception as e:
+                    result.set_exception(e)
+                    return
+                result.set_result(types.SimpleNamespace(
+                    reason=speechsdk.ResultReason.SynthesizingAudioCompleted, cancellation_details=None))
+
+            threading.Thread(target=speak).start()
+            return types.SimpleNamespace(get=result.result)
+
+    class Connection:
+        def __init__(self, synthesizer):
+            self.synthesizer = synthesizer
+
+        @classmethod
+        def from_speech_synthesizer(cls, synthesizer):
+            return cls(synthesizer)
+
+        def open(self, for_continuous_recognition):
+            sdk.opened.append(self.synthesizer.voice)
+
+        def close(self):
+            sdk.closed.append(self.synthesizer.voice)
+
+    sdk.SpeechConfig = SpeechConfig
+    sdk.SpeechSynthesizer = SpeechSynthesizer
+    sdk.Connection = Connection
+    sdk.SpeechSynthesisOutputFormat = speechsdk.SpeechSynthesisOutputFormat
+    sdk.audio.PushAudioOutputStream = lambda callback: types.SimpleNamespace(callback=callback)
+    sdk.audio.AudioOutputConfig = lambda stream: types.SimpleNamespace(stream=stream)
+    monkeypatch.setattr("app.services.backends.azure_pool.speechsdk", sdk)
+    return sdk
+
+
+def test_azure_pool_reuses_warm_synthesizers_per_voice(fake_speechsdk):
+    pool = AzureSynthesizerPool("key", "region", size=2)
+    pool.warm_up(["en-US-JennyNeural"])
+    assert fake_speechsdk.opened == ["en-US-JennyNeural"]
+
+    with pool.synthesizer("en-US-JennyNeural") as first:
+        assert first.synthesizer.voice == "en-US-JennyNeural"
+    with pool.synthesizer("en-US-JennyNeural") as second:
+        assert second is first
+    with pool.synthesizer("zh-TW-HsiaoChenNeural"):
+        pass
+    # A third voice evicts the least recently used synthesizer
+    with pool.synthesizer("ja-JP-NanamiNeural"):
+        pass
+    with pool.synthesizer("zh-TW-HsiaoChenNeural"):
+        pass
+
+    assert pool.stats() == {"created": 3, "reused": 3, "idle": 2}
+    assert fake_speechsdk.closed == ["en-US-JennyNeural"]
+    with pytest.raises(RuntimeError):
+        with pool.synthesizer("zh-TW-HsiaoChenNeural"):
+            raise RuntimeError("synthesis failed")
+    # The failed synthesizer is not handed out again
+    assert pool.stats()["idle"] == 1
+    assert fake_speechsdk.closed == ["en-US-JennyNeural", "zh-TW-HsiaoChenNeural"]
+
+
+def test_shared_azure_pool_follows_the_configured_size(fake_speechsdk):
+    config = {"AZURE_KEY": "resize-key", "AZURE_REGION": "region", "azure_pool_size": 2}
+    pool = AzureSynthesizerPool.shared(config)
+    assert AzureSynthesizerPool.shared(config) is pool
+
+    with pool.synthesizer("en-US-JennyNeural"):
+        pool.warm_up(["zh-TW-HsiaoChenNeural"])
+        resized = AzureSynthesizerPool.shared({**config, "azure_pool_size": 3})
+        assert resized is not pool and resized.size == 3
+        # The idle synthesizer of the replaced pool is closed at once, the borrowed one on return
+        assert fake_speechsdk.closed == ["zh-TW-HsiaoChenNeural"]
+    assert fake_speechsdk.closed == ["zh-TW-HsiaoChenNeural", "en-US-JennyNeural"]
+    assert pool.stats()["idle"] == 0
+
+
+def test_azure_pool_is_bounded_across_threads(fake_speechsdk):
+    pool = AzureSynthesizerPool("key", "region", size=2)
+    lock = threading.Lock()
+    in_use = []
+    peak = []
+
+    def borrow():
+        with pool.synthesizer("en-US-JennyNeural") as synthesizer:
+            with lock:
+                in_use.append(synthesizer)
+                peak.append(len(in_use))
+            time.sleep(0.01)
+            with lock:
+                in_use.remove(synthesizer)
+
+    threads = [threading.Thread(target=borrow) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+    assert pool.stats()["created"] <= 2
+    assert pool.stats()["created"] + pool.stats()["reused"] == 8
+
+
+def test_azure_streams_audio_and_word_boundaries(fake_speechsdk, tmp_path):
+    service = VoiceService({"AZURE_KEY": "stream-key", "AZURE_REGION": "region"})
+
+    async def collect():
+        return [item async for item in service.stream_async("One two three.", "en-US-JennyNeural", 0, 0, 0)]
+
+    items = asyncio.run(collect())
+    audio_file, word_boundaries = service.synthesize(
+        "One two three.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    assert [item["type"] for item in items] == ["WordBoundary", "audio"] * 3
+    assert audio_file.endswith("output.mp3")
+    assert os.path.getsize(audio_file) == 3 * 4800
+    assert [wb.text for wb in word_boundaries] == ["One", "two", "three."]
+    # Offsets and durations are ticks, like every other backend
+    assert [(wb.offset, wb.duration) for wb in word_boundaries] == [
+        (0, 7000000), (8000000, 7000000), (16000000, 7000000)]
+    # Both requests ran on the same pooled synthesizer
+    assert service.backend_stats()["azure"]["created"] == 1
+
+
+def test_azure_word_boundary_event_is_converted_to_ticks():
+    evt = types.SimpleNamespace(text="Hello", audio_offset=12345678, duration=timedelta(milliseconds=512, microseconds=3))
+
+    assert word_boundary(evt) == WordBoundary("Hello", 12345678, 5120030)
+
+
+def test_edge_word_boundary_dicts_are_converted(monkeypatch):
+    class Communicate:
+        async def stream(self):
+            yield {"type": "WordBoundary", "text": "Hello", "offset": 1000000, "duration": 4000000}
+            yield {"type": "audio", "data": b"mp3"}
+            yield {"type": "WordBoundary", "boundary": WordBoundary("world", 5000000, 3000000)}
+
+    backend = EdgeBackend({"edge_pool_size": 0})
+    monkeypatch.setattr(backend, "communicate", lambda *args: Communicate())
+
+    async def collect():
+        return [item async for item in backend.stream("Hello world", "en-US-JennyNeural", 0, 0, 0)]
+
+    assert asyncio.run(collect()) == [
+        {"type": "WordBoundary", "boundary": WordBoundary("Hello", 1000000, 4000000)},
+        {"type": "audio", "data": b"mp3"},
+        {"type": "WordBoundary", "boundary": WordBoundary("world", 5000000, 3000000)},
+    ]
+
+
+def test_fake_engine_yields_word_boundary_records():
+    async def collect():
+        return [item async for item in FakeCommunicate("Hello world.", "en-US-JennyNeural").stream()]
+
+    boundaries = [item["boundary"] for item in asyncio.run(collect()) if item["type"] == "WordBoundary"]
+
+    assert [wb.text for wb in boundaries] == ["Hello", "world"]
+    assert all(isinstance(wb.offset, int) and isinstance(wb.duration, int) for wb in boundaries)
+    assert boundaries[0].end <= boundaries[1].offset
+
+
+def test_azure_failure_falls_back_to_edge(fake_speechsdk, tmp_path, monkeypatch):
+    def fail(*args):
+        raise RuntimeError("no connection")
+
+    monkeypatch.setattr(AzureBackend, "speak", fail)
+    # Edge TTS is replaced by the offline fake engine for this test
+    monkeypatch.setitem(BACKENDS, "edge", BACKENDS["fake"])
+    service = VoiceService({"AZURE_KEY": "key", "AZURE_REGION": "region",
+                            "resilience": {"backoff_base_seconds": 0}})
+
+    audio_file, word_boundaries = service.synthesize("Hello world.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    assert audio_file.endswith(".mp3")
+    assert [wb.text for wb in word_boundaries] == ["Hello", "world"]
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Uses a script as the espeak-ng executable")
+def test_espeak_backend_estimates_word_timings(tmp_path):
+    script = tmp_path / "espeak-ng"
+    script.write_text(f"#!{sys.executable}\n{FAKE_ESPEAK}")
+    os.chmod(script, 0o755)
+    service = VoiceService({"TTS_BACKEND": "espeak", "espeak_path": str(script)})
+
+    audio_file, word_boundaries = service.synthesize(
+        "Hello there, world. Next one.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    with wave.open(audio_file) as wav:
+        assert wav.getframerate() == 22050
+        duration_ticks = wav.getnframes() * 10000000 // 22050
+    assert [wb.text for wb in word_boundaries] == ["Hello", "there", "world", "Next", "one"]
+    # Words start after the leading silence and stay inside their sentence
+    assert word_boundaries[0].offset == 1000000
+    assert all(a.end <= b.offset for a, b in zip(word_boundaries, word_boundaries[1:]))
+    assert word_boundaries[-1].end <= duration_ticks
+
+
+def test_espeak_voice_mapping():
+    assert EspeakBackend.espeak_voice("en-US-JennyNeural") == "en-us"
+    assert EspeakBackend.espeak_voice("zh-TW-HsiaoChenNeural") == "cmn"
+    assert EspeakBackend.espeak_voice("ja-JP-NanamiNeural") == "ja"
+    assert EspeakBackend.espeak_voice("en-us+f3") == "en-us+f3"
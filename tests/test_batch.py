@@ -0,0 +1,69 @@
+import json
+import os
+import pytest
+import toml
+from app.cli import batch
+
+
+class FakeCommunicate:
+    """Stand-in for edge_tts.Communicate returning one word per 4800 audio bytes."""
+
+    def __init__(self, text, voice, rate, pitch, volume, boundary):
+        self.words = text.split()
+
+    async def stream(self):
+        for i, word in enumerate(self.words):
+            yield {"type": "WordBoundary", "text": word, "offset": i * 8000000, "duration": 7000000}
+            yield {"type": "audio", "data": b"\x00" * 4800}
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setattr("app.services.backends.edge.edge_tts.Communicate", FakeCommunicate)
+    config = toml.load("config.example.toml")
+    config["cache"] = {"enabled": False}
+    # Send requests through edge_tts.Communicate instead of the connection pool
+    config["edge_pool_size"] = 0
+    return config
+
+
+def test_batch_renders_every_file_and_voice_then_resumes(config, tmp_path):
+    texts = tmp_path / "texts"
+    texts.mkdir()
+    (texts / "intro.txt").write_text("Hello there.", encoding="utf-8")
+    (texts / "outro.txt").write_text("Goodbye now.", encoding="utf-8")
+    out = tmp_path / "out"
+
+    argv = [str(texts), "--lang", "en-US", "--lang", "en-US-GuyNeural", "--out", str(out)]
+    assert batch.main(argv, config) == 0
+
+    summary = json.loads((out / batch.SUMMARY_FILE).read_text(encoding="utf-8"))
+    assert summary["succeeded"] == 4
+    assert os.path.exists(out / "intro" / "en-US" / "output.srt")
+    assert os.path.exists(out / "outro" / "en-US-GuyNeural" / "output.mp3")
+
+    assert batch.main(argv, config) == 0
+    summary = json.loads((out / batch.SUMMARY_FILE).read_text(encoding="utf-8"))
+    assert summary["skipped"] == 4
+
+
+def test_batch_reads_jsonl_manifest(config, tmp_path):
+    (tmp_path / "a.txt").write_text("One two.", encoding="utf-8")
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text(
+        json.dumps({"text": "a.txt", "voice": "en-US", "rate": 10, "out": "custom"}) + "\n",
+        encoding="utf-8"
+    )
+
+    jobs = batch.load_jobs(str(manifest), None, config, str(tmp_path / "out"))
+
+    assert jobs == [{
+        "id": "custom",
+        "text_path": str(tmp_path / "a.txt"),
+        "voice_key": "en-US",
+        "voice_name": "en-US-JennyNeural",
+        "rate": 10,
+        "pitch": 0,
+        "volume": 0,
+        "output_dir": str(tmp_path / "out" / "custom")
+    }]
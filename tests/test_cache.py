@@ -0,0 +1,57 @@
+import os
+from app.services.cache import SynthesisCache
+from app.services.timing import WordBoundary
+
+
+def write_audio(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\x00" * size)
+    return str(path)
+
+
+def test_cache_key_depends_on_every_input():
+    base = SynthesisCache.make_key("Hi", "en-US-JennyNeural", 0, 0, 0, "edge")
+
+    assert base == SynthesisCache.make_key("Hi", "en-US-JennyNeural", 0, 0, 0, "edge")
+    assert base != SynthesisCache.make_key("Hi", "en-US-JennyNeural", 5, 0, 0, "edge")
+    assert base != SynthesisCache.make_key("Hi", "en-US-JennyNeural", 0, 0, 0, "azure")
+
+
+def test_cache_round_trip(tmp_path):
+    cache = SynthesisCache(str(tmp_path / "cache"))
+    boundaries = [WordBoundary("Hi", 0, 100)]
+    cache.put("abc123", write_audio(tmp_path / "output.mp3", 10), boundaries)
+
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    audio_file, cached_boundaries = cache.get("abc123", str(out_dir))
+
+    assert audio_file == os.path.join(str(out_dir), "output.mp3")
+    assert os.path.getsize(audio_file) == 10
+    assert cached_boundaries == boundaries
+    assert cache.get("missing", str(out_dir)) is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SynthesisCache(str(tmp_path / "cache"), max_bytes=2500)
+    audio = write_audio(tmp_path / "output.mp3", 1000)
+    cache.put("aa01", audio, [])
+    cache.put("aa02", audio, [])
+    # Age the second entry so it becomes the least recently used
+    os.utime(cache._meta_path("aa02"), (0, 0))
+    cache.put("aa03", audio, [])
+
+    assert cache.get("aa01", str(tmp_path)) is not None
+    assert cache.get("aa02", str(tmp_path)) is None
+    assert cache.get("aa03", str(tmp_path)) is not None
+    assert cache.stats()["entries"] == 2
+
+
+def test_entries_of_older_cache_versions_are_not_read(monkeypatch):
+    key = SynthesisCache.make_key("Hi", "en-US-JennyNeural", 0, 0, 0, "azure")
+    monkeypatch.setattr("app.services.cache.CACHE_VERSION", 2)
+
+    # Version 2 entries of Azure hold millisecond offsets
+    assert SynthesisCache.make_key("Hi", "en-US-JennyNeural", 0, 0, 0, "azure") != key
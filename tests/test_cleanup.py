@@ -0,0 +1,41 @@
+from app.services.cleanup import TextCleaner, MAX_CACHED_WORDS
+from app.services.subtitle import SubtitleService
+
+
+def test_clean_word():
+    cleaner = TextCleaner()
+
+    assert cleaner.clean_word("  hello\t world ", True) == "hello world"
+    assert cleaner.clean_word("«it's», well-known!", False) == "it's well-known"
+    assert cleaner.clean_word("你好。", True) == "你好。"
+    assert cleaner.clean_word("你好。", False) == "你好"
+    assert cleaner.clean_word(" ! ", False) == ""
+
+
+def test_clean_word_cache_is_bounded():
+    cleaner = TextCleaner()
+    for i in range(MAX_CACHED_WORDS + 10):
+        cleaner.clean_word(f"word{i}", True)
+
+    assert len(cleaner._words[True]) <= MAX_CACHED_WORDS
+    assert cleaner.clean_word("word5", True) == "word5"
+
+
+def test_fix_spacing():
+    cleaner = TextCleaner()
+
+    assert cleaner.fix_spacing("Hello ,world !", True) == "Hello, world!"
+    assert cleaner.fix_spacing('He said " hi ," then ( quietly ) left.', True) == \
+        'He said"hi,"then(quietly)left.'
+    assert cleaner.fix_spacing("a ,b ( c )", False) == "a ,b(c)"
+    assert cleaner.fix_spacing("", True) == ""
+
+
+def test_natural_break_point():
+    service = SubtitleService({})
+
+    assert service._is_natural_break_point("end.", "next")
+    assert service._is_natural_break_point("你好，", "世界")
+    assert service._is_natural_break_point("word", "However")
+    assert not service._is_natural_break_point("word", "next")
+    assert not service._is_natural_break_point("", "next")
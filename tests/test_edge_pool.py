@@ -0,0 +1,145 @@
+import asyncio
+import pytest
+from app.services.backends.edge import EdgeBackend
+from app.services.backends.edge_pool import EdgeConnectionPool
+from benchmarks.edge_standin import EdgeStandInServer
+from app.services.backends.fake import FakeCommunicate, SILENT_FRAME
+from app.services.timing import WordBoundary
+from app.services.voice import VoiceService
+
+VOICE = "en-US-JennyNeural"
+
+
+def run_with_server(test, **server_options):
+    """Run an async test body against a fresh stand-in server."""
+    async def run():
+        async with EdgeStandInServer(**server_options) as server:
+            return await test(server)
+
+    return asyncio.run(run())
+
+
+def test_pooled_requests_reuse_connections():
+    async def test(server):
+        backend = EdgeBackend({"edge_url": server.url, "edge_pool_size": 2})
+        try:
+            results = await asyncio.gather(*(
+                backend.synthesize(f"Request number {i}.", VOICE, 0, 0, 0) for i in range(8)))
+        finally:
+            await backend.aclose()
+        return results, backend.stats()
+
+    results, stats = run_with_server(test)
+
+    assert stats["requests"] == 8
+    assert stats["handshakes"] <= 2
+    assert stats["reused"] == 8 - stats["handshakes"]
+    assert stats["handshake_seconds"] > 0 and stats["synthesis_seconds"] > 0
+    expected = FakeCommunicate("Request number 3.", VOICE).word_boundaries()
+    audio, word_boundaries = results[3]
+    assert word_boundaries == expected
+    assert audio and len(audio) % len(SILENT_FRAME) == 0
+
+
+def test_connection_closed_by_server_is_replaced():
+    async def test(server):
+        backend = EdgeBackend({"edge_url": server.url, "edge_pool_size": 1})
+        try:
+            await backend.synthesize("First.", VOICE, 0, 0, 0)
+            # The server drops the idle connection; the client has not noticed yet
+            await asyncio.sleep(0.2)
+            _, word_boundaries = await backend.synthesize("Second one.", VOICE, 0, 0, 0)
+        finally:
+            await backend.aclose()
+        return word_boundaries, backend.stats(), server.connections
+
+    word_boundaries, stats, connections = run_with_server(test, idle_timeout=0.05)
+
+    assert [wb.text for wb in word_boundaries] == ["Second", "one"]
+    assert connections == 2
+    assert stats["handshakes"] == 2
+
+
+def test_stale_connections_are_recycled():
+    async def test(server):
+        backend = EdgeBackend({"edge_url": server.url, "edge_pool_size": 1, "edge_pool_max_age_seconds": 0})
+        try:
+            for text in ("One.", "Two.", "Three."):
+                await backend.synthesize(text, VOICE, 0, 0, 0)
+        finally:
+            await backend.aclose()
+        return backend.stats()
+
+    stats = run_with_server(test)
+
+    assert stats["handshakes"] == 3
+    assert stats["recycled"] == 2
+    assert stats["reused"] == 0
+
+
+def test_long_text_is_split_into_turns_on_one_timeline():
+    text = "word " * 1200  # 6000 bytes, more than one Edge request
+
+    async def test(server):
+        backend = EdgeBackend({"edge_url": server.url})
+        try:
+            audio, word_boundaries = await backend.synthesize(text, VOICE, 0, 0, 0)
+        finally:
+            await backend.aclose()
+        return audio, word_boundaries, server.requests
+
+    audio, word_boundaries, requests = run_with_server(test)
+
+    assert requests == 2
+    assert len(word_boundaries) == 1200
+    offsets = [wb.offset for wb in word_boundaries]
+    assert offsets == sorted(offsets)
+    assert offsets[-1] < len(audio) * 8 * 10000000 // 48000
+
+
+def test_voice_service_closes_pool_after_blocking_call(tmp_path):
+    async def start():
+        server = EdgeStandInServer()
+        await server.start()
+        return server
+
+    loop = asyncio.new_event_loop()
+    try:
+        server = loop.run_until_complete(start())
+        service = VoiceService({"TTS_BACKEND": "edge", "edge_url": server.url, "cache": {"enabled": False}})
+        # The blocking wrapper runs its own event loop in another thread here
+        future = loop.run_in_executor(
+            None, service.synthesize, "Hello there.", VOICE, 0, 0, 0, str(tmp_path))
+        _, word_boundaries = loop.run_until_complete(future)
+        stats = service.backend_stats()["edge"]
+        loop.run_until_complete(server.stop())
+    finally:
+        loop.close()
+
+    assert [wb.text for wb in word_boundaries] == ["Hello", "there"]
+    assert stats["handshakes"] == 1
+    assert stats["open_idle"] == 0
+
+
+def test_turn_is_not_retried_after_items_were_yielded():
+    class DroppingConnection:
+        async def synthesize(self, tts_config, escaped_text):
+            yield {"type": "WordBoundary", "boundary": WordBoundary("Hello", 0, 10)}
+            raise ConnectionError("closed")
+
+    class Pool(EdgeConnectionPool):
+        async def acquire(self):
+            # A reused connection, so a failure before any output would be retried
+            return DroppingConnection(), True
+
+        async def release(self, connection, reusable):
+            pass
+
+    async def test():
+        items = []
+        with pytest.raises(ConnectionError):
+            async for item in Pool().stream("Hello.", VOICE, "+0%", "+0Hz", "+0%"):
+                items.append(item)
+        return items
+
+    assert [item["boundary"].text for item in asyncio.run(test())] == ["Hello"]
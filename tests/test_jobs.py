@@ -0,0 +1,157 @@
+import json
+import os
+import time
+import uuid
+import pytest
+from app.services import jobs
+from app.services.jobs import JobQueue
+from app.services.voice import MANIFEST_FILE
+
+TEXT = "First sentence here. Second one follows. And a third."
+PARAMS = {"text": TEXT, "voice_name": "en-US-JennyNeural", "rate": 0, "pitch": 0, "volume": 0}
+
+
+def wait_for(queue, job_id, statuses, message=None, timeout=10):
+    """Poll a job until it reaches one of the statuses (and the message, if given)."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job["status"] in statuses and message in (None, job["message"]):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {job['status']}: {job['message']}")
+
+
+@pytest.fixture
+def make_queue(tmp_path):
+    queues = []
+
+    def make(backend="fake", workers=2, sentence_level=False):
+        config = {"TTS_BACKEND": backend, "cache": {"enabled": False}}
+        queue = JobQueue(config, str(tmp_path / "jobs.sqlite3"), workers, poll_seconds=0.05,
+                         output_root=str(tmp_path / "task"), sentence_level=sentence_level)
+        queue.start()
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.close()
+
+
+def test_job_runs_to_completion_with_outputs(make_queue):
+    queue = make_queue()
+
+    job_id = queue.submit(PARAMS)
+    job = wait_for(queue, job_id, {jobs.SUCCEEDED, jobs.FAILED})
+
+    assert job["status"] == jobs.SUCCEEDED, job["error"]
+    assert job["progress"] == 1.0
+    assert os.path.getsize(job["result"]["audio_file_path"]) > 0
+    with open(job["result"]["srt_file_path"], encoding="utf-8") as f:
+        assert "First sentence here." in f.read()
+    with open(job["result"]["word_boundaries_path"], encoding="utf-8") as f:
+        timing = json.load(f)
+    assert timing["text"] == TEXT
+    assert [wb["text"] for wb in timing["word_boundaries"]][:3] == ["First", "sentence", "here"]
+    assert job["started"] <= job["finished"]
+
+
+def test_whole_text_is_synthesized_without_sentence_manifest(make_queue, gate):
+    queue = make_queue("gated")
+
+    job_id = queue.submit(PARAMS)
+    wait_for(queue, job_id, {jobs.RUNNING}, "Synthesizing speech")
+    gate.set()
+    job = wait_for(queue, job_id, {jobs.SUCCEEDED})
+
+    assert not os.path.exists(os.path.join(job["result"]["output_dir"], MANIFEST_FILE))
+
+
+def test_progress_is_reported_per_sentence(make_queue, gate):
+    queue = make_queue("gated", sentence_level=True)
+
+    job_id = queue.submit(PARAMS)
+    job = wait_for(queue, job_id, {jobs.RUNNING}, "Synthesizing sentence 0/3")
+    assert job["progress"] == 0
+    gate.set()
+    job = wait_for(queue, job_id, {jobs.SUCCEEDED})
+
+    assert job["progress"] == 1.0
+
+
+def test_cancel_queued_and_running_jobs(make_queue, gate, tmp_path):
+    queue = make_queue("gated", workers=1)
+
+    running = queue.submit(PARAMS)
+    queued = queue.submit(PARAMS)
+    wait_for(queue, running, {jobs.RUNNING})
+
+    # The only worker is busy, so the second job is still waiting
+    assert queue.cancel(queued)
+    assert queue.get(queued)["status"] == jobs.CANCELLED
+
+    assert queue.cancel(running)
+    gate.set()
+    job = wait_for(queue, running, {jobs.CANCELLED, jobs.SUCCEEDED, jobs.FAILED})
+
+    assert job["status"] == jobs.CANCELLED
+    assert not os.path.exists(tmp_path / "task" / running)
+    assert not queue.cancel(running)
+
+
+def test_jobs_interrupted_by_a_restart_are_failed(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue({}, db_path)
+    job_id = queue.submit(PARAMS)
+    assert queue._claim()["id"] == job_id
+
+    live = queue.submit(PARAMS)
+    assert queue._claim()["id"] == live
+    queue._update(live, owner=f"{jobs.socket.gethostname()}:{os.getppid()}")
+    # The restarted process has the same pid but not the queue of the previous one
+    del queue
+
+    reopened = JobQueue({}, db_path)
+    job = reopened.get(job_id)
+
+    assert job["status"] == jobs.FAILED
+    assert job["error"] == "Interrupted by a restart"
+    # A job of another live process sharing the store keeps running
+    assert reopened.get(live)["status"] == jobs.RUNNING
+
+
+def test_a_second_queue_keeps_the_running_jobs_of_the_first(tmp_path):
+    db_path = str(tmp_path / "jobs.sqlite3")
+    queue = JobQueue({}, db_path)
+    job_id = queue.submit(PARAMS)
+    assert queue._claim()["id"] == job_id
+
+    sibling = JobQueue({}, db_path)
+
+    assert sibling.get(job_id)["status"] == jobs.RUNNING
+    assert queue._owner != sibling._owner
+
+
+def test_prune_removes_expired_outputs_and_their_jobs(make_queue, tmp_path):
+    queue = make_queue()
+    job_id = queue.submit(PARAMS)
+    job = wait_for(queue, job_id, (jobs.SUCCEEDED,))
+    output_dir = job["result"]["output_dir"]
+    queue.max_age_hours = 1
+
+    assert queue.prune() == []
+    old = time.time() - 2 * 3600
+    for name in os.listdir(output_dir):
+        os.utime(os.path.join(output_dir, name), (old, old))
+    os.utime(output_dir, (old, old))
+
+    # A directory the queue does not own, e.g. a single-file CLI run
+    foreign_dir = os.path.join(os.path.dirname(output_dir), str(uuid.uuid4()))
+    os.makedirs(foreign_dir)
+    os.utime(foreign_dir, (old, old))
+
+    assert queue.prune() == [output_dir]
+    assert not os.path.exists(output_dir)
+    assert os.path.isdir(foreign_dir)
+    assert queue.get(job_id) is None
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import pytest
+from app.services.backends import BACKENDS, register_backend
+from app.services.backends.fake import FakeBackend
+from app.services.resilience import BackendGuard, CircuitBreaker, CircuitOpenError, TokenBucket
+from app.services.voice import VoiceService
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class ThrottledError(Exception):
+    status = 429
+    headers = {"Retry-After": "0"}
+
+
+def test_circuit_breaker_opens_and_recovers_through_half_open():
+    clock = Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()  # the single half-open trial
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    clock.now = 20
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.trips == 2
+
+
+def test_token_bucket_adapts_to_throttling():
+    bucket = TokenBucket(rate=8, burst=2)
+    bucket.throttle()
+    bucket.throttle()
+    assert bucket.rate == 2
+    for _ in range(20):
+        bucket.recover()
+    assert bucket.rate == 8
+    for _ in range(10):
+        bucket.throttle()
+    assert bucket.rate == pytest.approx(0.8)
+
+
+def test_guard_retries_and_reports_metrics():
+    guard = BackendGuard("Test", TokenBucket(0, 1), CircuitBreaker(5, 60), retries=2, backoff_base=0)
+    attempts = []
+
+    async def request():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ThrottledError("429 Too Many Requests")
+        return "ok"
+
+    assert asyncio.run(guard.call(request)) == "ok"
+    metrics = guard.metrics()
+    assert metrics["requests"] == 3
+    assert metrics["retries"] == 2
+    assert metrics["throttled"] == 2
+    assert metrics["breaker_state"] == "closed"
+
+
+def test_failing_chunks_fail_over_and_trip_the_breaker(tmp_path, monkeypatch):
+    class FlakyBackend(FakeBackend):
+        name = "flaky"
+        display_name = "Flaky TTS"
+        fallback = "fake"
+
+        async def synthesize(self, text, voice_name, rate, pitch, volume):
+            if "Bad" in text:
+                raise ConnectionError("503 Service Unavailable")
+            return await super().synthesize(text, voice_name, rate, pitch, volume)
+
+    monkeypatch.setitem(BACKENDS, "flaky", FlakyBackend)
+    register_backend(FlakyBackend)
+    service = VoiceService({
+        "TTS_BACKEND": "flaky",
+        "edge_chunk_chars": 12,
+        "edge_concurrency": 1,
+        "resilience": {"retries": 1, "backoff_base_seconds": 0, "breaker_failures": 2}
+    })
+
+    _, word_boundaries = service.synthesize(
+        "Good one. Bad one. Good two.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    # Every chunk was kept: the failed one and those rejected by the open breaker came from the fallback
+    assert [wb.text for wb in word_boundaries] == ["Good", "one", "Bad", "one", "Good", "two"]
+    metrics = service.resilience_metrics()
+    assert metrics["flaky"]["retries"] == 1
+    assert metrics["flaky"]["failovers"] == 2
+    assert metrics["flaky"]["rejected"] == 1
+    assert metrics["flaky"]["breaker_state"] == "open"
+    assert metrics["fake"]["requests"] == 2
+
+
+def test_open_breaker_is_reported_as_circuit_open_error():
+    breaker = CircuitBreaker(1, 60)
+    breaker.record_failure()
+    guard = BackendGuard("Test", TokenBucket(0, 1), breaker)
+
+    async def request():
+        return "never sent"
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(guard.call(request))
+
+
+def register_failing_backend(monkeypatch):
+    """Register a backend that fails on texts containing "Bad" and falls back to the fake backend."""
+    class FailingBackend(FakeBackend):
+        name = "failing"
+        display_name = "Failing TTS"
+        fallback = "fake"
+
+        def communicate(self, text, voice_name, rate, pitch, volume):
+            if "Bad" in text:
+                raise ConnectionError("503 Service Unavailable")
+            return super().communicate(text, voice_name, rate, pitch, volume)
+
+    monkeypatch.setitem(BACKENDS, "failing", FailingBackend)
+    register_backend(FailingBackend)
+
+
+def failing_service(tmp_path):
+    return VoiceService({
+        "TTS_BACKEND": "failing",
+        "cache": {"enabled": True, "dir": str(tmp_path / "cache")},
+        "resilience": {"retries": 0, "breaker_failures": 100}
+    })
+
+
+def test_failover_results_are_not_cached(tmp_path, monkeypatch):
+    register_failing_backend(monkeypatch)
+    service = failing_service(tmp_path)
+
+    for text in ["Bad news.", "Bad news.", "Good news.", "Good news."]:
+        service.synthesize(text, "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    # Fallback audio would keep being served after the backend recovers
+    assert service.resilience_metrics()["failing"]["failovers"] == 2
+    assert service.cache.stats()["entries"] == 1
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_sentences_are_cached_and_reused_under_the_backend_that_rendered_them(tmp_path, monkeypatch):
+    register_failing_backend(monkeypatch)
+    service = failing_service(tmp_path)
+    text = "Good one. Bad one."
+    first_dir = tmp_path / "first"
+    first_dir.mkdir()
+
+    service.synthesize_incremental(text, "en-US-JennyNeural", 0, 0, 0, str(first_dir))
+
+    with open(first_dir / "segments.json", encoding="utf-8") as f:
+        assert [s["backend"] for s in json.load(f)["sentences"]] == ["failing", "fake"]
+    assert service.cache.get_bytes(service.cache.make_key("Bad one.", "en-US-JennyNeural", 0, 0, 0, "fake"))
+    assert not service.cache.get_bytes(service.cache.make_key("Bad one.", "en-US-JennyNeural", 0, 0, 0, "failing"))
+
+    # The fallback's sentence is rendered again, not taken over from the previous job
+    second_dir = tmp_path / "second"
+    second_dir.mkdir()
+    service.synthesize_incremental(text, "en-US-JennyNeural", 0, 0, 0, str(second_dir), previous_dir=str(first_dir))
+    assert service.resilience_metrics()["failing"]["failovers"] == 2
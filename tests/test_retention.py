@@ -0,0 +1,52 @@
+import os
+import time
+import uuid
+from app.services.retention import prune_task_dirs
+
+MB = 1024 * 1024
+
+
+def make_task(root, size, age, name=None):
+    """Create a task directory holding one file of ``size`` bytes last modified ``age`` seconds ago."""
+    path = root / (name or str(uuid.uuid4()))
+    path.mkdir()
+    (path / "output.mp3").write_bytes(bytes(size))
+    modified = time.time() - age
+    os.utime(path / "output.mp3", (modified, modified))
+    os.utime(path, (modified, modified))
+    return str(path)
+
+
+def ids(*paths):
+    return {os.path.basename(path) for path in paths}
+
+
+def test_expired_task_dirs_are_removed(tmp_path):
+    old = make_task(tmp_path, 10, age=7200)
+    new = make_task(tmp_path, 10, age=60)
+
+    assert prune_task_dirs(str(tmp_path), ids(old, new), max_age_seconds=3600) == [old]
+    assert os.path.isdir(new)
+
+
+def test_oldest_task_dirs_are_removed_until_under_the_size_limit(tmp_path):
+    oldest = make_task(tmp_path, MB, age=300)
+    older = make_task(tmp_path, MB, age=200)
+    newest = make_task(tmp_path, MB, age=100)
+
+    assert prune_task_dirs(str(tmp_path), ids(oldest, older, newest), max_bytes=int(1.5 * MB)) == [oldest, older]
+    assert os.path.isdir(newest)
+
+
+def test_dirs_of_other_tasks_are_never_removed(tmp_path):
+    running = make_task(tmp_path, 10, age=7200)
+    cli_output = make_task(tmp_path, 10, age=7200)
+    batch = make_task(tmp_path, 10, age=7200, name="batch_output")
+    finished = make_task(tmp_path, 10, age=7200)
+    (tmp_path / "jobs.sqlite3").write_bytes(b"")
+
+    removed = prune_task_dirs(str(tmp_path), ids(finished, "jobs.sqlite3"), max_age_seconds=3600, max_bytes=0)
+
+    assert removed == [finished]
+    assert os.path.isdir(running) and os.path.isdir(cli_output) and os.path.isdir(batch)
+    assert prune_task_dirs(str(tmp_path / "missing"), ids(running), max_age_seconds=0) == []
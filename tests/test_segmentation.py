@@ -0,0 +1,46 @@
+import random
+from app.services.segmentation import WordArrays, find_segments
+from app.services.subtitle import SubtitleService
+from app.services.timing import WordBoundary
+
+WORDS = ["Hello,", "world.", "and", "however", "quick", "brown", "fox!", "你好", "世界。", "而且", "extraordinarily"]
+
+
+def make_word_boundaries(count, seed):
+    rng = random.Random(seed)
+    word_boundaries = []
+    offset = 0
+    for _ in range(count):
+        duration = rng.randint(100000, 6000000)
+        word_boundaries.append(WordBoundary(rng.choice(WORDS), offset, duration))
+        offset += duration + rng.choice([0, 1000000, 5000000, 5000001, 7000000])
+    return word_boundaries
+
+
+def test_find_segments_matches_per_word_segmentation():
+    service = SubtitleService({})
+    for seed in range(50):
+        word_boundaries = make_word_boundaries(300, seed)
+        for max_line_length in (10, 25, 40):
+            segments = service._create_segments(word_boundaries, max_line_length)
+            ranges = find_segments(WordArrays.from_boundaries(word_boundaries), max_line_length)
+
+            assert [len(s["words"]) for s in segments] == [end - start for start, end in ranges]
+
+
+def test_generate_srt_vectorized_matches_streaming():
+    service = SubtitleService({})
+    word_boundaries = make_word_boundaries(500, 7)
+    text = " ".join(wb.text for wb in word_boundaries)
+
+    for args in [(40, True, None), (20, False, None), (40, True, text)]:
+        assert service.generate_srt(word_boundaries, *args) == \
+            "".join(service.iter_srt(iter(word_boundaries), *args))
+
+
+def test_word_arrays_interns_vocabulary():
+    words = WordArrays.from_boundaries(make_word_boundaries(100, 1))
+
+    assert len(words) == 100
+    assert len(words.vocabulary) <= len(WORDS)
+    assert [words.vocabulary[code] for code in words.codes] == words.texts
@@ -0,0 +1,77 @@
+import random
+import numpy as np
+from app.services.silence import FRAME_TICKS, SilenceTrimmer
+from app.services.timing import WordBoundary
+
+RATE = 8000
+FRAME = RATE // 50
+
+
+def make_pcm(pattern):
+    """Build PCM from (silent, frames) pairs of 20 ms frames."""
+    return np.concatenate([
+        np.full(frames * FRAME, 0 if silent else 5000, dtype="<i2") for silent, frames in pattern
+    ]).tobytes()
+
+
+def trim(pcm, blocks, max_ms=100):
+    trimmer = SilenceTrimmer(RATE, max_ms * 10000)
+    out = b"".join(trimmer.process(pcm[a:b]) for a, b in zip([0] + blocks, blocks + [len(pcm)]))
+    return trimmer, out + trimmer.flush()
+
+
+def test_long_silences_lose_their_middle():
+    # 5 frames (100 ms) of silence are kept: two after the speech before, three before the speech after
+    pcm = make_pcm([(True, 12), (False, 3), (True, 4), (False, 2), (True, 20), (False, 1), (True, 9)])
+
+    trimmer, out = trim(pcm, [])
+
+    assert len(out) // 2 // FRAME == 12 + 3 + 4 + 2 + 20 + 1 + 9 - 7 - 15 - 4
+    assert trimmer.removed_ticks() == (7 + 15 + 4) * FRAME_TICKS
+    # The speech starting at frames 12, 19 and 41 starts at 5, 12 and 19 after trimming
+    assert trimmer.map_ticks(np.array([12, 19, 41]) * FRAME_TICKS).tolist() == [
+        5 * FRAME_TICKS, 12 * FRAME_TICKS, 19 * FRAME_TICKS]
+
+
+def test_blocks_of_any_size_give_the_same_audio():
+    rng = random.Random(3)
+    pattern = [(i % 2 == 0, rng.randint(1, 30)) for i in range(40)]
+    pcm = make_pcm(pattern) + b"\x00" * 7
+    whole, expected = trim(pcm, [])
+
+    for _ in range(20):
+        blocks = sorted(rng.sample(range(1, len(pcm)), 12))
+        trimmer, out = trim(pcm, blocks)
+        assert out == expected
+        assert trimmer._cut_starts == whole._cut_starts and trimmer._cut_ends == whole._cut_ends
+    # The odd trailing bytes are passed through untouched
+    assert expected.endswith(b"\x00" * 7)
+
+
+def test_word_boundaries_move_with_the_cuts():
+    pcm = make_pcm([(True, 2), (False, 5), (True, 25), (False, 5), (True, 2)])
+    trimmer, _ = trim(pcm, [100, 5000])
+    removed = 20 * FRAME_TICKS
+
+    boundaries = trimmer.rewrite([
+        WordBoundary("one", 2 * FRAME_TICKS, 5 * FRAME_TICKS),
+        WordBoundary("two", 32 * FRAME_TICKS, 5 * FRAME_TICKS),
+    ])
+
+    assert boundaries == [
+        WordBoundary("one", 2 * FRAME_TICKS, 5 * FRAME_TICKS),
+        WordBoundary("two", 32 * FRAME_TICKS - removed, 5 * FRAME_TICKS),
+    ]
+    # Times inside the removed range land on the cut
+    assert trimmer.map_ticks([10 * FRAME_TICKS, 20 * FRAME_TICKS, 29 * FRAME_TICKS]).tolist() == [
+        9 * FRAME_TICKS, 9 * FRAME_TICKS, 29 * FRAME_TICKS - removed]
+
+
+def test_nothing_is_cut_below_the_limit():
+    pcm = make_pcm([(True, 5), (False, 5), (True, 5)])
+    trimmer, out = trim(pcm, [FRAME * 2 + 1])
+    boundaries = [WordBoundary("a", 1, 2)]
+
+    assert out == pcm
+    assert trimmer.removed_ticks() == 0
+    assert trimmer.rewrite(boundaries) == boundaries
@@ -1,5 +1,11 @@
+import asyncio
+import io
+import json
 import pytest
 from app.services.subtitle import SubtitleService
+from app.services.subtitle_writers import word_positions
+from app.services.timing import WordBoundary
+from app.utils.text_to_srt import format_ass_ticks, format_ticks, format_time, format_vtt_ticks
 import toml
 
 @pytest.fixture
@@ -9,8 +15,8 @@ def config():
 def test_generate_srt(config):
     service = SubtitleService(config)
     word_boundaries = [
-        {'text': 'Hello,', 'offset': 2250000, 'duration': 3300000},
-        {'text': 'world.', 'offset': 5650000, 'duration': 4400000}
+        WordBoundary('Hello,', 2250000, 3300000),
+        WordBoundary('world.', 5650000, 4400000)
     ]
     max_line_length = 10
 
@@ -24,3 +30,140 @@ Hello,"""
 world."""
     assert expected_srt1 in srt_content
     assert expected_srt2 in srt_content
+
+
+def test_iter_srt_yields_cue_before_input_is_exhausted(config):
+    service = SubtitleService(config)
+    consumed = []
+
+    def word_stream():
+        for wb in [
+            WordBoundary('Hello,', 2250000, 3300000),
+            WordBoundary('world.', 5650000, 4400000),
+            WordBoundary('Again.', 10050000, 4400000),
+        ]:
+            consumed.append(wb.text)
+            yield wb
+
+    cues = service.iter_srt(word_stream(), max_line_length=10)
+
+    assert next(cues).startswith("1\n00:00:00,225 --> 00:00:00,555\nHello,")
+    assert consumed == ['Hello,', 'world.']
+    assert len(list(cues)) == 2
+
+
+def test_stream_srt_async_matches_generate_srt(config):
+    service = SubtitleService(config)
+    word_boundaries = [
+        WordBoundary('Hello,', 2250000, 3300000),
+        WordBoundary('world.', 5650000, 4400000)
+    ]
+
+    async def tts_stream():
+        for wb in word_boundaries:
+            yield {"type": "audio", "data": b""}
+            yield {"type": "WordBoundary", "boundary": wb}
+
+    async def collect():
+        return [cue async for cue in service.stream_srt_async(tts_stream(), 10)]
+
+    assert "".join(asyncio.run(collect())) == service.generate_srt(word_boundaries, 10)
+
+
+def test_write_srt_streams_to_file_handle(config, tmp_path):
+    service = SubtitleService(config)
+    word_boundaries = [
+        WordBoundary('Hello,', 2250000, 3300000),
+        WordBoundary('world.', 5650000, 4400000)
+    ]
+    buffer = io.StringIO()
+
+    count = service.write_srt(word_boundaries, buffer, 10)
+    service.write_srt(word_boundaries, str(tmp_path / "out.srt"), 10)
+
+    assert count == 2
+    assert buffer.getvalue() == service.generate_srt(word_boundaries, 10)
+    assert (tmp_path / "out.srt").read_text(encoding="utf-8") == buffer.getvalue()
+
+
+def test_format_time():
+    assert format_time(0) == "00:00:00,000"
+    assert format_time(0.0005) == "00:00:00,000"
+    assert format_time(3725.0419999) == "01:02:05,042"
+    assert format_time(90000.5) == "25:00:00,500"
+
+
+def test_format_ticks():
+    assert format_ticks(0) == "00:00:00,000"
+    # Rounded to microseconds first, then truncated to milliseconds
+    assert format_ticks(29999999) == "00:00:03,000"
+    assert format_ticks(29999994) == "00:00:02,999"
+    assert format_ticks(37250419999) == "01:02:05,042"
+    assert format_ticks(900005000000) == "25:00:00,500"
+
+
+def test_format_vtt_and_ass_ticks():
+    assert format_vtt_ticks(37250419999) == "01:02:05.042"
+    assert format_ass_ticks(37250419999) == "1:02:05.04"
+    assert format_ass_ticks(900005000000) == "25:00:00.50"
+
+
+def test_write_subtitles_writes_every_format_in_one_pass(config):
+    service = SubtitleService(config)
+    word_boundaries = [
+        WordBoundary('Hello', 2250000, 3300000),
+        WordBoundary('world', 5650000, 4400000),
+        WordBoundary('<again>.', 10050000, 4400000),
+        WordBoundary('{Next}', 40000000, 4000000)
+    ]
+    outputs = {subtitle_format: io.StringIO() for subtitle_format in ("srt", "vtt", "ass", "json")}
+
+    count = service.write_subtitles(word_boundaries, outputs, 40)
+
+    assert count == 2
+    assert outputs["srt"].getvalue() == service.generate_srt(word_boundaries, 40)
+    # Words after the first carry their start time; markup characters are escaped
+    assert outputs["vtt"].getvalue() == (
+        "WEBVTT\n\n"
+        "1\n00:00:00.225 --> 00:00:01.445\nHello <00:00:00.565>world <00:00:01.005>&lt;again&gt;.\n\n"
+        "2\n00:00:04.000 --> 00:00:04.400\n{Next}\n\n")
+    assert outputs["ass"].getvalue().endswith(
+        "Dialogue: 0,0:00:00.22,0:00:01.44,Default,,0,0,0,,Hello world <again>.\n"
+        "Dialogue: 0,0:00:04.00,0:00:04.40,Default,,0,0,0,,\\{Next\\}\n")
+    cues = json.loads(outputs["json"].getvalue())
+    assert [cue["text"] for cue in cues] == ["Hello world <again>.", "{Next}"]
+    assert cues[0]["words"][1] == {"text": "world", "offset": 5650000, "duration": 4400000}
+    assert cues[1]["start"] == 40000000
+
+
+def test_streamed_and_listed_words_give_the_same_subtitles():
+    service = SubtitleService({"subtitles": {"vtt_karaoke": False}})
+    word_boundaries = [
+        WordBoundary('Hello', 2250000, 3300000),
+        WordBoundary('world.', 5650000, 4400000),
+        WordBoundary('Again', 10050000, 4400000)
+    ]
+
+    for subtitle_format in ("vtt", "ass", "json"):
+        streamed = "".join(service.iter_subtitles(iter(word_boundaries), subtitle_format, 10))
+        assert streamed == "".join(service.iter_subtitles(word_boundaries, subtitle_format, 10))
+    assert "<00:" not in streamed
+    assert json.loads("".join(service.iter_subtitles([], "json"))) == []
+
+
+def test_word_positions_follow_spacing_fixes():
+    words = [WordBoundary(text, 0, 0) for text in ("Hello", ",", "我們", "今天", "a,b")]
+
+    assert word_positions("Hello, 我們 今天 a, b", words) == [0, 5, 7, 10, 13]
+
+
+def test_subtitle_files_are_written_next_to_the_srt(tmp_path):
+    service = SubtitleService({"subtitles": {"formats": ["json", "vtt"]}})
+
+    paths, count = service.write_subtitle_files([WordBoundary('Hello.', 0, 1000000)], str(tmp_path))
+
+    assert list(paths) == ["json", "vtt", "srt"]
+    assert count == 1
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["output.json", "output.srt", "output.vtt"]
+    with pytest.raises(ValueError):
+        SubtitleService({"subtitles": {"formats": ["sub"]}})
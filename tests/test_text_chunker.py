@@ -0,0 +1,32 @@
+from app.utils.text_chunker import chunk_text, split_sentences
+
+
+def test_split_sentences():
+    text = "Hello, world. How are you?\n\nA paragraph\n你好。世界！"
+
+    assert split_sentences(text) == [
+        "Hello, world.", "How are you?", "A paragraph", "你好。", "世界！"
+    ]
+
+
+def test_chunk_text_respects_max_chars():
+    text = "One two three. Four five six. Seven eight nine, ten eleven twelve."
+
+    chunks = chunk_text(text, 20)
+
+    assert chunks == [
+        "One two three.", "Four five six.", "Seven eight nine,", "ten eleven twelve."
+    ]
+    assert all(len(chunk) <= 20 for chunk in chunks)
+
+
+def test_chunk_text_hard_splits_cjk_runs():
+    chunks = chunk_text("這是一個非常非常長的句子", 5)
+
+    assert chunks == ["這是一個非", "常非常長的", "句子"]
+
+
+def test_chunk_text_joins_cjk_sentences_without_spaces():
+    chunks = chunk_text("我們今天去公園。天氣很好！Then we left. 晚上回家。", 30)
+
+    assert chunks == ["我們今天去公園。天氣很好！Then we left.", "晚上回家。"]
@@ -0,0 +1,24 @@
+import json
+from app.services.timing import WordBoundary, dump_boundaries, load_boundaries
+
+
+def test_word_boundary_copies():
+    boundary = WordBoundary("Hello", 1000000, 4000000)
+
+    assert boundary.end == 5000000
+    assert boundary.shifted(2500000) == WordBoundary("Hello", 3500000, 4000000)
+    assert boundary.with_text("Hello,") == WordBoundary("Hello,", 1000000, 4000000)
+    # Copies leave the original unchanged
+    assert boundary == WordBoundary("Hello", 1000000, 4000000)
+    assert boundary != WordBoundary("Hello", 1000000, 4000001)
+
+
+def test_boundaries_round_trip_through_json():
+    boundaries = [WordBoundary("你好", 0, 4800000), WordBoundary("world.", 6300000, 3100000)]
+
+    data = json.loads(json.dumps(dump_boundaries(boundaries)))
+
+    assert data[1] == {"text": "world.", "offset": 6300000, "duration": 3100000}
+    assert load_boundaries(data) == boundaries
+    # Older files may hold float times; they are read back as integer ticks
+    assert WordBoundary.from_dict({"text": "a", "offset": 10.0, "duration": 5.0}).offset == 10
@@ -0,0 +1,40 @@
+import json
+import os
+from app.services.jobs import WORD_BOUNDARIES_FILE
+from app.services.subtitle import SubtitleService
+from app.ui.resources import find_file, load_word_boundaries, read_toml
+
+
+def test_toml_cache_is_invalidated_by_modification_time(tmp_path):
+    path = tmp_path / "config.toml"
+    path.write_text("edge_concurrency = 4\n", encoding="utf-8")
+    found, mtime = find_file([str(tmp_path / "missing.toml"), str(path)])
+    assert found == str(path)
+    assert read_toml(found, mtime)["edge_concurrency"] == 4
+
+    path.write_text("edge_concurrency = 8\n", encoding="utf-8")
+    # Unchanged key: served from the cache without reading the file
+    assert read_toml(found, mtime)["edge_concurrency"] == 4
+    os.utime(path, (mtime + 1, mtime + 1))
+    assert read_toml(*find_file([str(path)]))["edge_concurrency"] == 8
+    assert find_file([str(tmp_path / "missing.toml")]) == (None, None)
+
+
+def test_subtitle_files_are_re_segmented_per_layout_without_synthesis(tmp_path):
+    path = tmp_path / WORD_BOUNDARIES_FILE
+    text = "Hello there, this is a longer sentence. Bye."
+    words = [w.strip(",.") for w in text.split()]
+    path.write_text(json.dumps({"text": text, "word_boundaries": [
+        {"text": word, "offset": i * 5000000, "duration": 4000000} for i, word in enumerate(words)
+    ]}), encoding="utf-8")
+    timing = load_word_boundaries(str(path), os.path.getmtime(path))
+    service = SubtitleService({})
+
+    _, wide = service.write_subtitle_files(timing["word_boundaries"], str(tmp_path), 40, True, timing["text"])
+    paths, narrow = service.write_subtitle_files(timing["word_boundaries"], str(tmp_path), 20, True, timing["text"])
+
+    assert wide < narrow
+    srt = (tmp_path / "output.srt").read_text(encoding="utf-8")
+    assert srt.count("-->") == narrow
+    assert "Hello there," in srt
+    assert list(paths) == ["srt"]
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from app.services.voice import VoiceService
+from app.services.backends.fake import FakeCommunicate as FakeTTS, SILENT_FRAME
 import toml
 import os
 
@@ -10,6 +12,9 @@ def config():
     config = toml.load("config.example.toml")
     config["AZURE_KEY"] = ""
     config["AZURE_REGION"] = ""
+    config["cache"] = {"enabled": False}
+    # Send requests through edge_tts.Communicate instead of the connection pool
+    config["edge_pool_size"] = 0
     return config
 
 @pytest.mark.skip(reason="Requires network access for edge_tts")
@@ -32,3 +37,145 @@ def test_synthesize_with_edge_tts(config, tmp_path):
     assert word_boundaries is not None
     assert len(word_boundaries) > 0
     os.remove(audio_file)
+
+
+class FakeCommunicate:
+    """Stand-in for edge_tts.Communicate returning one word per 4800 audio bytes."""
+
+    def __init__(self, text, voice, rate, pitch, volume, boundary):
+        self.words = text.split()
+
+    async def stream(self):
+        for i, word in enumerate(self.words):
+            yield {"type": "WordBoundary", "text": word, "offset": i * 8000000, "duration": 7000000}
+            yield {"type": "audio", "data": b"\x00" * 4800}
+
+
+def test_synthesize_long_text_in_chunks(config, tmp_path, monkeypatch):
+    """Tests that long texts are chunked and stitched into one continuous timeline."""
+    monkeypatch.setattr("app.services.backends.edge.edge_tts.Communicate", FakeCommunicate)
+    config["edge_chunk_chars"] = 12
+    config["edge_concurrency"] = 2
+    service = VoiceService(config)
+
+    audio_file, word_boundaries = service.synthesize(
+        "One two. Three four. Five six.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    assert os.path.getsize(audio_file) == 6 * 4800
+    assert [wb.text for wb in word_boundaries] == ["One", "two.", "Three", "four.", "Five", "six."]
+    # 9600 bytes of 48 kbps MP3 per chunk = 1.6 s = 16,000,000 ticks
+    assert [wb.offset for wb in word_boundaries] == [
+        0, 8000000, 16000000, 24000000, 32000000, 40000000
+    ]
+
+
+def test_synthesize_serves_repeated_requests_from_cache(config, tmp_path, monkeypatch):
+    """Tests that an identical second request does not reach the TTS service."""
+    calls = []
+
+    class CountingCommunicate(FakeCommunicate):
+        def __init__(self, text, *args, **kwargs):
+            calls.append(text)
+            super().__init__(text, *args, **kwargs)
+
+    monkeypatch.setattr("app.services.backends.edge.edge_tts.Communicate", CountingCommunicate)
+    config["cache"] = {"enabled": True, "dir": str(tmp_path / "cache")}
+    service = VoiceService(config)
+
+    first = service.synthesize("Hello world.", "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+    second_dir = tmp_path / "second"
+    second_dir.mkdir()
+    second = service.synthesize("Hello world.", "en-US-JennyNeural", 0, 0, 0, str(second_dir))
+
+    assert len(calls) == 1
+    assert second[1] == first[1]
+    assert os.path.getsize(second[0]) == os.path.getsize(first[0])
+    assert service.cache.stats()["hits"] == 1
+    assert service.cache.stats()["misses"] == 1
+
+
+def test_synthesize_incremental_only_resynthesizes_changed_sentences(config, tmp_path, monkeypatch):
+    """Tests that an edit re-synthesizes only the edited sentence and re-times the rest."""
+    calls = []
+
+    class CountingCommunicate(FakeCommunicate):
+        def __init__(self, text, *args, **kwargs):
+            calls.append(text)
+            super().__init__(text, *args, **kwargs)
+
+    monkeypatch.setattr("app.services.backends.edge.edge_tts.Communicate", CountingCommunicate)
+    service = VoiceService(config)
+    first_dir = tmp_path / "first"
+    second_dir = tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+
+    service.synthesize_incremental(
+        "One two. Three four. Five six.", "en-US-JennyNeural", 0, 0, 0, str(first_dir))
+    calls.clear()
+    audio_file, word_boundaries = service.synthesize_incremental(
+        "One two. Three more words. Five six.", "en-US-JennyNeural", 0, 0, 0,
+        str(second_dir), previous_dir=str(first_dir))
+
+    assert calls == ["Three more words."]
+    assert [wb.text for wb in word_boundaries] == [
+        "One", "two.", "Three", "more", "words.", "Five", "six."
+    ]
+    # The last sentence starts after 2 + 3 words of 4800 bytes (0.8 s each)
+    assert word_boundaries[5].offset == 40000000
+    assert os.path.getsize(audio_file) == 7 * 4800
+
+
+def test_stream_async_yields_audio_and_boundaries_in_order(config, monkeypatch):
+    """Tests the async iterator API on one running event loop."""
+    monkeypatch.setattr("app.services.backends.edge.edge_tts.Communicate", FakeCommunicate)
+    config["edge_chunk_chars"] = 12
+    service = VoiceService(config)
+
+    async def collect():
+        return [item async for item in service.stream_async(
+            "One two. Three four.", "en-US-JennyNeural", 0, 0, 0)]
+
+    items = asyncio.run(collect())
+
+    assert [item["type"] for item in items].count("audio") == 2
+    boundaries = [item["boundary"] for item in items if item["type"] == "WordBoundary"]
+    assert [(b.text, b.offset) for b in boundaries] == [
+        ("One", 0), ("two.", 8000000), ("Three", 16000000), ("four.", 24000000)
+    ]
+
+
+def test_fake_backend_synthesizes_offline(config, tmp_path):
+    """Tests the fake backend end to end through chunking and stitching."""
+    config["TTS_BACKEND"] = "fake"
+    config["edge_chunk_chars"] = 40
+    service = VoiceService(config)
+    text = "The quick brown fox jumps. It's over the lazy dog, twice! " * 3
+
+    audio_file, word_boundaries = service.synthesize(
+        text, "en-US-JennyNeural", 0, 0, 0, str(tmp_path))
+
+    with open(audio_file, "rb") as f:
+        audio = f.read()
+    assert audio[:4] == SILENT_FRAME[:4]
+    assert len(audio) % len(SILENT_FRAME) == 0
+    assert [wb.text for wb in word_boundaries][:6] == ["The", "quick", "brown", "fox", "jumps", "It's"]
+    ends = [wb.end for wb in word_boundaries]
+    assert all(a.offset < b.offset for a, b in zip(word_boundaries, word_boundaries[1:]))
+    assert ends[-1] <= len(audio) * 8 * 10000000 // 48000
+
+
+def test_fake_communicate_timings():
+    """Tests CJK word splitting, punctuation pauses and the rate adjustment."""
+    async def boundaries(text, rate):
+        return [item["boundary"] async for item in FakeTTS(text, "zh-CN-XiaoxiaoNeural", rate).stream()
+                if item["type"] == "WordBoundary"]
+
+    normal = asyncio.run(boundaries("你好，世界。", 0))
+    fast = asyncio.run(boundaries("你好，世界。", 100))
+
+    assert [wb.text for wb in normal] == ["你好", "世界"]
+    # Two characters at 250 per minute, then a clause pause
+    assert normal[0].duration == 4800000
+    assert normal[1].offset == normal[0].offset + 4800000 + 1500000
+    assert fast[0].duration == 2400000